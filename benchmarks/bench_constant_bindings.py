@@ -0,0 +1,92 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Benchmark the instantiation of objects with constant bindings.
+
+A tree of many children is built, each of which has a few bindings of
+literal values, which is typical of the attributes of a form. The tree
+is built from the same source compiled with the constant bindings
+marked by the compiler, which are assigned directly, and compiled
+without them, in which case every binding creates an expression.
+
+Usage: python benchmarks/bench_constant_bindings.py [n_repeats]
+
+"""
+import sys
+from timeit import default_timer
+
+from enaml.core import enaml_compiler
+from enaml.core.enaml_compiler import EnamlCompiler
+from enaml.core.parser import parse
+
+
+WIDTH = 500
+
+
+def source():
+    lines = [
+        'from enaml.core.declarative import Declarative',
+        '',
+        'enamldef Item(Declarative):',
+        '    attr text = None',
+        '    attr hug = None',
+        '    attr size = None',
+        '',
+        'enamldef Root(Declarative):',
+        '    attr count = 0',
+    ]
+    for idx in xrange(WIDTH):
+        lines.append('    Item:')
+        lines.append("        text = 'OK'")
+        lines.append("        hug = 'ignore'")
+        lines.append('        size = (%d, -1)' % idx)
+    return '\n'.join(lines) + '\n'
+
+
+def load(constants):
+    """ Compile the source and return the root type.
+
+    """
+    saved = enaml_compiler.constant_value
+    if not constants:
+        enaml_compiler.constant_value = lambda py_ast: None
+    try:
+        code = EnamlCompiler.compile(parse(source()), 'bench_constant')
+    finally:
+        enaml_compiler.constant_value = saved
+    f_globals = {'__name__': 'bench_constant'}
+    exec code in f_globals
+    return f_globals['Root']
+
+
+def measure(cls, repeats):
+    """ Get the best time taken to instantiate and read the tree, and
+    the number of expressions bound in the tree.
+
+    """
+    best = None
+    for idx in xrange(repeats):
+        start = default_timer()
+        root = cls()
+        for child in root.children:
+            child.text, child.hug, child.size
+        elapsed = default_timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    expressions = sum(child._binding_counts()[0] for child in root.children)
+    return best, expressions
+
+
+def main(argv):
+    repeats = int(argv[0]) if argv else 5
+    expr_time, expr_count = measure(load(False), repeats)
+    const_time, const_count = measure(load(True), repeats)
+    print 'expressions %8.2f ms (%d bound)  constants %8.2f ms (%d bound)' % (
+        expr_time * 1e3, expr_count, const_time * 1e3, const_count)
+    print 'speedup %.2fx' % (expr_time / const_time)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
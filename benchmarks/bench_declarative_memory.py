@@ -0,0 +1,120 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Benchmark the memory used by the bindings of Declarative objects.
+
+A Declarative object stores its bound expressions and listeners in
+lists indexed by the binding slots of its class. This replaced a pair
+of per-instance dicts, which cost 280 bytes each on a 64-bit build of
+Python 2.7 even when they held a single binding, while a slot list of
+two entries costs 88 bytes. For an object with two expressions and one
+listener, the binding storage shrinks from 640 to 248 bytes.
+
+The benchmark builds a flat tree of objects which each bind two
+expressions and one listener, and reports the growth of the resident
+set size along with the size of the binding containers, compared with
+the size of the equivalent dicts.
+
+Usage: python benchmarks/bench_declarative_memory.py [n_objects]
+
+"""
+import resource
+import sys
+from timeit import default_timer
+
+from traits.api import Int, Str
+
+from enaml.core.abstract_expressions import (
+    AbstractExpression, AbstractListener
+)
+from enaml.core.declarative import Declarative
+
+
+class Constant(AbstractExpression):
+    """ An expression which evaluates to a constant value.
+
+    """
+    def __init__(self, value):
+        self._value = value
+
+    def eval(self, obj, name):
+        return self._value
+
+
+class Counter(AbstractListener):
+    """ A listener which counts the changes of an attribute.
+
+    """
+    count = 0
+
+    def value_changed(self, obj, name, old, new):
+        Counter.count += 1
+
+
+class Item(Declarative):
+    """ A declarative object with a few bindable attributes.
+
+    """
+    label = Str
+
+    value = Int
+
+
+def max_rss():
+    """ Get the maximum resident set size of the process in bytes.
+
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def binding_sizes(objects):
+    """ Get the size of the binding containers of the objects, and of
+    the per-instance dicts which they replaced.
+
+    """
+    size = 0
+    dict_size = 0
+    for obj in objects:
+        expressions = obj._expressions
+        listeners = obj._listeners
+        size += sys.getsizeof(expressions) + sys.getsizeof(listeners)
+        dict_size += sys.getsizeof({'label': None, 'value': None})
+        dict_size += sys.getsizeof({'value': None})
+        for item in listeners:
+            if item is not None:
+                size += sys.getsizeof(item)
+                dict_size += sys.getsizeof(item)
+    return size, dict_size
+
+
+def main(argv):
+    count = int(argv[0]) if argv else 100000
+    listener = Counter()
+    rss = max_rss()
+    start = default_timer()
+    parent = Declarative()
+    objects = []
+    for idx in xrange(count):
+        item = Item(parent)
+        item.bind_expression('label', Constant(u'Item'))
+        item.bind_expression('value', Constant(idx))
+        item.bind_listener('value', listener)
+        objects.append(item)
+    for item in objects:
+        item.label
+        item.value = -1
+    elapsed = default_timer() - start
+    grown = max_rss() - rss
+    size, dict_size = binding_sizes(objects)
+    print '%d objects built in %.3fs' % (count, elapsed)
+    print 'rss growth: %.1f MB (%.0f bytes per object)' % (
+        grown / 1e6, float(grown) / count)
+    print 'binding storage: %.1f MB; as dicts: %.1f MB (%.0f%% saved)' % (
+        size / 1e6, dict_size / 1e6, 100.0 * (dict_size - size) / dict_size)
+    print 'listener calls: %d' % Counter.count
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,104 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Benchmark the instantiation of enamldef types.
+
+Two shapes of tree are built from enamldef types: a wide tree, with a
+single level of many bound children, and a deep tree, with chains of
+nested enamldef types. The best time to instantiate each tree is
+reported.
+
+Usage: python benchmarks/bench_instantiation.py [n_repeats]
+
+"""
+import sys
+from timeit import default_timer
+
+from enaml.core.enaml_compiler import EnamlCompiler
+from enaml.core.parser import parse
+
+
+WIDE_WIDTH = 500
+
+DEEP_DEPTH = 40
+
+DEEP_WIDTH = 10
+
+
+def wide_source():
+    lines = [
+        'from enaml.core.declarative import Declarative',
+        '',
+        'enamldef Item(Declarative):',
+        '    attr value = 0',
+        '    attr label = str(value)',
+        '',
+        'enamldef Wide(Declarative):',
+        '    attr count = 0',
+    ]
+    for idx in xrange(WIDE_WIDTH):
+        lines.append('    Item:')
+        lines.append('        value << parent.count + %d' % idx)
+    return '\n'.join(lines) + '\n'
+
+
+def deep_source():
+    lines = [
+        'from enaml.core.declarative import Declarative',
+        '',
+        'enamldef Leaf(Declarative):',
+        '    attr value = 0',
+        '',
+        'enamldef Level0(Declarative):',
+        '    attr value = 0',
+    ]
+    for level in xrange(1, DEEP_DEPTH + 1):
+        lines.append('')
+        lines.append('enamldef Level%d(Declarative):' % level)
+        lines.append('    attr value = %d' % level)
+        lines.append('    Level%d:' % (level - 1))
+        lines.append('        value << parent.value + 1')
+        for idx in xrange(DEEP_WIDTH):
+            lines.append('    Leaf:')
+            lines.append('        value = %d' % idx)
+    return '\n'.join(lines) + '\n'
+
+
+def load(source, name):
+    """ Compile enaml source and return the globals of the module.
+
+    """
+    code = EnamlCompiler.compile(parse(source), name)
+    f_globals = {'__name__': name}
+    exec code in f_globals
+    return f_globals
+
+
+def measure(cls, repeats):
+    """ Get the best time taken to instantiate a type.
+
+    """
+    best = None
+    for idx in xrange(repeats):
+        start = default_timer()
+        cls()
+        elapsed = default_timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def main(argv):
+    repeats = int(argv[0]) if argv else 5
+    wide = load(wide_source(), 'bench_wide')['Wide']
+    # The deep tree is a chain of DEEP_DEPTH nested enamldef types,
+    # each of which also has DEEP_WIDTH leaf children.
+    deep = load(deep_source(), 'bench_deep')['Level%d' % DEEP_DEPTH]
+    for name, cls in (('wide', wide), ('deep', deep)):
+        print '%-6s %8.2f ms' % (name, measure(cls, repeats) * 1e3)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
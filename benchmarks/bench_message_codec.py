@@ -0,0 +1,104 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Benchmark the session message codecs on `message_batch` payloads.
+
+The payloads mimic the batches sent by a session when a large view is
+updated: relayout actions carrying serialized constraints, and runs of
+published attribute changes. Each codec encodes and decodes the same
+sequence of batches over a single connection, so the binary codec is
+measured with its intern tables warmed up as it would be in practice.
+
+Usage: python benchmarks/bench_message_codec.py [n_widgets] [n_batches]
+
+"""
+import sys
+from timeit import default_timer
+
+from enaml.message_codec import BinaryCodec, JSONCodec
+
+
+def symbolic(name, owner):
+    return {'type': 'linear_symbolic', 'name': name, 'owner': owner}
+
+
+def expression(owner, other, constant):
+    terms = [
+        {'type': 'term', 'var': symbolic('left', owner), 'coeff': 1.0},
+        {'type': 'term', 'var': symbolic('right', other), 'coeff': -1.0},
+    ]
+    return {'type': 'linear_expression', 'terms': terms, 'constant': constant}
+
+
+def constraint(owner, other):
+    return {
+        'type': 'linear_constraint',
+        'lhs': expression(owner, other, 10.0),
+        'op': '==',
+        'rhs': expression(other, owner, 0.0),
+        'strength': 'strong',
+        'weight': 1.0,
+    }
+
+
+def make_batch(object_ids, cycle):
+    """ Create the content of a realistic `message_batch` action.
+
+    """
+    batch = []
+    for idx, object_id in enumerate(object_ids):
+        other = object_ids[idx - 1]
+        if idx % 10 == 0:
+            info = {
+                'constraints': [constraint(object_id, other)] * 4,
+                'resist': ('strong', 'strong'),
+                'hug': ('strong', 'weak'),
+            }
+            batch.append((object_id, 'relayout', info))
+        batch.append((object_id, 'set_text', {'text': u'Item %d' % cycle}))
+        batch.append((object_id, 'set_value', {'value': idx * cycle}))
+        batch.append((object_id, 'set_enabled', {'enabled': bool(cycle % 2)}))
+    return {'batch': batch}
+
+
+def run(codec_cls, batches, session_id):
+    """ Encode and decode the batches with a codec pair.
+
+    Returns
+    -------
+    result : tuple
+        The total encoded size in bytes, the encode time and the
+        decode time in seconds.
+
+    """
+    encoder = codec_cls()
+    decoder = codec_cls()
+    encoded = []
+    start = default_timer()
+    for content in batches:
+        encoded.append(encoder.encode(session_id, 'message_batch', content))
+    encode_time = default_timer() - start
+    size = sum(len(f) for frames in encoded for f in frames)
+    start = default_timer()
+    for frames in encoded:
+        decoder.decode(frames)
+    decode_time = default_timer() - start
+    return size, encode_time, decode_time
+
+
+def main():
+    n_widgets = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n_batches = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    object_ids = ['w%x' % (0x1000 + i) for i in xrange(n_widgets)]
+    batches = [make_batch(object_ids, cycle) for cycle in xrange(n_batches)]
+    session_id = 'a5f2c4d1e0b94f3c8d7e6a5b4c3d2e1f'
+    print '%d batches of %d widgets' % (n_batches, n_widgets)
+    print '%-8s %12s %12s %12s' % ('codec', 'bytes', 'encode (s)', 'decode (s)')
+    for codec_cls in (JSONCodec, BinaryCodec):
+        size, enc, dec = run(codec_cls, batches, session_id)
+        print '%-8s %12d %12.4f %12.4f' % (codec_cls.name, size, enc, dec)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Benchmark the evaluation of subscription bindings.
+
+A tree of many children is built, each of which subscribes to the same
+attribute of a model with a dotted attribute chain. The model is then
+updated repeatedly, which reevaluates every binding. The tree is built
+from the same source compiled with the static dependencies extracted by
+the compiler, and with full code tracing.
+
+Usage: python benchmarks/bench_static_bindings.py [n_updates]
+
+"""
+import sys
+from timeit import default_timer
+
+from enaml.core import enaml_compiler
+from enaml.core.enaml_compiler import EnamlCompiler
+from enaml.core.parser import parse
+
+
+WIDTH = 200
+
+
+def source():
+    lines = [
+        'from traits.api import HasTraits, Int',
+        'from enaml.core.declarative import Declarative',
+        '',
+        'class Model(HasTraits):',
+        '    count = Int',
+        '',
+        'enamldef Item(Declarative):',
+        '    attr value = 0',
+        '',
+        'enamldef Root(Declarative):',
+        '    attr model = Model()',
+    ]
+    for idx in xrange(WIDTH):
+        lines.append('    Item:')
+        lines.append('        value << parent.model.count')
+    return '\n'.join(lines) + '\n'
+
+
+def load(static):
+    """ Compile the source and return the root type.
+
+    """
+    saved = enaml_compiler.STATIC_COMPILE_OP_MAP.copy()
+    if not static:
+        enaml_compiler.STATIC_COMPILE_OP_MAP.clear()
+    try:
+        code = EnamlCompiler.compile(parse(source()), 'bench_static')
+    finally:
+        enaml_compiler.STATIC_COMPILE_OP_MAP.update(saved)
+    f_globals = {'__name__': 'bench_static'}
+    exec code in f_globals
+    return f_globals['Root']
+
+
+def measure(cls, updates):
+    """ Get the number of binding evaluations per second.
+
+    """
+    root = cls()
+    model = root.model
+    for child in root.children:
+        child.value
+    start = default_timer()
+    for idx in xrange(updates):
+        model.count += 1
+    elapsed = default_timer() - start
+    assert all(child.value == updates for child in root.children)
+    return updates * WIDTH / elapsed
+
+
+def main(argv):
+    updates = int(argv[0]) if argv else 200
+    traced = measure(load(False), updates)
+    static = measure(load(True), updates)
+    print 'traced %10.0f evals/s  static %10.0f evals/s  speedup %.2fx' % (
+        traced, static, static / traced)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,291 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Replay a session traffic recording to benchmark message handling.
+
+A recording is made by passing a TrafficRecorder to the `set_recorder`
+method of the application. The replay drives one side of each recorded
+session with the messages recorded from the other side:
+
+server
+    A headless Session is started from the recorded factory name, and
+    is sent the recorded client messages. The object ids of the live
+    session are matched to the recorded ids through the snapshot sent
+    to the client in the 'open' message and any progressive snapshot
+    chunks, so the session must build the same widget tree as the
+    recording.
+
+client
+    A QtSession is built from the recorded snapshot, and is sent the
+    recorded server messages.
+
+The replay runs as fast as possible, or at the recorded speed with the
+--realtime flag. It reports the message rate, the handler time of each
+action, and the end-to-end latency of each message, which includes the
+deferred work it causes, such as batched updates and relayouts.
+
+Usage:
+    python benchmarks/replay_traffic.py server <recording> <module:attr>
+    python benchmarks/replay_traffic.py client <recording>
+
+where <module:attr> names the list of SessionFactory instances used by
+the recorded application.
+
+"""
+from collections import defaultdict
+import sys
+import time
+from timeit import default_timer
+
+from enaml.traffic_recorder import CLIENT, SERVER, SESSION, read_traffic
+
+
+def percentile(values, pct):
+    """ Get a percentile of a sorted list of values.
+
+    """
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(len(values) * pct / 100.0))
+    return values[index]
+
+
+class ReplayStats(object):
+    """ An object which collects the timings of a replay.
+
+    """
+    def __init__(self):
+        self.handler_times = defaultdict(list)
+        self.latencies = []
+        self.messages = 0
+        self.replies = 0
+        self.elapsed = 0.0
+
+    def add(self, action, handler_time, latency):
+        self.messages += 1
+        self.handler_times[action].append(handler_time)
+        self.latencies.append(latency)
+
+    def report(self, out=sys.stdout):
+        write = out.write
+        rate = self.messages / self.elapsed if self.elapsed else 0.0
+        write('%d messages in %.3fs: %.0f msgs/sec, %d replies\n' % (
+            self.messages, self.elapsed, rate, self.replies))
+        latencies = sorted(self.latencies)
+        write('latency ms: p50 %.3f  p95 %.3f  p99 %.3f  max %.3f\n' % (
+            percentile(latencies, 50) * 1e3,
+            percentile(latencies, 95) * 1e3,
+            percentile(latencies, 99) * 1e3,
+            (latencies[-1] if latencies else 0.0) * 1e3))
+        write('%-28s %8s %10s %10s %10s\n' % (
+            'action', 'count', 'total ms', 'mean us', 'p95 us'))
+        items = sorted(
+            self.handler_times.iteritems(), key=lambda item: -sum(item[1])
+        )
+        for action, times in items:
+            total = sum(times)
+            times = sorted(times)
+            write('%-28s %8d %10.2f %10.1f %10.1f\n' % (
+                action, len(times), total * 1e3,
+                total / len(times) * 1e6, percentile(times, 95) * 1e6))
+
+
+class CountingSocket(object):
+    """ A socket which counts the replies sent by the replayed side.
+
+    """
+    def __init__(self, stats):
+        self._stats = stats
+
+    def on_message(self, callback):
+        pass
+
+    def send(self, object_id, action, content):
+        self._stats.replies += 1
+
+
+def match_ids(recorded, live, id_map):
+    """ Map the object ids of recorded snapshot trees to live trees.
+
+    """
+    for rec_tree, live_tree in zip(recorded, live):
+        id_map[rec_tree['object_id']] = live_tree['object_id']
+        match_ids(rec_tree['children'], live_tree['children'], id_map)
+
+
+def replay(records, start, deliver, drain, realtime, observe=None):
+    """ Replay the records and collect the stats.
+
+    `start` is called for each session record and returns the message
+    handler for the session, or None if its messages are skipped. The
+    `drain` callable processes the deferred work of the event loop.
+    The optional `observe` callable is passed the (object_id, action,
+    content) of the records which are not delivered.
+
+    """
+    stats = ReplayStats()
+    handlers = {}
+    t0 = default_timer()
+    first = None
+    for kind, when, object_id, action, content in records:
+        if kind == SESSION:
+            handlers[object_id] = start(object_id, content, stats)
+            continue
+        if kind != deliver:
+            if observe is not None:
+                observe(object_id, action, content)
+            continue
+        if realtime:
+            if first is None:
+                first = when
+            delay = (when - first) - (default_timer() - t0)
+            if delay > 0:
+                time.sleep(delay)
+        handler = None
+        for session_id, session_handler in handlers.iteritems():
+            handler = session_handler(object_id)
+            if handler is not None:
+                break
+        if handler is None:
+            continue
+        t1 = default_timer()
+        handler(action, content)
+        t2 = default_timer()
+        drain(stats)
+        t3 = default_timer()
+        stats.add(action, t2 - t1, t3 - t1)
+    stats.elapsed = default_timer() - t0
+    return stats
+
+
+def replay_server(path, factories, realtime):
+    """ Replay the client messages of a recording to headless sessions.
+
+    """
+    from enaml.headless.asyncio_application import AsyncioApplication
+    app = AsyncioApplication(factories)
+    loop = app.loop()
+
+    def drain(stats):
+        # Deferred work, such as a session batch, may post more work,
+        # so the loop is cycled until a cycle produces no replies.
+        for idx in xrange(100):
+            replies = stats.replies
+            loop.call_soon(loop.stop)
+            loop.run_forever()
+            if replies == stats.replies and not app.has_pending_tasks():
+                break
+
+    # The id maps and the progressive snapshot chunks of each session,
+    # keyed by the recorded session id. The chunks are stored as a
+    # (recorded, live) pair of lists.
+    id_maps = {}
+    chunks = {}
+
+    def match_chunks(recorded_id, id_map):
+        recorded, live = chunks[recorded_id]
+        while recorded and live:
+            rec_items = recorded.pop(0)['items']
+            live_items = live.pop(0)['items']
+            for rec_item, live_item in zip(rec_items, live_items):
+                match_ids(rec_item['added'], live_item['added'], id_map)
+
+    def start(recorded_id, content, stats):
+        session_id = app.start_session(content['name'])
+        session = app.session(session_id)
+        id_map = {recorded_id: session_id}
+        chunks[recorded_id] = ([], [])
+        opened = []
+
+        def on_client_message(object_id, action, msg_content):
+            if object_id == session_id and action == 'open':
+                opened.append(msg_content)
+                return
+            stats.replies += 1
+            if object_id == session_id and action == 'snapshot_chunk':
+                chunks[recorded_id][1].append(msg_content)
+                match_chunks(recorded_id, id_map)
+
+        app.client_socket(session_id).on_message(on_client_message)
+        # The snapshot is delivered to the client on the event loop.
+        while not opened:
+            loop.call_soon(loop.stop)
+            loop.run_forever()
+        match_ids(content['snapshot'], opened[0]['snapshot'], id_map)
+        id_maps[recorded_id] = id_map
+
+        def handler(object_id):
+            live_id = id_map.get(object_id)
+            if live_id is not None:
+                return lambda action, content: session.on_message(
+                    live_id, action, content
+                )
+        return handler
+
+    def observe(object_id, action, content):
+        if action == 'snapshot_chunk' and object_id in chunks:
+            chunks[object_id][0].append(content)
+            match_chunks(object_id, id_maps[object_id])
+
+    try:
+        return replay(
+            read_traffic(path), start, CLIENT, drain, realtime, observe
+        )
+    finally:
+        app.destroy()
+
+
+def replay_client(path, realtime):
+    """ Replay the server messages of a recording to Qt sessions.
+
+    """
+    from enaml.qt.qt.QtGui import QApplication
+    from enaml.qt.qt_session import QtSession
+    qapp = QApplication.instance() or QApplication([])
+
+    def start(session_id, content, stats):
+        qt_session = QtSession(session_id, content['widget_groups'])
+        qt_session.open(content['snapshot'])
+        qt_session.activate(CountingSocket(stats))
+        objects = qt_session._registered_objects
+
+        def handler(object_id):
+            if object_id == session_id or object_id in objects:
+                return lambda action, content: qt_session.on_message(
+                    object_id, action, content
+                )
+        return handler
+
+    drain = lambda stats: qapp.processEvents()
+    return replay(read_traffic(path), start, SERVER, drain, realtime)
+
+
+def load_factories(spec):
+    """ Load the list of session factories named by `module:attr`.
+
+    """
+    module_name, attr = spec.split(':')
+    module = __import__(module_name, fromlist=[attr])
+    return getattr(module, attr)
+
+
+def main(argv):
+    realtime = '--realtime' in argv
+    args = [arg for arg in argv if arg != '--realtime']
+    if len(args) < 2 or args[0] not in ('server', 'client'):
+        print __doc__
+        return 1
+    if args[0] == 'server':
+        if len(args) < 3:
+            print __doc__
+            return 1
+        stats = replay_server(args[1], load_factories(args[2]), realtime)
+    else:
+        stats = replay_client(args[1], realtime)
+    stats.report()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -7,6 +7,7 @@ from heapq import heappush, heappop
 from itertools import count
 import logging
 from threading import Lock
+from timeit import default_timer
 
 
 logger = logging.getLogger(__name__)
@@ -20,7 +21,7 @@ class ScheduledTask(object):
     #: undefined or that the task has not yet been executed.
     undefined = object()
 
-    def __init__(self, callback, args, kwargs):
+    def __init__(self, callback, args, kwargs, key=None):
         """ Initialize a ScheduledTask.
 
         Parameters
@@ -34,6 +35,10 @@ class ScheduledTask(object):
         kwargs : dict
             The dict of keyword arguments to pass to the callback.
 
+        key : object, optional
+            The hashable coalescing key for the task, or None if the
+            task should not be coalesced.
+
         """
         self._callback = callback
         self._args = args
@@ -42,6 +47,8 @@ class ScheduledTask(object):
         self._valid = True
         self._pending = True
         self._notify = None
+        self._key = key
+        self._enqueued = None
 
     #--------------------------------------------------------------------------
     # Private API
@@ -83,6 +90,13 @@ class ScheduledTask(object):
         """
         return self._pending
 
+    def key(self):
+        """ Returns the coalescing key for the task, or None if the
+        task was scheduled without a key.
+
+        """
+        return self._key
+
     def unschedule(self):
         """ Unschedule the task so that it will not be executed. If
         the task has already been executed, this call has no effect.
@@ -151,30 +165,92 @@ class Application(object):
         self._task_heap = []
         self._counter = count()
         self._heap_lock = Lock()
+        self._heap_draining = False
+        self._keyed_tasks = {}
+        self._task_budget = 0
+        self._worker_count = 4
+        self._thread_pool = None
+        self._process_pool = None
+        self._pool_lock = Lock()
+        self._stats = None
+        self._stats_token = None
+        self._recorder = None
+        self._session_store = None
         self.add_factories(factories)
 
     #--------------------------------------------------------------------------
     # Private API
     #--------------------------------------------------------------------------
-    def _process_task(self, task):
-        """ Processes the given task, then dispatches the next task.
+    def _process_tasks(self):
+        """ Processes tasks from the heap on the main gui thread.
+
+        Tasks are pulled from the heap in priority order and executed
+        until the heap is empty or the task budget for the current
+        cycle of the event loop is exhausted. At least one task is
+        always processed per cycle. If tasks remain, the processing
+        is continued on the next cycle so that other events may be
+        handled in the interim.
+
+        """
+        heap = self._task_heap
+        lock = self._heap_lock
+        keyed = self._keyed_tasks
+        deadline = default_timer() + self._task_budget / 1000.0
+        try:
+            while True:
+                with lock:
+                    if not heap:
+                        break
+                    priority, ignored, task = heappop(heap)
+                    key = task._key
+                    if key is not None and keyed.get(key) is task:
+                        del keyed[key]
+                stats = self._stats
+                if stats is None:
+                    task._execute()
+                else:
+                    self._execute_with_stats(task, stats)
+                if default_timer() >= deadline:
+                    break
+        finally:
+            with lock:
+                if heap:
+                    self.deferred_call(self._process_tasks)
+                else:
+                    self._heap_draining = False
+
+    def _execute_with_stats(self, task, stats):
+        """ Execute a task and record its timing in the given stats.
 
         """
+        callback = task._callback
+        start = default_timer()
+        enqueued = task._enqueued
+        if enqueued is not None:
+            wait = (start - enqueued) * 1000.0
+        else:
+            wait = None
         try:
             task._execute()
         finally:
-            self._next_task()
+            elapsed = (default_timer() - start) * 1000.0
+            stats.task_executed(callback, wait, elapsed)
 
-    def _next_task(self):
-        """ Pulls the next task off the heap and processes it on the
-        main gui thread.
+    def _log_stats(self, token, ms, hook):
+        """ Periodically report the scheduler stats.
+
+        The reporting stops when stats collection is disabled or is
+        re-enabled with a new reporting interval.
 
         """
-        heap = self._task_heap
-        with self._heap_lock:
-            if heap:
-                priority, ignored, task = heappop(heap)
-                self.deferred_call(self._process_task, task)
+        stats = self._stats
+        if stats is None or token is not self._stats_token:
+            return
+        if hook is not None:
+            hook(stats.snapshot())
+        else:
+            logger.info(stats.summary())
+        self.timed_call(ms, self._log_stats, token, ms, hook)
 
     #--------------------------------------------------------------------------
     # Abstract API
@@ -312,11 +388,19 @@ class Application(object):
     #--------------------------------------------------------------------------
     # Public API
     #--------------------------------------------------------------------------
-    def schedule(self, callback, args=None, kwargs=None, priority=0):
+    def schedule(self, callback, args=None, kwargs=None, priority=0,
+                 key=None):
         """ Schedule a callable to be executed on the event loop thread.
 
         This call is thread-safe.
 
+        If a coalescing key is provided and a task with the same key
+        is still pending execution, the callback and arguments of the
+        pending task are replaced with the new values and the pending
+        task is returned. The pending task retains its position in the
+        queue and its notifier. This allows related work which is
+        scheduled repeatedly to be collapsed into a single execution.
+
         Parameters
         ----------
         callback : callable
@@ -333,6 +417,11 @@ class Application(object):
             lower priority, larger values indicate higher priority. The
             default priority is zero.
 
+        key : object, optional
+            A hashable key used to coalesce the task with a pending
+            task which was scheduled with the same key. The default
+            is None and indicates the task should not be coalesced.
+
         Returns
         -------
         result : ScheduledTask
@@ -345,19 +434,359 @@ class Application(object):
             args = ()
         if kwargs is None:
             kwargs = {}
-        task = ScheduledTask(callback, args, kwargs)
         heap = self._task_heap
+        keyed = self._keyed_tasks
         with self._heap_lock:
-            needs_start = len(heap) == 0
+            if key is not None:
+                task = keyed.get(key)
+                if task is not None and task._valid:
+                    task._callback = callback
+                    task._args = args
+                    task._kwargs = kwargs
+                    return task
+            task = ScheduledTask(callback, args, kwargs, key)
+            if key is not None:
+                keyed[key] = task
             item = (-priority, self._counter.next(), task)
             heappush(heap, item)
+            stats = self._stats
+            if stats is not None:
+                task._enqueued = default_timer()
+                stats.task_scheduled(len(heap))
+            needs_start = not self._heap_draining
+            self._heap_draining = True
         if needs_start:
-            if self.is_main_thread():
-                self._next_task()
+            self.deferred_call(self._process_tasks)
+        return task
+
+    def task_budget(self):
+        """ Get the time budget used when draining the task heap.
+
+        Returns
+        -------
+        result : float
+            The maximum number of milliseconds spent processing tasks
+            in a single cycle of the event loop before yielding to
+            other events. A value of zero indicates that a single task
+            is processed per cycle.
+
+        """
+        return self._task_budget
+
+    def set_task_budget(self, ms):
+        """ Set the time budget used when draining the task heap.
+
+        A larger budget allows a large number of queued tasks to be
+        processed in fewer cycles of the event loop, at the cost of
+        delaying the processing of user input events.
+
+        Parameters
+        ----------
+        ms : float
+            The maximum number of milliseconds to spend processing
+            tasks in a single cycle of the event loop. A value of zero
+            restores the default behavior of processing a single task
+            per cycle.
+
+        """
+        if ms < 0:
+            raise ValueError('The task budget must be non-negative')
+        self._task_budget = ms
+
+    def worker_count(self):
+        """ Get the maximum number of workers for the worker pools.
+
+        Returns
+        -------
+        result : int
+            The maximum number of threads or processes used by the
+            worker pools which run tasks passed to `submit`.
+
+        """
+        return self._worker_count
+
+    def set_worker_count(self, count):
+        """ Set the maximum number of workers for the worker pools.
+
+        The worker pools are created on demand, and the new value only
+        applies to pools which have not yet been created.
+
+        Parameters
+        ----------
+        count : int
+            The maximum number of threads or processes to use for the
+            worker pools which run tasks passed to `submit`.
+
+        """
+        if count < 1:
+            raise ValueError('The worker count must be positive')
+        self._worker_count = count
+
+    def submit(self, callback, args=None, kwargs=None, priority=0,
+               process=False):
+        """ Submit a callable to be executed by a background worker.
+
+        This call is thread-safe.
+
+        The callable is run on a worker thread, or a worker process if
+        requested, so that blocking work does not stall the event loop.
+        The result is delivered to the main event loop thread through
+        the task scheduler, where the notifier of the returned task is
+        invoked.
+
+        Parameters
+        ----------
+        callback : callable
+            The callable object to be executed. If `process` is True,
+            the callable and its arguments must be picklable.
+
+        args : tuple, optional
+            The positional arguments to pass to the callable.
+
+        kwargs : dict, optional
+            The keyword arguments to pass to the callable.
+
+        priority : int, optional
+            The priority for the callable. Smaller values indicate
+            lower priority, larger values indicate higher priority.
+            The priority is used to order the queue of a thread pool
+            and to schedule the delivery of the result. The default
+            priority is zero.
+
+        process : bool, optional
+            Whether to run the callable in a worker process instead of
+            a worker thread. The default is False.
+
+        Returns
+        -------
+        result : WorkerTask
+            A task object which can be used to cancel the task or
+            retrieve the results of the callback after the task has
+            been completed.
+
+        """
+        from enaml.worker_pool import (
+            WorkerTask, ThreadWorkerPool, ProcessWorkerPool
+        )
+        if args is None:
+            args = ()
+        if kwargs is None:
+            kwargs = {}
+        task = WorkerTask(callback, args, kwargs, priority)
+        with self._pool_lock:
+            if process:
+                pool = self._process_pool
+                if pool is None:
+                    pool = ProcessWorkerPool(self._worker_count)
+                    self._process_pool = pool
             else:
-                self.deferred_call(self._next_task)
+                pool = self._thread_pool
+                if pool is None:
+                    pool = ThreadWorkerPool(self._worker_count)
+                    self._thread_pool = pool
+        pool.submit(task)
         return task
 
+    def enable_stats(self, log_interval=0, log_hook=None):
+        """ Enable the collection of scheduler stats.
+
+        While enabled, the application records the depth of the task
+        heap, the wait latency and execution time of each task, and
+        the rate of deferred and timed calls. Collection is disabled
+        by default, in which case its cost is negligible. Enabling
+        stats collection resets any previously collected stats.
+
+        Parameters
+        ----------
+        log_interval : int, optional
+            The interval in milliseconds at which to report the stats.
+            The default is zero and indicates no periodic reporting.
+
+        log_hook : callable, optional
+            A callable which accepts the dict returned by `stats()` and
+            which will be invoked periodically on the main thread. The
+            default reports a summary of the stats to the logger.
+
+        """
+        from enaml.scheduler_stats import SchedulerStats
+        self._stats = SchedulerStats()
+        token = self._stats_token = object()
+        if log_interval > 0:
+            args = (token, log_interval, log_hook)
+            self.timed_call(log_interval, self._log_stats, *args)
+
+    def disable_stats(self):
+        """ Disable the collection of scheduler stats.
+
+        This also stops any periodic reporting of the stats.
+
+        """
+        self._stats = None
+        self._stats_token = None
+
+    def stats(self):
+        """ Get the currently collected scheduler stats.
+
+        Returns
+        -------
+        result : dict or None
+            A dictionary of the collected counters, rates and histogram
+            summaries, or None if stats collection is not enabled. See
+            `SchedulerStats.snapshot` for the contents of the dict.
+
+        """
+        stats = self._stats
+        if stats is not None:
+            return stats.snapshot()
+
+    def recorder(self):
+        """ Get the traffic recorder for the application sessions.
+
+        Returns
+        -------
+        result : TrafficRecorder or None
+            The recorder of the session traffic, or None if the traffic
+            is not recorded.
+
+        """
+        return self._recorder
+
+    def set_recorder(self, recorder):
+        """ Set the traffic recorder for the application sessions.
+
+        The traffic of the sessions which are started after the call is
+        recorded. The recordings can be replayed with the script in
+        `benchmarks/replay_traffic.py`.
+
+        Parameters
+        ----------
+        recorder : TrafficRecorder or None
+            The recorder to use for the session traffic, or None to
+            stop recording new sessions.
+
+        """
+        self._recorder = recorder
+
+    def session_store(self):
+        """ Get the store for hibernated sessions.
+
+        Returns
+        -------
+        result : SessionStore or None
+            The store used to hibernate sessions, or None if sessions
+            cannot be hibernated.
+
+        """
+        return self._session_store
+
+    def set_session_store(self, store):
+        """ Set the store for hibernated sessions.
+
+        Parameters
+        ----------
+        store : SessionStore or None
+            The store to use to hibernate sessions, for example a
+            DirectorySessionStore, or None to disable hibernation.
+
+        """
+        self._session_store = store
+
+    def hibernate_session(self, session_id):
+        """ Hibernate a session to the session store.
+
+        The state of the session windows is saved to the store, and the
+        session is ended to free its objects. The client is sent a
+        'hibernate' action before the session is closed. The session
+        can be rebuilt with `resume_session`.
+
+        Parameters
+        ----------
+        session_id : str
+            The unique identifier of the session to hibernate.
+
+        """
+        from enaml.hibernation import capture_session
+        store = self._session_store
+        if store is None:
+            raise RuntimeError('The application has no session store')
+        session = self.session(session_id)
+        if session is None:
+            raise ValueError('Invalid session id')
+        data = {
+            'name': session.factory_name,
+            'state': capture_session(session),
+        }
+        store.save(session_id, data)
+        session.send(session_id, 'hibernate', {})
+        self.end_session(session_id)
+
+    def resume_session(self, session_id):
+        """ Resume a session from the session store.
+
+        A new session is started by the factory of the hibernated
+        session, and the saved state is restored onto its windows.
+
+        Parameters
+        ----------
+        session_id : str
+            The unique identifier of the hibernated session.
+
+        Returns
+        -------
+        result : str
+            The unique identifier of the resumed session.
+
+        """
+        from enaml.hibernation import restore_session
+        store = self._session_store
+        if store is None:
+            raise RuntimeError('The application has no session store')
+        data = store.load(session_id)
+        if data is None:
+            raise ValueError('Invalid hibernated session id')
+        new_id = self.start_session(data['name'])
+        restore_session(self.session(new_id), data['state'])
+        store.delete(session_id)
+        return new_id
+
+    def hibernate_idle_sessions(self, idle_time):
+        """ Hibernate the sessions which have been idle for a time.
+
+        Parameters
+        ----------
+        idle_time : float
+            The number of seconds since the last client message after
+            which a session is hibernated.
+
+        Returns
+        -------
+        result : list
+            The identifiers of the hibernated sessions.
+
+        """
+        ids = [
+            session.session_id for session in self.sessions()
+            if session.idle_time() >= idle_time
+        ]
+        for session_id in ids:
+            self.hibernate_session(session_id)
+        return ids
+
+    def session_usage(self):
+        """ Get the resources used by each session of the application.
+
+        Returns
+        -------
+        result : dict
+            A dict mapping the identifier of each session to the usage
+            dict returned by its `usage` method.
+
+        """
+        return dict(
+            (session.session_id, session.usage())
+            for session in self.sessions()
+        )
+
     def has_pending_tasks(self):
         """ Get whether or not the application has pending tasks.
 
@@ -419,6 +848,11 @@ class Application(object):
         """
         for session in self.sessions():
             self.end_session(session.session_id)
+        for pool in (self._thread_pool, self._process_pool):
+            if pool is not None:
+                pool.shutdown(wait=False)
+        self._thread_pool = None
+        self._process_pool = None
         self._all_factories = []
         self._named_factories = {}
         Application._instance = None
@@ -498,7 +932,7 @@ def is_main_thread():
     return app.is_main_thread()
 
 
-def schedule(callback, args=None, kwargs=None, priority=0):
+def schedule(callback, args=None, kwargs=None, priority=0, key=None):
     """ Schedule a callable to be executed on the event loop thread.
 
     This call is thread-safe.
@@ -523,6 +957,11 @@ def schedule(callback, args=None, kwargs=None, priority=0):
         lower priority, larger values indicate higher priority. The
         default priority is zero.
 
+    key : object, optional
+        A hashable key used to coalesce the task with a pending task
+        which was scheduled with the same key. The default is None and
+        indicates the task should not be coalesced.
+
     Returns
     -------
     result : ScheduledTask
@@ -534,5 +973,47 @@ def schedule(callback, args=None, kwargs=None, priority=0):
     app = Application.instance()
     if app is None:
         raise RuntimeError('Application instance does not exist')
-    return app.schedule(callback, args, kwargs, priority)
+    return app.schedule(callback, args, kwargs, priority, key)
+
+
+def submit(callback, args=None, kwargs=None, priority=0, process=False):
+    """ Submit a callable to be executed by a background worker.
+
+    This call is thread-safe.
+
+    This is a convenience function for invoking the same method on the
+    current application instance. If an application instance does not
+    exist, a RuntimeError will be raised.
+
+    Parameters
+    ----------
+    callback : callable
+        The callable object to be executed. If `process` is True, the
+        callable and its arguments must be picklable.
+
+    args : tuple, optional
+        The positional arguments to pass to the callable.
+
+    kwargs : dict, optional
+        The keyword arguments to pass to the callable.
+
+    priority : int, optional
+        The priority for the callable. Smaller values indicate lower
+        priority, larger values indicate higher priority. The default
+        priority is zero.
 
+    process : bool, optional
+        Whether to run the callable in a worker process instead of a
+        worker thread. The default is False.
+
+    Returns
+    -------
+    result : WorkerTask
+        A task object which can be used to cancel the task or retrieve
+        the results of the callback after the task has been completed.
+
+    """
+    app = Application.instance()
+    if app is None:
+        raise RuntimeError('Application instance does not exist')
+    return app.submit(callback, args, kwargs, priority, process)
@@ -9,4 +9,5 @@ from .looper import Looper
 from .messenger import Messenger
 from .object import Object
 from .templated import Templated
+from .transaction import transaction, transactional
 
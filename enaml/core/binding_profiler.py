@@ -0,0 +1,246 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" An opt-in profiler for the evaluation of expression bindings.
+
+When the profiler is enabled, the standard expressions time each call
+of their function and record it by the source location of the binding:
+the filename, the line number and the enamldef block recorded by the
+compiler, along with the operator of the binding. Subscription
+expressions also record the number of traits on which they depend, and
+the number of times their dependencies changed after the first
+evaluation, which indicates bindings with churning dependencies.
+
+"""
+import sys
+from timeit import default_timer
+
+from .funchelper import call_func
+
+
+class BindingStats(object):
+    """ The statistics collected for a single binding.
+
+    """
+    __slots__ = ('count', 'total', 'max', 'dependencies', 'resubscriptions')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.dependencies = 0
+        self.resubscriptions = 0
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'max': self.max,
+            'dependencies': self.dependencies,
+            'resubscriptions': self.resubscriptions,
+        }
+
+
+class BindingProfiler(object):
+    """ An object which collects the evaluation statistics of bindings.
+
+    """
+    def __init__(self):
+        """ Initialize a BindingProfiler.
+
+        """
+        self._stats = {}
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _entry(self, func, operator):
+        """ Get the statistics of the binding of a function.
+
+        """
+        code = func.func_code
+        key = (code.co_filename, code.co_firstlineno, func.func_name, operator)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = BindingStats()
+        return stats
+
+    #--------------------------------------------------------------------------
+    # Public API
+    #--------------------------------------------------------------------------
+    def call(self, func, operator, args, scope):
+        """ Call the function of a binding and record the time taken.
+
+        Parameters
+        ----------
+        func : types.FunctionType
+            The function created for the binding.
+
+        operator : str
+            The operator of the binding.
+
+        args : tuple
+            The arguments to pass to the function.
+
+        scope : DynamicScope
+            The scope in which to call the function.
+
+        Returns
+        -------
+        result : object
+            The result of the function.
+
+        """
+        start = default_timer()
+        try:
+            return call_func(func, args, {}, scope)
+        finally:
+            self.record_call(func, operator, default_timer() - start)
+
+    def record_call(self, func, operator, elapsed):
+        """ Record an evaluation of a binding which was timed by the
+        caller.
+
+        Parameters
+        ----------
+        func : types.FunctionType
+            The function created for the binding.
+
+        operator : str
+            The operator of the binding.
+
+        elapsed : float
+            The time taken by the evaluation, in seconds.
+
+        """
+        stats = self._entry(func, operator)
+        stats.count += 1
+        stats.total += elapsed
+        if elapsed > stats.max:
+            stats.max = elapsed
+
+    def record_dependencies(self, func, operator, count, resubscribed):
+        """ Record the dependencies of a subscription binding.
+
+        Parameters
+        ----------
+        func : types.FunctionType
+            The function created for the binding.
+
+        operator : str
+            The operator of the binding.
+
+        count : int
+            The number of traits on which the binding depends.
+
+        resubscribed : bool
+            Whether the dependencies of the binding have changed since
+            its previous evaluation.
+
+        """
+        stats = self._entry(func, operator)
+        stats.dependencies = count
+        if resubscribed:
+            stats.resubscriptions += 1
+
+    def reset(self):
+        """ Discard the collected statistics.
+
+        """
+        self._stats = {}
+
+    def stats(self):
+        """ Get the collected statistics.
+
+        Returns
+        -------
+        result : dict
+            A dict mapping the (filename, lineno, block, operator) of
+            each binding to a dict with its evaluation 'count', the
+            'total' and 'max' time in seconds, the number of traced
+            'dependencies' and the number of 'resubscriptions'.
+
+        """
+        return dict(
+            (key, stats.as_dict()) for key, stats in self._stats.iteritems()
+        )
+
+    def report(self, out=None, sort='total', limit=None):
+        """ Write a table of the collected statistics.
+
+        Parameters
+        ----------
+        out : file, optional
+            The file to which to write the table. The default is
+            `sys.stdout`.
+
+        sort : str, optional
+            The statistic by which to sort the bindings, in decreasing
+            order. The default is 'total'.
+
+        limit : int, optional
+            The maximum number of bindings to write. The default writes
+            all of the bindings.
+
+        """
+        if out is None:
+            out = sys.stdout
+        write = out.write
+        items = sorted(
+            self._stats.iteritems(),
+            key=lambda item: getattr(item[1], sort),
+            reverse=True,
+        )
+        if limit is not None:
+            items = items[:limit]
+        write('%-40s %-16s %-4s %8s %10s %10s %10s %5s %6s\n' % (
+            'location', 'block', 'op', 'count', 'total ms', 'mean us',
+            'max us', 'deps', 'resubs'))
+        for (filename, lineno, block, operator), stats in items:
+            location = '%s:%d' % (filename, lineno)
+            if len(location) > 40:
+                location = '...' + location[-37:]
+            mean = stats.total / stats.count if stats.count else 0.0
+            write('%-40s %-16s %-4s %8d %10.2f %10.1f %10.1f %5d %6d\n' % (
+                location, block[:16], operator, stats.count,
+                stats.total * 1e3, mean * 1e6, stats.max * 1e6,
+                stats.dependencies, stats.resubscriptions))
+
+
+#: The active profiler, or None if bindings are not being profiled.
+#: This is read by the expressions on each evaluation and should be
+#: changed with `enable_profiler` and `disable_profiler`.
+active = None
+
+
+def enable_profiler():
+    """ Start profiling the evaluation of bindings.
+
+    Returns
+    -------
+    result : BindingProfiler
+        The active profiler. A new profiler is created if there is no
+        active profiler.
+
+    """
+    global active
+    if active is None:
+        active = BindingProfiler()
+    return active
+
+
+def disable_profiler():
+    """ Stop profiling the evaluation of bindings.
+
+    Returns
+    -------
+    result : BindingProfiler or None
+        The profiler which was active, which holds the statistics
+        collected until now.
+
+    """
+    global active
+    profiler = active
+    active = None
+    return profiler
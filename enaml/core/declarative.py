@@ -5,13 +5,14 @@
 from types import FunctionType
 
 from traits.api import (
-    Any, Property, Disallow, ReadOnly, CTrait, Instance, Uninitialized,
+    Any, Property, Disallow, ReadOnly, CTrait, Uninitialized,
 )
 
 from .dynamic_scope import DynamicAttributeError
 from .exceptions import DeclarativeNameError, OperatorLookupError
 from .object import Object
 from .operator_context import OperatorContext
+from .operators import op_simple
 from .trait_types import EnamlInstance, EnamlEvent
 
 
@@ -90,7 +91,7 @@ def _compute_default(obj, name):
     except Exception:
         import traceback
         # XXX I'd rather not hack into Declarative's private api.
-        expr = obj._expressions[name]
+        expr = obj._bound_expression(name)
         filename = expr._func.func_code.co_filename
         lineno = expr._func.func_code.co_firstlineno
         args = (filename, lineno, traceback.format_exc())
@@ -114,10 +115,12 @@ def _set_quiet(obj, name, value):
     if owned:
         obj._trait_change_notify(False)
         q.add(obj)
-    setattr(obj, name, value)
-    if owned:
-        obj._trait_change_notify(True)
-        q.discard(obj)
+    try:
+        setattr(obj, name, value)
+    finally:
+        if owned:
+            obj._trait_change_notify(True)
+            q.discard(obj)
 
 
 def _wired_getter(obj, name):
@@ -173,6 +176,49 @@ def _wire_default(obj, name):
     obj._instance_traits()[name] = trait
 
 
+def _binding_slot(cls, table_name, name):
+    """ Get the index of the binding slot for an attribute name.
+
+    This is a private function used by Declarative to lay out the bound
+    expressions and listeners of its instances. Each class owns a table
+    which maps an attribute name to the index of its slot in the
+    binding lists of the instances of that class. The table is not
+    inherited by subclasses, since the slots of a subclass are laid
+    out independently. A slot is added the first time a name is bound
+    on any instance of the class.
+
+    """
+    table = cls.__dict__.get(table_name)
+    if table is None:
+        table = {}
+        setattr(cls, table_name, table)
+    index = table.get(name)
+    if index is None:
+        index = table[name] = len(table)
+    return index
+
+
+def _binding_index(obj, table_name, name):
+    """ Get the index of the binding slot of a name for an object.
+
+    This returns None if the name has never been bound on an instance
+    of the object's class.
+
+    """
+    table = type(obj).__dict__.get(table_name)
+    if table is not None:
+        return table.get(name)
+
+
+def _ensure_slot(slots, index):
+    """ Grow a list of binding slots to hold the given index.
+
+    """
+    missing = index + 1 - len(slots)
+    if missing > 0:
+        slots.extend([None] * missing)
+
+
 class ListenerNotifier(object):
     """ A lightweight trait change notifier used by Declarative.
 
@@ -223,6 +269,84 @@ def scope_lookup(name, scope, description):
     return item
 
 
+def _binding_function(binding, f_globals):
+    """ Get the function for the code of a binding.
+
+    The functions are cached on the binding dict for each globals dict,
+    since the same description is used to populate every instance of a
+    declarative type, such as the items created by a Looper. A function
+    holds no per-instance state, which is kept by the expression object
+    created by the operator, so a single function can be shared by all
+    of the instances.
+
+    """
+    cache = binding.get('func_cache')
+    if cache is None:
+        cache = binding['func_cache'] = {}
+    # The globals are stored with the function, which keeps them alive
+    # for as long as the cache entry and prevents reuse of their id.
+    entry = cache.get(id(f_globals))
+    if entry is not None:
+        return entry[1]
+    code = binding['code']
+    # The functions are named for the enamldef block of the binding,
+    # which identifies the binding in the binding profiler.
+    block = binding['block']
+    # If the code is a tuple, it represents a delegation
+    # expression which is a combination of subscription
+    # and update functions.
+    if isinstance(code, tuple):
+        sub_code, upd_code = code
+        func = FunctionType(sub_code, f_globals, block)
+        func._update = FunctionType(upd_code, f_globals, block)
+    else:
+        func = FunctionType(code, f_globals, block)
+    # The static dependencies extracted by the compiler tell the
+    # operator that the function was compiled without code tracing.
+    dependencies = binding.get('dependencies')
+    if dependencies is not None:
+        func._dependencies = dependencies
+    cache[id(f_globals)] = (f_globals, func)
+    return func
+
+
+def _assign_constant(obj, name, value):
+    """ Assign the value of a constant `=` binding to an attribute.
+
+    The value is assigned quietly, in the same way as the default value
+    computed by a bound expression, without creating an expression. The
+    value is not assigned if an expression is already bound to the name
+    by an earlier block, since it must be replaced, if the attribute is
+    an event, or if the value is rejected by the trait, so the error is
+    reported by the expression. The name is recorded in the constants
+    of the object, so that an expression bound by a later block, such
+    as the block which instantiates the object, replaces the value.
+
+    Returns
+    -------
+    result : bool
+        True if the value was assigned, False if the binding should be
+        bound as an expression.
+
+    """
+    trait = obj.trait(name)
+    if trait is None or trait.trait_type is Disallow:
+        return False
+    if trait.type == 'event' or isinstance(trait.trait_type, EnamlEvent):
+        return False
+    if obj._bound_expression(name) is not None:
+        return False
+    try:
+        _set_quiet(obj, name, value)
+    except Exception:
+        return False
+    constants = obj._constants
+    if constants is None:
+        constants = obj._constants = set()
+    constants.add(name)
+    return True
+
+
 def setup_bindings(instance, bindings, identifiers, f_globals):
     """ Setup the expression bindings for a declarative instance.
 
@@ -240,6 +364,12 @@ def setup_bindings(instance, bindings, identifiers, f_globals):
     f_globals : dict
         The globals dict to associate with the bindings.
 
+    Notes
+    -----
+    The value of a binding which the compiler marked as a 'constant' is
+    assigned directly, without an expression, as long as the operator
+    is the default `=` operator.
+
     """
     operators = instance.operators
     for binding in bindings:
@@ -251,16 +381,11 @@ def setup_bindings(instance, bindings, identifiers, f_globals):
             lineno = binding['lineno']
             block = binding['block']
             raise OperatorLookupError(opname, filename, lineno, block)
-        code = binding['code']
-        # If the code is a tuple, it represents a delegation
-        # expression which is a combination of subscription
-        # and update functions.
-        if isinstance(code, tuple):
-            sub_code, upd_code = code
-            func = FunctionType(sub_code, f_globals)
-            func._update = FunctionType(upd_code, f_globals)
-        else:
-            func = FunctionType(code, f_globals)
+        if operator is op_simple and 'constant' in binding:
+            name = binding['name']
+            if _assign_constant(instance, name, binding['constant']):
+                continue
+        func = _binding_function(binding, f_globals)
         operator(instance, binding['name'], func, identifiers)
 
 
@@ -286,19 +411,24 @@ class Declarative(Object):
     #: by user code.
     operators = ReadOnly
 
-    #: The dictionary of bound expression objects. XXX These dicts are
-    #: typically small and waste space. We need to switch to a more
-    #: space efficient hash table at some point in the future. For
-    #: pathological cases of large numbers of objects, the savings
-    #: can be as high as 20% of the heap size.
-    _expressions = Instance(dict, ())
-
-    #: The dictionary of bound listener objects. XXX These dicts are
-    #: typically small and waste space. We need to switch to a more
-    #: space efficient hash table at some point in the future. For
-    #: pathological cases of large numbers of objects, the savings
-    #: can be as high as 20% of the heap size.
-    _listeners = Instance(dict, ())
+    #: The list of bound expression objects, or None if no expression
+    #: is bound. The list is indexed by the binding slots of the class,
+    #: which are stored in the `_expression_slots` dict of the class.
+    #: A per-instance dict would be much larger than this list, which
+    #: matters for pathological cases of large numbers of objects. See
+    #: `benchmarks/bench_declarative_memory.py`.
+    _expressions = Any
+
+    #: The list of the lists of bound listener objects, or None if no
+    #: listener is bound. The list is indexed by the binding slots of
+    #: the class, which are stored in the `_listener_slots` dict of the
+    #: class.
+    _listeners = Any
+
+    #: The set of names which were assigned the value of a constant
+    #: binding, or None. The value is discarded when an expression is
+    #: later bound to the name, so that the expression provides it.
+    _constants = Any
 
     def __init__(self, parent=None, **kwargs):
         """ Initialize a declarative component.
@@ -401,6 +531,43 @@ class Declarative(Object):
     #--------------------------------------------------------------------------
     # Private API
     #--------------------------------------------------------------------------
+    def _bound_expression(self, name):
+        """ Get the expression bound to the given attribute name.
+
+        Returns
+        -------
+        result : AbstractExpression or None
+            The bound expression, or None if there is no expression
+            bound to the given name.
+
+        """
+        slots = self._expressions
+        if slots is not None:
+            index = _binding_index(self, '_expression_slots', name)
+            if index is not None and index < len(slots):
+                return slots[index]
+
+    def _binding_counts(self):
+        """ Get the number of expressions and listeners bound on this
+        object.
+
+        Returns
+        -------
+        result : tuple
+            The number of bound expressions and the number of bound
+            listeners.
+
+        """
+        expressions = self._expressions
+        n_expressions = 0
+        if expressions is not None:
+            n_expressions = len(expressions) - expressions.count(None)
+        listeners = self._listeners
+        n_listeners = 0
+        if listeners is not None:
+            n_listeners = sum(len(item) for item in listeners if item)
+        return n_expressions, n_listeners
+
     @classmethod
     def _add_user_attribute(cls, name, attr_type, is_event):
         """ A private classmethod used by the Enaml compiler machinery.
@@ -485,10 +652,20 @@ class Declarative(Object):
         if curr is None or curr.trait_type is Disallow:
             msg = "Cannot bind expression. %s object has no attribute '%s'"
             raise AttributeError(msg % (self, name))
-        dct = self._expressions
-        if name not in dct:
+        index = _binding_slot(type(self), '_expression_slots', name)
+        slots = self._expressions
+        if slots is None:
+            slots = self._expressions = []
+        _ensure_slot(slots, index)
+        if slots[index] is None:
+            # A value assigned by a constant binding would shadow the
+            # default computed by the expression.
+            constants = self._constants
+            if constants is not None and name in constants:
+                constants.discard(name)
+                self.__dict__.pop(name, None)
             _wire_default(self, name)
-        dct[name] = expression
+        slots[index] = expression
 
     def bind_listener(self, name, listener):
         """ A private method used by the Enaml execution engine.
@@ -513,12 +690,17 @@ class Declarative(Object):
         if curr is None or curr.trait_type is Disallow:
             msg = "Cannot bind listener. %s object has no attribute '%s'"
             raise AttributeError(msg % (self, name))
-        dct = self._listeners
-        if name not in dct:
-            dct[name] = [listener]
+        index = _binding_slot(type(self), '_listener_slots', name)
+        slots = self._listeners
+        if slots is None:
+            slots = self._listeners = []
+        _ensure_slot(slots, index)
+        listeners = slots[index]
+        if listeners is None:
+            slots[index] = [listener]
             self.add_notifier(name, ListenerNotifier)
         else:
-            dct[name].append(listener)
+            listeners.append(listener)
 
     def eval_expression(self, name):
         """ Evaluate a bound expression with the given name.
@@ -535,9 +717,9 @@ class Declarative(Object):
             if there is no expression bound to the given name.
 
         """
-        dct = self._expressions
-        if name in dct:
-            return dct[name].eval(self, name)
+        expression = self._bound_expression(name)
+        if expression is not None:
+            return expression.eval(self, name)
         return NotImplemented
 
     def refresh_expression(self, name):
@@ -568,8 +750,12 @@ class Declarative(Object):
             The new value to pass to the listeners.
 
         """
-        dct = self._listeners
-        if name in dct:
-            for listener in dct[name]:
-                listener.value_changed(self, name, old, new)
+        slots = self._listeners
+        if slots is not None:
+            index = _binding_index(self, '_listener_slots', name)
+            if index is not None and index < len(slots):
+                listeners = slots[index]
+                if listeners is not None:
+                    for listener in listeners:
+                        listener.value_changed(self, name, old, new)
 
@@ -63,6 +63,16 @@ class DynamicScope(object):
     so these scope objects should be created as needed and discarded in
     order to avoid unnecessary reference cycles.
 
+    The ancestor on which a name resolves is cached in the class of the
+    owner object, along with the types of the ancestors up to it. Names
+    which do not resolve on any ancestor, such as globals and builtins,
+    are cached with the types of all of the ancestors. A cached entry
+    is used only if the types of the ancestors of the owner still match
+    those recorded, so the entry is bypassed when an object is moved to
+    a different parent. This assumes that whether an object has an
+    attribute is determined by its type, which holds for the traits and
+    user attributes of declarative objects.
+
     """
     def __init__(self, obj, identifiers, overrides, listener):
         """ Initialize a DynamicScope.
@@ -109,8 +119,40 @@ class DynamicScope(object):
         dct = self._identifiers
         if name in dct:
             return dct[name]
-        parent = self._obj
+        obj = self._obj
+        cls = type(obj)
+        cache = cls.__dict__.get('_scope_resolutions')
+        if cache is None:
+            cache = {}
+            setattr(cls, '_scope_resolutions', cache)
+        entry = cache.get(name)
+        if entry is not None:
+            types, depth = entry
+            parent = obj
+            for item_type in types:
+                if type(parent) is not item_type:
+                    break
+                target = parent
+                parent = parent.parent
+            else:
+                if depth >= 0:
+                    try:
+                        value = getattr(target, name)
+                    except DynamicAttributeError:
+                        raise
+                    except AttributeError:
+                        pass
+                    else:
+                        listener = self._listener
+                        if listener is not None:
+                            listener.dynamic_load(target, name, value)
+                        return value
+                elif parent is None:
+                    raise KeyError(name)
+        types = []
+        parent = obj
         while parent is not None:
+            types.append(type(parent))
             try:
                 value = getattr(parent, name)
             except DynamicAttributeError:
@@ -118,10 +160,12 @@ class DynamicScope(object):
             except AttributeError:
                 parent = parent.parent
             else:
+                cache[name] = (tuple(types), len(types) - 1)
                 listener = self._listener
                 if listener is not None:
                     listener.dynamic_load(parent, name, value)
                 return value
+        cache[name] = (tuple(types), -1)
         raise KeyError(name)
 
     def __setitem__(self, name, value):
@@ -67,7 +67,19 @@ from .code_tracing import inject_tracing, inject_inversion
 #     out the object tree has been shifted to the Declarative class. This
 #     is a touch slower, but provides a ton more flexibility and enables
 #     templated components like `Looper` and `Conditional`.
-COMPILER_VERSION = 8
+# 9 : Extract static dependencies - 16 October 2026
+#     This updates the compiler to detect subscription and delegation
+#     expressions which are a dotted attribute chain off of a name, such
+#     as `model.name`. The dependencies of these expressions are known
+#     statically, so their functions are compiled without code tracing
+#     and the name chain is added to the binding dict as the
+#     'dependencies' of the binding.
+# 10 : Mark constant bindings - 16 October 2026
+#     This updates the compiler to detect `=` expressions which are a
+#     literal or a tuple of literals. The value of the expression is
+#     added to the binding dict as its 'constant', so the value can be
+#     assigned directly when the object is populated.
+COMPILER_VERSION = 10
 
 
 # The Enaml compiler translates an Enaml AST into a decription dict
@@ -132,6 +144,16 @@ COMPILER_VERSION = 8
 #         },
 #     ],
 # }
+#
+# The binding dicts of `<<` and `:=` expressions which are a dotted
+# attribute chain off of a name have an additional 'dependencies' key
+# whose value is the tuple of names in the chain. For example, the
+# binding `text << model.name` has the dependencies ('model', 'name').
+#
+# The binding dicts of `=` expressions which are a literal, or a tuple
+# of literals, have an additional 'constant' key whose value is the
+# value of the expression. For example, the binding `text = 'clickme'`
+# above has the constant 'clickme'.
 
 
 #------------------------------------------------------------------------------
@@ -362,6 +384,147 @@ def compile_delegate(py_ast, filename):
     return (sub_code, upd_code)
 
 
+def static_dependencies(py_ast):
+    """ Get the static dependencies of an expression, if any.
+
+    The dependencies of an expression are statically determinable if
+    the expression is a dotted attribute chain off of a name, such as
+    `model.name` or `foo.bar.baz`, since every link of the chain is a
+    dependency of the expression.
+
+    Parameters
+    ----------
+    py_ast : ast.Expression
+        A Python ast Expression node.
+
+    Returns
+    -------
+    result : tuple or None
+        The tuple of names in the chain, or None if the dependencies
+        of the expression must be traced at run time.
+
+    """
+    names = []
+    node = py_ast.body
+    while isinstance(node, ast.Attribute):
+        names.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    if node.id in ('None', 'True', 'False'):
+        return None
+    names.append(node.id)
+    names.reverse()
+    return tuple(names)
+
+
+def _fold_constant(node):
+    """ Fold an ast node into a constant value.
+
+    Raises
+    ------
+    ValueError
+        The node is not a constant.
+
+    """
+    if isinstance(node, ast.Num):
+        return node.n
+    if isinstance(node, ast.Str):
+        return node.s
+    if isinstance(node, ast.Name):
+        if node.id == 'None':
+            return None
+        if node.id == 'True':
+            return True
+        if node.id == 'False':
+            return False
+    elif isinstance(node, ast.UnaryOp):
+        if isinstance(node.op, (ast.USub, ast.UAdd)):
+            if isinstance(node.operand, ast.Num):
+                if isinstance(node.op, ast.USub):
+                    return -node.operand.n
+                return node.operand.n
+    elif isinstance(node, ast.Tuple):
+        return tuple(_fold_constant(item) for item in node.elts)
+    raise ValueError('not a constant')
+
+
+def constant_value(py_ast):
+    """ Get the constant value of an expression, if any.
+
+    An expression is constant if it is a number, a string, one of the
+    names None, True and False, or a tuple of constants. Mutable values
+    such as lists are not constant, since every object must be given a
+    new value.
+
+    Parameters
+    ----------
+    py_ast : ast.Expression
+        A Python ast Expression node.
+
+    Returns
+    -------
+    result : tuple or None
+        A 1-tuple holding the value of the expression, or None if the
+        expression is not constant.
+
+    """
+    try:
+        return (_fold_constant(py_ast.body),)
+    except ValueError:
+        return None
+
+
+def compile_static_subscribe(py_ast, filename):
+    """ Compile an ast into a code object implementing operator `<<`
+    for an expression with static dependencies.
+
+    The code object is compiled without code tracing, since the
+    dependencies of the expression are given by the chain of names
+    returned by `static_dependencies`.
+
+    Parameters
+    ----------
+    py_ast : ast.Expression
+        A Python ast Expression node.
+
+    filename : str
+        The filename which generated the expression.
+
+    Returns
+    -------
+    result : types.CodeType
+        A Python code object which implements the desired behavior.
+
+    """
+    # The code is the same as that of operator `=`.
+    return compile_simple(py_ast, filename)
+
+
+def compile_static_delegate(py_ast, filename):
+    """ Compile an ast into a code object implementing operator `:=`
+    for an expression with static dependencies.
+
+    Parameters
+    ----------
+    py_ast : ast.Expression
+        A Python ast Expression node.
+
+    filename : str
+        The filename which generated the expression.
+
+    Returns
+    -------
+    result : tuple
+        A 2-tuple of types.CodeType equivalent to operators `<<` with
+        static dependencies and `>>` respectively.
+
+    """
+    sub_code = compile_static_subscribe(py_ast, filename)
+    upd_code = compile_update(py_ast, filename)
+    return (sub_code, upd_code)
+
+
 COMPILE_OP_MAP = {
     '__operator_Equal__': compile_simple,
     '__operator_ColonColon__': compile_notify,
@@ -371,6 +534,12 @@ COMPILE_OP_MAP = {
 }
 
 
+STATIC_COMPILE_OP_MAP = {
+    '__operator_LessLess__': compile_static_subscribe,
+    '__operator_ColonEqual__': compile_static_delegate,
+}
+
+
 #------------------------------------------------------------------------------
 # Node Visitor
 #------------------------------------------------------------------------------
@@ -502,13 +671,22 @@ class DeclarationCompiler(_NodeVisitor):
         This visitor creates the binding dict for the given node and
         adds it to the bindings list for the object at the top of the
         stack. It compiles the python ast for the bound expression into
-        a code object that has been hooked for the given operator.
+        a code object that has been hooked for the given operator. The
+        dependencies of subscription expressions are added to the dict
+        when they can be determined statically, and so is the value of
+        a constant `=` expression.
 
         """
         obj = self.stack[-1]
         py_ast = node.binding.expr.py_ast
         op = node.binding.op
-        op_compiler = COMPILE_OP_MAP[op]
+        dependencies = None
+        if op in STATIC_COMPILE_OP_MAP:
+            dependencies = static_dependencies(py_ast)
+        if dependencies is not None:
+            op_compiler = STATIC_COMPILE_OP_MAP[op]
+        else:
+            op_compiler = COMPILE_OP_MAP[op]
         code = op_compiler(py_ast, self.filename)
         binding = {
             'operator': op,
@@ -518,6 +696,12 @@ class DeclarationCompiler(_NodeVisitor):
             'filename': self.filename,
             'block': self.block,
         }
+        if dependencies is not None:
+            binding['dependencies'] = dependencies
+        if op == '__operator_Equal__':
+            constant = constant_value(py_ast)
+            if constant is not None:
+                binding['constant'] = constant[0]
         obj['bindings'].append(binding)
 
     def visit_Instantiation(self, node):
@@ -3,14 +3,20 @@
 #  All rights reserved.
 #------------------------------------------------------------------------------
 from collections import namedtuple
+from timeit import default_timer
 from weakref import ref
 
-from traits.api import HasTraits, Disallow, TraitListObject, TraitDictObject
+from traits.api import (
+    HasTraits, Disallow, TraitListObject, TraitDictObject, Uninitialized
+)
+from traits.trait_notifiers import handle_exception
 
+from . import binding_profiler
 from .abstract_expressions import AbstractExpression, AbstractListener
 from .code_tracing import CodeTracer, CodeInverter
 from .dynamic_scope import DynamicScope, AbstractScopeListener, Nonlocals
 from .funchelper import call_func
+from .transaction import invalidate
 
 
 #------------------------------------------------------------------------------
@@ -231,6 +237,9 @@ class SimpleExpression(BaseExpression):
         overrides = {'nonlocals': Nonlocals(owner, None)}
         scope = DynamicScope(owner, self._f_locals, overrides, None)
         with owner.operators:
+            profiler = binding_profiler.active
+            if profiler is not None:
+                return profiler.call(self._func, '=', (), scope)
             return call_func(self._func, (), {}, scope)
 
 
@@ -262,7 +271,11 @@ class NotificationExpression(BaseExpression):
         }
         scope = DynamicScope(owner, self._f_locals, overrides, None)
         with owner.operators:
-            call_func(self._func, (), {}, scope)
+            profiler = binding_profiler.active
+            if profiler is not None:
+                profiler.call(self._func, '::', (), scope)
+            else:
+                call_func(self._func, (), {}, scope)
 
 
 AbstractListener.register(NotificationExpression)
@@ -289,7 +302,11 @@ class UpdateExpression(BaseExpression):
         inverter = StandardInverter(nonlocals)
         scope = DynamicScope(owner, self._f_locals, overrides, None)
         with owner.operators:
-            call_func(self._func, (inverter, new), {}, scope)
+            profiler = binding_profiler.active
+            if profiler is not None:
+                profiler.call(self._func, '>>', (inverter, new), scope)
+            else:
+                call_func(self._func, (inverter, new), {}, scope)
 
 
 AbstractListener.register(UpdateExpression)
@@ -299,12 +316,19 @@ AbstractListener.register(UpdateExpression)
 # Subcsription Expression
 #------------------------------------------------------------------------------
 class SubscriptionNotifier(object):
-    """ A simple object used for attaching notification handlers.
+    """ A trait change notifier which tracks the dependencies of an
+    expression.
+
+    The notifier is attached directly to the traits of the objects on
+    which the expression depends, in the same way as the notifiers
+    added with `Object.add_notifier`. When the dependencies change, it
+    is detached from the removed traits and attached to the added ones,
+    so the traits which remain are left untouched.
 
     """
     __slots__ = ('owner', 'name', 'keyval', '__weakref__')
 
-    def __init__(self, owner, name, keyval):
+    def __init__(self, owner, name):
         """ Initialize a SubscriptionNotifier.
 
         Parameters
@@ -315,17 +339,104 @@ class SubscriptionNotifier(object):
         name : str
             The name to which the expression is bound.
 
-        keyval : object
-            An object to use for testing equivalency of notifiers.
-
         """
-        self.owner = ref(owner)
+        # The notifiers are detached when the owner is deleted, since
+        # they are strongly referenced by the traits of dependencies.
+        self.owner = ref(owner, self._on_owner_deleted)
         self.name = name
-        self.keyval = keyval
+        # A dict mapping the (id(obj), name) of each dependency to a
+        # weakref to the object. The id is used to avoid keeping a
+        # strong reference to the object.
+        self.keyval = {}
+
+    def __call__(self, obj, name, old, new):
+        """ Called by traits to dispatch the notifier.
+
+        An error raised while refreshing the expression is handled by
+        the traits exception handler, as for the notifiers added with
+        `on_trait_change`, so it does not propagate to the code which
+        changed the trait or prevent the other notifiers from running.
+
+        """
+        if old is not Uninitialized:
+            try:
+                self.notify()
+            except Exception:
+                handle_exception(obj, name, old, new)
+
+    def equals(self, other):
+        """ Compares this notifier against another for equality.
+
+        """
+        return other is self
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _on_owner_deleted(self, owner_ref):
+        """ Detach the notifier from its dependencies.
+
+        """
+        self.update(())
+
+    #--------------------------------------------------------------------------
+    # Public API
+    #--------------------------------------------------------------------------
+    def update(self, traced):
+        """ Update the dependencies of the expression.
+
+        Parameters
+        ----------
+        traced : iterable
+            The (obj, name) pairs of the traits on which the expression
+            depends.
+
+        Returns
+        -------
+        result : bool
+            True if the dependencies have changed, False otherwise.
+
+        """
+        old = self.keyval
+        new = {}
+        added = False
+        for obj, attr in traced:
+            key = (id(obj), attr)
+            obj_ref = old.pop(key, None)
+            # The id of a deleted dependency may be reused by another
+            # object, so the weakref is checked before it is kept.
+            if obj_ref is None or obj_ref() is not obj:
+                obj._trait(attr, 2)._notifiers(1).append(self)
+                obj_ref = ref(obj)
+                added = True
+            new[key] = obj_ref
+        for (obj_id, attr), obj_ref in old.iteritems():
+            obj = obj_ref()
+            if obj is not None:
+                trait = obj._trait(attr, 0)
+                if trait is not None:
+                    notifiers = trait._notifiers(0)
+                    if notifiers and self in notifiers:
+                        notifiers.remove(self)
+        self.keyval = new
+        return added or len(old) > 0
 
     def notify(self):
         """ Notify that the expression is invalid.
 
+        The expression is refreshed immediately, unless the update is
+        queued by an active transaction.
+
+        """
+        owner = self.owner()
+        if owner is not None:
+            name = self.name
+            if not invalidate(self, (id(owner), name)):
+                owner.refresh_expression(name)
+
+    def refresh(self):
+        """ Refresh the expression, if its owner is still alive.
+
         """
         owner = self.owner()
         if owner is not None:
@@ -338,6 +449,9 @@ class SubscriptionExpression(BaseExpression):
     """
     __slots__ = ('_notifier')
 
+    #: The operator of the expression, used by the binding profiler.
+    operator = '<<'
+
     def __init__(self, func, f_locals):
         """ Initialize a SubscriptionExpression.
 
@@ -356,32 +470,143 @@ class SubscriptionExpression(BaseExpression):
         overrides = {'nonlocals': Nonlocals(owner, tracer)}
         scope = DynamicScope(owner, self._f_locals, overrides, tracer)
         with owner.operators:
-            result = call_func(self._func, (tracer,), {}, scope)
+            profiler = binding_profiler.active
+            if profiler is not None:
+                result = profiler.call(
+                    self._func, self.operator, (tracer,), scope
+                )
+            else:
+                result = call_func(self._func, (tracer,), {}, scope)
+        self._subscribe(owner, name, tracer.traced_items, profiler)
+        return result
 
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _subscribe(self, owner, name, traced, profiler):
+        """ Update the notifier with the traced dependencies.
+
+        Parameters
+        ----------
+        owner : Declarative
+            The declarative object which owns the expression.
+
+        name : str
+            The name to which the expression is bound.
+
+        traced : iterable
+            The (obj, name) pairs traced during the evaluation.
+
+        profiler : BindingProfiler or None
+            The active binding profiler, if any.
+
+        """
         # In most cases, the objects comprising the dependencies of an
         # expression will not change during subsequent evaluations of
-        # the expression. Rather than creating a new notifier on each
-        # pass and repeating the work of creating the change handlers,
-        # a key for the dependencies is computed and a new notifier is
-        # created only when the key changes. The key uses the id of an
-        # object instead of the object itself so strong references to
-        # the object are not maintained by the expression. A sorted
-        # tuple is used instead of a frozenset to reduced the memory
-        # footprint. It is slightly slower to compute but ~5x smaller.
-        traced = tracer.traced_items
-        keyval = tuple(sorted((id(obj), attr) for obj, attr in traced))
+        # the expression. A single notifier is kept for the expression
+        # and only the difference between the old and new dependencies
+        # is applied to the traits, which makes the common case cheap
+        # and keeps the cost of churning dependencies proportional to
+        # the number of changed dependencies.
         notifier = self._notifier
-        if notifier is None or keyval != notifier.keyval:
-            notifier = SubscriptionNotifier(owner, name, keyval)
-            self._notifier = notifier
-            handler = notifier.notify
-            for obj, attr in traced:
-                obj.on_trait_change(handler, attr)
+        if notifier is None:
+            notifier = self._notifier = SubscriptionNotifier(owner, name)
+            notifier.update(traced)
+            changed = False
+        else:
+            changed = notifier.update(traced)
+        if profiler is not None:
+            profiler.record_dependencies(
+                self._func, self.operator, len(notifier.keyval), changed
+            )
+
+
+AbstractExpression.register(SubscriptionExpression)
+
+
+class StaticSubscriptionExpression(SubscriptionExpression):
+    """ An implementation of AbstractExpression for the `<<` operator
+    with static dependencies.
+
+    The compiler extracts the dependencies of an expression which is a
+    dotted attribute chain off of a name, such as `model.name`, and
+    compiles its function without code tracing. The chain of names is
+    given by the `_dependencies` attribute of the function. Instead of
+    calling the function, the expression loads the chain directly and
+    traces each link as it is loaded. The function is only called if
+    the first name is not in the scope or the globals, or if a link of
+    the chain is missing, in which case the error is raised by the
+    function with a traceback into the Enaml source. Other errors, such
+    as those raised by a property getter, propagate directly, so that
+    the getter is not run a second time by the function.
 
+    """
+    __slots__ = ()
+
+    #--------------------------------------------------------------------------
+    # AbstractExpression Interface
+    #--------------------------------------------------------------------------
+    def eval(self, owner, name):
+        """ Evaluate and return the expression value.
+
+        """
+        tracer = TraitsTracer()
+        overrides = {'nonlocals': Nonlocals(owner, tracer)}
+        scope = DynamicScope(owner, self._f_locals, overrides, tracer)
+        with owner.operators:
+            profiler = binding_profiler.active
+            if profiler is not None:
+                start = default_timer()
+                try:
+                    result = self._load_chain(scope, tracer)
+                finally:
+                    elapsed = default_timer() - start
+                    profiler.record_call(self._func, self.operator, elapsed)
+            else:
+                result = self._load_chain(scope, tracer)
+        self._subscribe(owner, name, tracer.traced_items, profiler)
         return result
 
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _load_chain(self, scope, tracer):
+        """ Load the chain of names of the expression.
 
-AbstractExpression.register(SubscriptionExpression)
+        Parameters
+        ----------
+        scope : DynamicScope
+            The scope of the expression, which traces the first name.
+
+        tracer : TraitsTracer
+            The tracer with which to trace the attributes of the chain.
+
+        Returns
+        -------
+        result : object
+            The value of the expression.
+
+        """
+        func = self._func
+        chain = func._dependencies
+        first = chain[0]
+        try:
+            obj = scope[first]
+        except KeyError:
+            f_globals = func.func_globals
+            if first not in f_globals:
+                return call_func(func, (), {}, scope)
+            obj = f_globals[first]
+        try:
+            for attr in chain[1:]:
+                tracer.load_attr(obj, attr)
+                obj = getattr(obj, attr)
+        except AttributeError:
+            return call_func(func, (), {}, scope)
+        return obj
+
+
+AbstractExpression.register(StaticSubscriptionExpression)
 
 
 #------------------------------------------------------------------------------
@@ -393,6 +618,10 @@ class DelegationExpression(SubscriptionExpression):
     """
     __slots__ = ()
 
+    #: The operator of the expression, used by the binding profiler.
+    #: The updates of the delegation are profiled as ':=>'.
+    operator = ':='
+
     #--------------------------------------------------------------------------
     # AbstractListener Interface
     #--------------------------------------------------------------------------
@@ -405,8 +634,24 @@ class DelegationExpression(SubscriptionExpression):
         overrides = {'nonlocals': nonlocals}
         scope = DynamicScope(owner, self._f_locals, overrides, None)
         with owner.operators:
-            call_func(self._func._update, (inverter, new), {}, scope)
+            func = self._func._update
+            profiler = binding_profiler.active
+            if profiler is not None:
+                profiler.call(func, ':=>', (inverter, new), scope)
+            else:
+                call_func(func, (inverter, new), {}, scope)
 
 
 AbstractListener.register(DelegationExpression)
 
+
+class StaticDelegationExpression(StaticSubscriptionExpression,
+                                 DelegationExpression):
+    """ An expression and listener implementation for the `:=` operator
+    with static dependencies.
+
+    """
+    __slots__ = ()
+
+
+AbstractListener.register(StaticDelegationExpression)
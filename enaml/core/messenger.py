@@ -10,6 +10,38 @@ from .declarative import Declarative
 from .object import Object
 
 
+#: A cache of the (class_name, base_names) type info for each Messenger
+#: class. The info is computed once per class when it is first needed
+#: for a snapshot, rather than once for each snapshotted object.
+_type_info_cache = {}
+
+
+def type_info(cls):
+    """ Get the cached type info for a Messenger class.
+
+    Parameters
+    ----------
+    cls : type
+        The Messenger subclass of interest.
+
+    Returns
+    -------
+    result : tuple
+        A 2-tuple of the class name and the tuple of base class names
+        which terminates with Object.
+
+    """
+    info = _type_info_cache.get(cls)
+    if info is None:
+        names = []
+        for base in cls.mro()[1:]:
+            names.append(base.__name__)
+            if base is Object:
+                break
+        info = _type_info_cache[cls] = (cls.__name__, tuple(names))
+    return info
+
+
 class PublishAttributeNotifier(object):
     """ A lightweight trait change notifier used by Messenger.
 
@@ -17,9 +49,17 @@ class PublishAttributeNotifier(object):
     def __call__(self, obj, name, old, new):
         """ Called by traits to dispatch the notifier.
 
+        If the session of the object has enabled attribute batching,
+        the action is added to the session batch instead of being sent
+        immediately.
+
         """
         if old is not Uninitialized and name not in obj.loopback_guard:
-            obj.send_action('set_' + name, {name: new})
+            session = obj._session
+            if session is not None and session.batch_attributes:
+                obj.batch_action('set_' + name, {name: new})
+            else:
+                obj.send_action('set_' + name, {name: new})
 
     def equals(self, other):
         """ Compares this notifier against another for equality.
@@ -77,10 +117,10 @@ class ChildrenChangedTask(object):
         content['removed'] = [
             c.object_id for c in removed if isinstance(c, Messenger)
         ]
-        content['added'] = [
-            c.snapshot() for c in added if isinstance(c, Messenger)
-        ]
         session = self._parent.session
+        content['added'] = session.pack_types([
+            c.snapshot() for c in added if isinstance(c, Messenger)
+        ])
         for obj in added:
             if obj.is_initialized:
                 obj.activate(session)
@@ -171,7 +211,7 @@ class Messenger(Declarative):
             The name of the class of this instance.
 
         """
-        return type(self).__name__
+        return type_info(type(self))[0]
 
     def base_names(self):
         """ Get the list of base class names for this instance.
@@ -181,15 +221,11 @@ class Messenger(Declarative):
         result : list
             The list of string names for the base classes of this
             instance. The list starts with the parent class of this
-            instance and terminates with Object.
+            instance and terminates with Object. A new list is returned
+            on each call, so the caller may modify it.
 
         """
-        names = []
-        for base in type(self).mro()[1:]:
-            names.append(base.__name__)
-            if base is Object:
-                break
-        return names
+        return list(type_info(type(self))[1])
 
     #--------------------------------------------------------------------------
     # Messaging Support
@@ -252,6 +288,23 @@ class Messenger(Declarative):
         # batched task allows the children to finish initializing before
         # their snapshot is taken.
         if self.is_active:
-            task = ChildrenChangedTask(self, event)
-            self.batch_action_task('children_changed', task)
+            self.publish_children_event(event)
+
+    def publish_children_event(self, event):
+        """ Publish a `ChildrenEvent` to the client object.
+
+        This is called by `children_event` when the object is active.
+        The default implementation batches a `ChildrenChangedTask`
+        which sends a `children_changed` action to the client. A
+        subclass may reimplement this method to withhold the changes
+        from the client.
+
+        Parameters
+        ----------
+        event : ChildrenEvent
+            The children event posted to the object.
+
+        """
+        task = ChildrenChangedTask(self, event)
+        self.batch_action_task('children_changed', task)
 
@@ -32,7 +32,8 @@ identifiers : dict
 """
 from .expressions import (
     SimpleExpression, NotificationExpression, SubscriptionExpression,
-    UpdateExpression, DelegationExpression
+    UpdateExpression, DelegationExpression, StaticSubscriptionExpression,
+    StaticDelegationExpression
 )
 
 
@@ -83,10 +84,16 @@ def op_subscribe(obj, name, func, identifiers):
     attribute on the object. The function takes one argument: a code
     tracer, and returns the value of the expression. It is patched for
     dynamic scoping and code tracing and it should be invoked with
-    `funchelper.call_func(...)`.
+    `funchelper.call_func(...)`. If the function has an attribute
+    named `_dependencies`, it was compiled without code tracing and
+    takes no arguments, and a StaticSubscriptionExpression is bound
+    instead.
 
     """
-    expr = SubscriptionExpression(func, identifiers)
+    if hasattr(func, '_dependencies'):
+        expr = StaticSubscriptionExpression(func, identifiers)
+    else:
+        expr = SubscriptionExpression(func, identifiers)
     obj.bind_expression(name, expr)
 
 
@@ -99,10 +106,14 @@ def op_delegate(obj, name, func, identifiers):
     `_update` which is a function implementing `op_update` semantics.
     Both functions should be invoked with `funchelper.call_func(...)`.
     In this fashion, `op_delegate` is the combination of `op_subscribe`
-    and `op_update`.
+    and `op_update`. A StaticDelegationExpression is bound for a
+    function with static dependencies, as in `op_subscribe`.
 
     """
-    expr = DelegationExpression(func, identifiers)
+    if hasattr(func, '_dependencies'):
+        expr = StaticDelegationExpression(func, identifiers)
+    else:
+        expr = DelegationExpression(func, identifiers)
     obj.bind_expression(name, expr)
     obj.bind_listener(name, expr)
 
@@ -0,0 +1,273 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Transactional propagation of subscription expression updates.
+
+Outside of a transaction, a subscription expression is re-evaluated as
+soon as one of its dependencies changes. When the dependencies form a
+diamond, the expressions downstream of the diamond are evaluated once
+for each path through it, and can observe inconsistent intermediate
+values. Inside a transaction, invalidated expressions are queued and
+deduplicated, and are re-evaluated once the outermost transaction ends.
+The queue is evaluated in rounds: each round evaluates its expressions
+in dependency order, and the expressions invalidated by a round which
+were not already waiting in it are evaluated by the next round.
+
+"""
+from functools import wraps
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+#: The maximum number of rounds of a commit. An expression which keeps
+#: invalidating itself through a cycle of bindings is dropped after
+#: this many rounds.
+MAX_ROUNDS = 1000
+
+
+def _dependency_order(order, pending):
+    """ Sort the keys of pending notifiers in dependency order.
+
+    The key of a notifier is the (id(owner), name) of its expression.
+    A notifier depends on the pending notifiers whose keys are in its
+    `keyval`, which holds the (id(obj), name) pairs of the attributes
+    read by its expression. Cycles are broken in the order in which the
+    expressions were invalidated.
+
+    """
+    def deps(key):
+        return [
+            dep for dep in pending[key].keyval
+            if dep in pending and dep != key
+        ]
+    result = []
+    done = set()
+    visiting = set()
+    for root in order:
+        if root in done:
+            continue
+        visiting.add(root)
+        stack = [(root, iter(deps(root)))]
+        while stack:
+            key, it = stack[-1]
+            for dep in it:
+                if dep not in done and dep not in visiting:
+                    visiting.add(dep)
+                    stack.append((dep, iter(deps(dep))))
+                    break
+            else:
+                stack.pop()
+                visiting.discard(key)
+                done.add(key)
+                result.append(key)
+    return result
+
+
+class TransactionManager(object):
+    """ An object which queues invalidated expressions during a
+    transaction.
+
+    There is a single manager for the process. It should be accessed
+    through the functions of this module.
+
+    """
+    def __init__(self):
+        """ Initialize a TransactionManager.
+
+        """
+        self._depth = 0
+        self._committing = False
+        self._pending = {}
+        self._order = []
+        self._waiting = None
+        self._deferred = False
+        self._posted = False
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _deferred_commit(self):
+        """ Commit the updates queued during a cycle of the event loop.
+
+        """
+        self._posted = False
+        if self._depth == 0 and not self._committing:
+            self.commit()
+
+    #--------------------------------------------------------------------------
+    # Public API
+    #--------------------------------------------------------------------------
+    def begin(self):
+        """ Begin a transaction. Transactions may be nested.
+
+        """
+        self._depth += 1
+
+    def end(self):
+        """ End a transaction.
+
+        The queued updates are committed when the outermost transaction
+        ends.
+
+        """
+        self._depth -= 1
+        if self._depth == 0 and not self._committing:
+            self.commit()
+
+    def active(self):
+        """ Get whether invalidated expressions are being queued.
+
+        """
+        return self._depth > 0 or self._committing
+
+    def set_deferred(self, deferred):
+        """ Set whether updates are grouped by cycle of the event loop.
+
+        """
+        self._deferred = deferred
+
+    def invalidate(self, notifier, key):
+        """ Queue the update of an invalidated expression.
+
+        Parameters
+        ----------
+        notifier : SubscriptionNotifier
+            The notifier of the invalidated expression. It must have a
+            `keyval` and a `refresh` method.
+
+        key : tuple
+            The (id(owner), name) of the invalidated expression.
+
+        Returns
+        -------
+        result : bool
+            True if the update was queued, or False if the expression
+            should be refreshed immediately by the caller.
+
+        """
+        if self._depth == 0 and not self._committing:
+            if not self._deferred:
+                return False
+            if not self._posted:
+                self._posted = True
+                from enaml.application import deferred_call
+                deferred_call(self._deferred_commit)
+        waiting = self._waiting
+        if waiting is not None and key in waiting:
+            return True
+        pending = self._pending
+        if key not in pending:
+            self._order.append(key)
+        pending[key] = notifier
+        return True
+
+    def commit(self):
+        """ Refresh the queued expressions.
+
+        """
+        self._committing = True
+        try:
+            rounds = 0
+            while self._order:
+                if rounds == MAX_ROUNDS:
+                    msg = 'Dropping %d expression updates after %d rounds; '
+                    msg += 'the bindings may form a cycle.'
+                    logger.error(msg % (len(self._order), rounds))
+                    self._order = []
+                    self._pending = {}
+                    break
+                rounds += 1
+                order = self._order
+                pending = self._pending
+                self._order = []
+                self._pending = {}
+                keys = _dependency_order(order, pending)
+                self._waiting = waiting = set(keys)
+                for key in keys:
+                    waiting.discard(key)
+                    try:
+                        pending[key].refresh()
+                    except Exception:
+                        logger.exception('Error refreshing an expression')
+        finally:
+            self._waiting = None
+            self._committing = False
+
+
+#: The transaction manager for the process.
+_manager = TransactionManager()
+
+
+class transaction(object):
+    """ A context manager which groups the updates of expressions.
+
+    The subscription expressions invalidated within the context are
+    re-evaluated once, in dependency order, when the outermost context
+    exits. The expressions are refreshed even if the context exits with
+    an exception, since the changes which invalidated them have already
+    been made.
+
+    Example
+    -------
+    with transaction():
+        model.width = 10
+        model.height = 20
+
+    """
+    def __enter__(self):
+        _manager.begin()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _manager.end()
+
+
+def transactional(func):
+    """ A decorator which runs a function within a transaction.
+
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        _manager.begin()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _manager.end()
+    return wrapper
+
+
+def in_transaction():
+    """ Get whether invalidated expressions are currently queued.
+
+    """
+    return _manager.active()
+
+
+def set_deferred_updates(deferred):
+    """ Set whether expression updates are grouped automatically.
+
+    When enabled, the expressions invalidated outside of a transaction
+    are queued and refreshed on the next cycle of the event loop, so
+    all of the updates caused by one cycle are committed together. The
+    values of the expressions are stale until the updates are committed.
+    An application instance must exist while this is enabled.
+
+    Parameters
+    ----------
+    deferred : bool
+        Whether to group the updates of each cycle of the event loop.
+
+    """
+    _manager.set_deferred(deferred)
+
+
+def invalidate(notifier, key):
+    """ Queue the update of an invalidated expression, if updates are
+    being queued.
+
+    See `TransactionManager.invalidate` for the parameters.
+
+    """
+    return _manager.invalidate(notifier, key)
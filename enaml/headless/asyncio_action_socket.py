@@ -0,0 +1,126 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import types
+
+from enaml.socket_interface import ActionSocketInterface
+from enaml.weakmethod import WeakMethod
+
+
+class AsyncioActionSocket(object):
+    """ A concrete implementation of ActionSocketInterface.
+
+    This socket delivers the messages sent on it to the `receive`
+    method of a connected peer socket on a later iteration of an
+    asyncio event loop. A pair of connected sockets provides an
+    in-process loopback connection between a server session and a
+    simulated client.
+
+    """
+    def __init__(self, loop):
+        """ Initialize an AsyncioActionSocket.
+
+        Parameters
+        ----------
+        loop : asyncio.AbstractEventLoop
+            The event loop used to deliver the messages.
+
+        """
+        self._loop = loop
+        self._callback = None
+        self._peer = None
+
+    def connect(self, peer):
+        """ Connect this socket to a peer socket.
+
+        Parameters
+        ----------
+        peer : AsyncioActionSocket or None
+            The socket which should receive the messages sent on this
+            socket, or None to disconnect the socket.
+
+        """
+        self._peer = peer
+
+    def on_message(self, callback):
+        """ Register a callback for receiving messages sent by a client
+        object.
+
+        Parameters
+        ----------
+        callback : callable
+            A callable with an argument signature that is equivalent to
+            the `send` method. If the callback is a bound method, then
+            the lifetime of the callback will be bound to lifetime of
+            the method owner object.
+
+        """
+        if isinstance(callback, types.MethodType):
+            callback = WeakMethod(callback)
+        self._callback = callback
+
+    def send(self, object_id, action, content):
+        """ Send the action to the connected peer socket.
+
+        Parameters
+        ----------
+        object_id : str
+            The object id of the target object.
+
+        action : str
+            The action that should be performed by the object.
+
+        content : dict
+            The content dictionary for the action.
+
+        """
+        peer = self._peer
+        if peer is not None:
+            self._loop.call_soon(peer.receive, object_id, action, content)
+
+    def receive(self, object_id, action, content):
+        """ Receive a message sent to the socket.
+
+        The message will be routed to the registered callback, if one
+        exists.
+
+        Parameters
+        ----------
+        object_id : str
+            The object id of the target object.
+
+        action : str
+            The action that should be performed by the object.
+
+        content : dict
+            The content dictionary for the action.
+
+        """
+        callback = self._callback
+        if callback is not None:
+            callback(object_id, action, content)
+
+
+ActionSocketInterface.register(AsyncioActionSocket)
+
+
+def socket_pair(loop):
+    """ Create a pair of connected AsyncioActionSockets.
+
+    Parameters
+    ----------
+    loop : asyncio.AbstractEventLoop
+        The event loop used to deliver the messages.
+
+    Returns
+    -------
+    result : tuple
+        A 2-tuple of connected AsyncioActionSocket instances.
+
+    """
+    first = AsyncioActionSocket(loop)
+    second = AsyncioActionSocket(loop)
+    first.connect(second)
+    second.connect(first)
+    return first, second
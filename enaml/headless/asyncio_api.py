@@ -0,0 +1,22 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" The asyncio API selector for the headless applications.
+
+The standard library asyncio module is used when it is available.
+Otherwise, the trollius backport is used, which is declared by the
+optional 'headless' extra of the enaml distribution.
+
+"""
+try:
+    import asyncio
+except ImportError:
+    try:
+        import trollius as asyncio
+    except ImportError:
+        raise ImportError(
+            'The headless applications require asyncio or its trollius '
+            'backport. Install trollius, or install enaml with the '
+            "'headless' extra: pip install enaml[headless]"
+        )
@@ -0,0 +1,294 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from functools import partial
+import logging
+from threading import current_thread
+import uuid
+
+from enaml.application import Application
+
+from .asyncio_action_socket import socket_pair
+from .asyncio_api import asyncio
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncioApplication(Application):
+    """ A headless implementation of an Enaml application.
+
+    An AsyncioApplication runs its event loop on an asyncio event loop
+    and does not require a GUI toolkit. The server-side sessions are
+    connected to their clients through a pluggable transport, which
+    makes this application suitable for hosting a large number of
+    sessions which are driven by remote or simulated clients.
+
+    When a session is started, its client is opened with an 'open'
+    action addressed to the session id, whose content holds the
+    'widget_groups' and 'snapshot' of the session. This is the
+    headless equivalent of opening the client session of a toolkit
+    application.
+
+    """
+    def __init__(self, factories, loop=None, transport=None,
+                 open_clients=None):
+        """ Initialize an AsyncioApplication.
+
+        Parameters
+        ----------
+        factories : iterable
+            An iterable of SessionFactory instances to pass to the
+            superclass constructor.
+
+        loop : asyncio.AbstractEventLoop, optional
+            The event loop to use for the application. The default is
+            the current event loop. The thread which creates the
+            application is considered the main thread.
+
+        transport : callable, optional
+            A callable which accepts a session id and returns the
+            ActionSocketInterface to use for the session with that
+            id. The default transport creates an in-process pair of
+            sockets, the client end of which is available from the
+            `client_socket` method.
+
+        open_clients : bool, optional
+            Whether to send the 'open' action to the client of a new
+            session. The default is True for the loopback transport
+            and False for a custom transport, whose owner delivers the
+            snapshot with its own protocol, as the ZMQServer does with
+            its 'session_started' reply.
+
+        """
+        super(AsyncioApplication, self).__init__(factories)
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        if transport is None:
+            transport = self._loopback_transport
+            if open_clients is None:
+                open_clients = True
+        self._loop = loop
+        self._transport = transport
+        self._open_clients = bool(open_clients)
+        self._thread = current_thread()
+        self._client_sockets = {}
+        self._sessions = {}
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _loopback_transport(self, session_id):
+        """ The default transport for the application.
+
+        This creates a connected pair of in-process sockets and stores
+        the client end of the pair for retrieval by `client_socket`.
+
+        """
+        server_socket, client_socket = socket_pair(self._loop)
+        self._client_sockets[session_id] = client_socket
+        return server_socket
+
+    #--------------------------------------------------------------------------
+    # Abstract API Implementation
+    #--------------------------------------------------------------------------
+    def start_session(self, name):
+        """ Start a new session of the given name.
+
+        This method will create a new session object for the requested
+        session type and return the new session_id. If the session name
+        is invalid, an exception will be raised.
+
+        Parameters
+        ----------
+        name : str
+            The name of the session to start.
+
+        Returns
+        -------
+        result : str
+            The unique identifier for the created session.
+
+        """
+        if name not in self._named_factories:
+            raise ValueError('Invalid session name')
+        factory = self._named_factories[name]
+        session = factory()
+        session_id = uuid.uuid4().hex
+        session.open(session_id)
+        self._sessions[session_id] = session
+        socket = self._transport(session_id)
+        if self._open_clients:
+            # The client is opened before the session is activated, so
+            # that the messages sent on activation arrive after it.
+            groups = session.widget_groups[:]
+            snapshot = session.client_snapshot()
+            content = {'widget_groups': groups, 'snapshot': snapshot}
+            socket.send(session_id, 'open', content)
+            # Record the session traffic if the application has a
+            # recorder. A custom transport which opens its own clients
+            # is responsible for recording them.
+            recorder = self._recorder
+            if recorder is not None:
+                recorder.record_session(session_id, name, groups, snapshot)
+                socket = recorder.wrap(socket)
+        session.activate(socket)
+        return session_id
+
+    def end_session(self, session_id):
+        """ End the session with the given session id.
+
+        This method will close down the existing session. If the session
+        id is not valid, an exception will be raised.
+
+        Parameters
+        ----------
+        session_id : str
+            The unique identifier for the session to close.
+
+        """
+        if session_id not in self._sessions:
+            raise ValueError('Invalid session id')
+        self._sessions.pop(session_id).close()
+        self._client_sockets.pop(session_id, None)
+
+    def session(self, session_id):
+        """ Get the session for the given session id.
+
+        Parameters
+        ----------
+        session_id : str
+            The unique identifier for the session to retrieve.
+
+        Returns
+        -------
+        result : Session or None
+            The session object with the given id, or None if the id
+            does not correspond to an active session.
+
+        """
+        return self._sessions.get(session_id)
+
+    def sessions(self):
+        """ Get the currently active sessions for the application.
+
+        Returns
+        -------
+        result : list
+            The list of currently active sessions for the application.
+
+        """
+        return self._sessions.values()
+
+    def start(self):
+        """ Start the application's main event loop.
+
+        """
+        loop = self._loop
+        if not loop.is_running():
+            loop.run_forever()
+
+    def stop(self):
+        """ Stop the application's main event loop.
+
+        """
+        self._loop.stop()
+
+    def deferred_call(self, callback, *args, **kwargs):
+        """ Invoke a callable on the next cycle of the main event loop
+        thread.
+
+        Parameters
+        ----------
+        callback : callable
+            The callable object to execute at some point in the future.
+
+        *args, **kwargs
+            Any additional positional and keyword arguments to pass to
+            the callback.
+
+        """
+        stats = self._stats
+        if stats is not None:
+            stats.deferred_call()
+        if kwargs:
+            callback = partial(callback, **kwargs)
+        self._loop.call_soon_threadsafe(callback, *args)
+
+    def timed_call(self, ms, callback, *args, **kwargs):
+        """ Invoke a callable on the main event loop thread at a
+        specified time in the future.
+
+        Parameters
+        ----------
+        ms : int
+            The time to delay, in milliseconds, before executing the
+            callable.
+
+        callback : callable
+            The callable object to execute at some point in the future.
+
+        *args, **kwargs
+            Any additional positional and keyword arguments to pass to
+            the callback.
+
+        """
+        stats = self._stats
+        if stats is not None:
+            stats.timed_call()
+        if kwargs:
+            callback = partial(callback, **kwargs)
+        loop = self._loop
+        delay = ms / 1000.0
+        if self.is_main_thread():
+            loop.call_later(delay, callback, *args)
+        else:
+            loop.call_soon_threadsafe(loop.call_later, delay, callback, *args)
+
+    def is_main_thread(self):
+        """ Indicates whether the caller is on the main gui thread.
+
+        Returns
+        -------
+        result : bool
+            True if called from the main gui thread. False otherwise.
+
+        """
+        return current_thread() is self._thread
+
+    #--------------------------------------------------------------------------
+    # Public API
+    #--------------------------------------------------------------------------
+    def loop(self):
+        """ Get the asyncio event loop for the application.
+
+        Returns
+        -------
+        result : asyncio.AbstractEventLoop
+            The event loop which runs the application.
+
+        """
+        return self._loop
+
+    def client_socket(self, session_id):
+        """ Get the client end of a session's loopback socket pair.
+
+        This is only available when the application uses the default
+        loopback transport. A simulated client can register a message
+        callback on the socket and send actions through it to drive
+        the server session.
+
+        Parameters
+        ----------
+        session_id : str
+            The unique identifier of the session.
+
+        Returns
+        -------
+        result : AsyncioActionSocket or None
+            The client socket for the session, or None if the session
+            does not exist or uses a different transport.
+
+        """
+        return self._client_sockets.get(session_id)
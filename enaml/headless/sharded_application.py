@@ -0,0 +1,900 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from itertools import count
+import logging
+from multiprocessing import Pipe, Process
+import os
+from timeit import default_timer
+import time
+import types
+import uuid
+
+from enaml.application import Application
+from enaml.session_usage import SessionUsage
+from enaml.socket_interface import ActionSocketInterface
+from enaml.utils import make_dispatcher
+from enaml.weakmethod import WeakMethod
+
+from .asyncio_api import asyncio
+from .asyncio_application import AsyncioApplication
+
+
+logger = logging.getLogger(__name__)
+
+
+#: The dispatch function for messages sent over a worker pipe.
+dispatch_message = make_dispatcher('on_message_', logger)
+
+
+#: The names of the supported worker selection policies.
+POLICIES = ('least_loaded', 'round_robin', 'sticky')
+
+
+#: The session resources which are counted in the worker processes and
+#: reported to the parent process. The messages and bytes exchanged
+#: with the client are counted by the parent process.
+WORKER_RESOURCES = ('objects', 'expressions', 'listeners', 'batch_size')
+
+
+#------------------------------------------------------------------------------
+# Worker Process
+#------------------------------------------------------------------------------
+class PipeActionSocket(object):
+    """ A concrete implementation of ActionSocketInterface.
+
+    This socket is used by the sessions hosted in a worker process. The
+    messages sent on the socket are forwarded over the worker pipe to
+    the parent process, tagged with the identifier of the session.
+
+    """
+    def __init__(self, conn, session_id):
+        """ Initialize a PipeActionSocket.
+
+        Parameters
+        ----------
+        conn : multiprocessing.Connection
+            The worker end of the pipe to the parent process.
+
+        session_id : str
+            The identifier of the session in the parent process.
+
+        """
+        self._conn = conn
+        self._session_id = session_id
+        self._callback = None
+
+    def on_message(self, callback):
+        """ Register a callback for receiving messages sent by a client
+        object.
+
+        Parameters
+        ----------
+        callback : callable
+            A callable with an argument signature that is equivalent to
+            the `send` method. If the callback is a bound method, then
+            the lifetime of the callback will be bound to lifetime of
+            the method owner object.
+
+        """
+        if isinstance(callback, types.MethodType):
+            callback = WeakMethod(callback)
+        self._callback = callback
+
+    def send(self, object_id, action, content):
+        """ Forward the action to the parent process.
+
+        Parameters
+        ----------
+        object_id : str
+            The object id of the target object.
+
+        action : str
+            The action that should be performed by the object.
+
+        content : dict
+            The content dictionary for the action.
+
+        """
+        msg = ('message', self._session_id, object_id, action, content)
+        self._conn.send(msg)
+
+    def receive(self, object_id, action, content):
+        """ Receive a message sent to the socket.
+
+        The message will be routed to the registered callback, if one
+        exists.
+
+        Parameters
+        ----------
+        object_id : str
+            The object id of the target object.
+
+        action : str
+            The action that should be performed by the object.
+
+        content : dict
+            The content dictionary for the action.
+
+        """
+        callback = self._callback
+        if callback is not None:
+            callback(object_id, action, content)
+
+
+ActionSocketInterface.register(PipeActionSocket)
+
+
+class WorkerHost(object):
+    """ The object which hosts the sessions of a worker process.
+
+    """
+    def __init__(self, conn, factories, report_interval):
+        """ Initialize a WorkerHost.
+
+        Parameters
+        ----------
+        conn : multiprocessing.Connection
+            The worker end of the pipe to the parent process.
+
+        factories : list
+            The SessionFactory instances of the parent application.
+
+        report_interval : int
+            The interval, in milliseconds, at which to report the load
+            of the worker to the parent process.
+
+        """
+        # The application singleton of the parent is inherited when
+        # the process is forked, and must be released in the worker.
+        Application._instance = None
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._conn = conn
+        self._report_interval = report_interval
+        self._sockets = {}
+        self._session_ids = {}
+        self._pending = None
+        self._app = AsyncioApplication(factories, loop, self._transport)
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _transport(self, session_id):
+        """ The session transport for the worker application.
+
+        """
+        parent_id = self._pending
+        socket = PipeActionSocket(self._conn, parent_id)
+        self._sockets[parent_id] = socket
+        self._session_ids[parent_id] = session_id
+        return socket
+
+    def _process_messages(self):
+        """ Process the messages sent by the parent process.
+
+        """
+        conn = self._conn
+        try:
+            while conn.poll():
+                msg = conn.recv()
+                try:
+                    dispatch_message(self, msg[0], *msg[1:])
+                except Exception:
+                    logger.exception('Error handling worker message')
+        except EOFError:
+            self._app.stop()
+
+    def _report(self):
+        """ Report the load of the worker to the parent process.
+
+        """
+        app = self._app
+        sessions = app.sessions()
+        times = os.times()
+        usage = {}
+        for parent_id, session_id in self._session_ids.iteritems():
+            session = app.session(session_id)
+            if session is not None:
+                counts = session.usage()['counts']
+                usage[parent_id] = dict(
+                    (resource, counts[resource])
+                    for resource in WORKER_RESOURCES
+                )
+        info = {
+            'pid': os.getpid(),
+            'sessions': len(sessions),
+            'objects': sum(len(s._registered_objects) for s in sessions),
+            'pending_tasks': app.has_pending_tasks(),
+            'cpu_time': times[0] + times[1],
+            'usage': usage,
+        }
+        self._conn.send(('report', info))
+        self._app.timed_call(self._report_interval, self._report)
+
+    #--------------------------------------------------------------------------
+    # Message Handlers
+    #--------------------------------------------------------------------------
+    def on_message_start(self, parent_id, name, state=None):
+        """ Handle the 'start' message from the parent process.
+
+        If the session is resumed from hibernation, the message holds
+        the saved state of the session, which is restored before the
+        session is reported as opened.
+
+        """
+        self._pending = parent_id
+        try:
+            session_id = self._app.start_session(name)
+        except Exception as e:
+            self._conn.send(('error', parent_id, str(e)))
+            return
+        finally:
+            self._pending = None
+        session = self._app.session(session_id)
+        if state is not None:
+            from enaml.hibernation import restore_session
+            restore_session(session, state)
+        info = {
+            'widget_groups': session.widget_groups[:],
+            'snapshot': session.client_snapshot(),
+        }
+        self._conn.send(('opened', parent_id, info))
+
+    def on_message_end(self, parent_id):
+        """ Handle the 'end' message from the parent process.
+
+        """
+        self._sockets.pop(parent_id, None)
+        session_id = self._session_ids.pop(parent_id, None)
+        if session_id is not None:
+            self._app.end_session(session_id)
+
+    def on_message_hibernate(self, parent_id):
+        """ Handle the 'hibernate' message from the parent process.
+
+        The state of the session is captured and sent to the parent,
+        which ends the session once the state has been saved.
+
+        """
+        session_id = self._session_ids.get(parent_id)
+        if session_id is not None:
+            session = self._app.session(session_id)
+            if session is not None:
+                from enaml.hibernation import capture_session
+                state = capture_session(session)
+                self._conn.send(('hibernated', parent_id, state))
+
+    def on_message_message(self, parent_id, object_id, action, content):
+        """ Handle a session 'message' from the parent process.
+
+        """
+        socket = self._sockets.get(parent_id)
+        if socket is not None:
+            socket.receive(object_id, action, content)
+
+    def on_message_stop(self):
+        """ Handle the 'stop' message from the parent process.
+
+        """
+        self._app.stop()
+
+    #--------------------------------------------------------------------------
+    # Public API
+    #--------------------------------------------------------------------------
+    def run(self):
+        """ Run the event loop of the worker until it is stopped.
+
+        """
+        app = self._app
+        loop = app.loop()
+        loop.add_reader(self._conn.fileno(), self._process_messages)
+        app.timed_call(0, self._report)
+        app.start()
+        app.destroy()
+
+
+def worker_main(conn, factories, report_interval):
+    """ The entry point of a worker process.
+
+    """
+    WorkerHost(conn, factories, report_interval).run()
+
+
+#------------------------------------------------------------------------------
+# Parent Process
+#------------------------------------------------------------------------------
+class RemoteSession(object):
+    """ A proxy for a session which is hosted by a worker process.
+
+    The proxy relays the messages between the client socket of the
+    session and the worker. Since the session is opened asynchronously
+    in the worker, its snapshot is not available when the session is
+    started. Once the worker has opened the session, the client is
+    sent an 'open' action addressed to the session id, whose content
+    holds the 'widget_groups' and 'snapshot' of the session, unless a
+    callback was registered with `notify_opened` to open the client.
+
+    The proxy provides the resource accounting API of a Session. The
+    messages and bytes exchanged with the client are counted by the
+    proxy, and the counts of the objects, bindings and batch of the
+    session are updated from the periodic reports of the worker. The
+    limits set on the proxy are checked in the parent process, while
+    the `resource_limits` of the session class are enforced by the
+    session in the worker.
+
+    """
+    def __init__(self, session_id, factory_name, worker, socket):
+        """ Initialize a RemoteSession.
+
+        Parameters
+        ----------
+        session_id : str
+            The unique identifier of the session.
+
+        factory_name : str
+            The name of the session factory.
+
+        worker : ShardWorker
+            The worker which hosts the session.
+
+        socket : ActionSocketInterface
+            The socket for communicating with the session client.
+
+        """
+        self.session_id = session_id
+        self.factory_name = factory_name
+        self.worker = worker
+        self.socket = socket
+        self.widget_groups = []
+        self._snapshot = None
+        self._notify_opened = None
+        self._usage = SessionUsage(self.on_soft_limit, self.on_hard_limit)
+        self._last_activity = default_timer()
+        socket.on_message(self.on_message)
+
+    def _end_session(self):
+        """ End the session, if it is still open in the application.
+
+        """
+        app = self.worker.app
+        if app.session(self.session_id) is self:
+            app.end_session(self.session_id)
+
+    def snapshot(self):
+        """ Get the snapshot of the session windows.
+
+        Returns
+        -------
+        result : list or None
+            The snapshot sent by the worker when the session was
+            opened, or None if the session is not yet open.
+
+        """
+        return self._snapshot
+
+    def client_snapshot(self):
+        """ Get the snapshot of the session windows for the client.
+
+        The snapshot is prepared for the client by the worker, so this
+        is the same as `snapshot`. See also: `Session.client_snapshot`.
+
+        """
+        return self._snapshot
+
+    def opened(self, info):
+        """ Handle the opening of the session in the worker.
+
+        """
+        self.widget_groups = info['widget_groups']
+        self._snapshot = info['snapshot']
+        notify = self._notify_opened
+        if notify is None:
+            self.deliver(self.session_id, 'open', info)
+        else:
+            self._notify_opened = None
+            self._usage.add('messages_sent', 1)
+            notify(info)
+
+    def notify_opened(self, callback):
+        """ Set a callback to open the client of the session.
+
+        The callback replaces the 'open' action which is sent to the
+        client when the worker has opened the session. This allows a
+        transport to send the snapshot of the session in its own reply.
+
+        Parameters
+        ----------
+        callback : callable
+            A callable which accepts the dict of the 'widget_groups'
+            and 'snapshot' of the session. It is invoked once the
+            worker has opened the session, or immediately if the
+            session is already open.
+
+        """
+        if self._snapshot is not None:
+            info = {
+                'widget_groups': self.widget_groups,
+                'snapshot': self._snapshot,
+            }
+            self._usage.add('messages_sent', 1)
+            callback(info)
+        else:
+            self._notify_opened = callback
+
+    def deliver(self, object_id, action, content):
+        """ Deliver a message from the worker to the client.
+
+        """
+        self._usage.add('messages_sent', 1)
+        self.socket.send(object_id, action, content)
+
+    def on_message(self, object_id, action, content):
+        """ Forward a message from the client to the worker.
+
+        """
+        self._last_activity = default_timer()
+        self._usage.add('messages_received', 1)
+        msg = ('message', self.session_id, object_id, action, content)
+        self.worker.post(msg)
+
+    def idle_time(self):
+        """ Get the time since the client last sent a message.
+
+        See also: `Session.idle_time`.
+
+        """
+        return default_timer() - self._last_activity
+
+    def update_usage(self, counts):
+        """ Update the counts of the resources used in the worker.
+
+        Parameters
+        ----------
+        counts : dict
+            A dict mapping the names in WORKER_RESOURCES to the counts
+            reported by the worker.
+
+        """
+        usage = self._usage
+        for resource, count in counts.iteritems():
+            usage.set(resource, count)
+
+    def on_soft_limit(self, resource, count, limit):
+        """ Called when the use of a resource reaches its soft limit.
+
+        See also: `Session.on_soft_limit`.
+
+        """
+        msg = 'Session `%s` reached the soft limit of %s for `%s`: %s'
+        logger.warn(msg % (self.session_id, limit, resource, count))
+
+    def on_hard_limit(self, resource, count, limit):
+        """ Called when the use of a resource reaches its hard limit.
+
+        The session is ended on the next cycle of the event loop. See
+        also: `Session.on_hard_limit`.
+
+        """
+        msg = 'Session `%s` reached the hard limit of %s for `%s`: %s; '
+        msg += 'ending the session.'
+        logger.error(msg % (self.session_id, limit, resource, count))
+        self.worker.app.deferred_call(self._end_session)
+
+    def usage(self):
+        """ Get the resources used by the session.
+
+        See also: `Session.usage`.
+
+        """
+        return self._usage.snapshot()
+
+    def set_limit(self, resource, soft=None, hard=None):
+        """ Set the limits of a resource used by the session.
+
+        See also: `Session.set_limit`.
+
+        """
+        self._usage.set_limit(resource, soft, hard)
+
+    def record_traffic(self, bytes_sent, bytes_received):
+        """ Account for the encoded bytes exchanged with the client.
+
+        See also: `Session.record_traffic`.
+
+        """
+        usage = self._usage
+        if bytes_sent:
+            usage.add('bytes_sent', bytes_sent)
+        if bytes_received:
+            usage.add('bytes_received', bytes_received)
+
+    def close(self):
+        """ Close the session and release the client socket.
+
+        """
+        self.socket.on_message(None)
+        self.worker.sessions.discard(self.session_id)
+
+
+class ShardWorker(object):
+    """ The parent process proxy for a worker process.
+
+    """
+    def __init__(self, app, index, report_interval):
+        """ Initialize a ShardWorker and start its process.
+
+        Parameters
+        ----------
+        app : ShardedApplication
+            The application which owns the worker.
+
+        index : int
+            The index of the worker in the worker pool.
+
+        report_interval : int
+            The interval, in milliseconds, at which the worker reports
+            its load.
+
+        """
+        conn, child_conn = Pipe()
+        args = (child_conn, app._all_factories, report_interval)
+        process = Process(target=worker_main, args=args)
+        process.daemon = True
+        process.start()
+        child_conn.close()
+        self.app = app
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.sessions = set()
+        self.report = {}
+        self.report_time = None
+        self.alive = True
+        app.loop().add_reader(conn.fileno(), self.process_messages)
+
+    def post(self, msg):
+        """ Post a message to the worker process.
+
+        """
+        if self.alive:
+            try:
+                self.conn.send(msg)
+            except (EOFError, IOError):
+                self.app._on_worker_exit(self)
+
+    def process_messages(self):
+        """ Process the messages sent by the worker process.
+
+        """
+        conn = self.conn
+        app = self.app
+        try:
+            while conn.poll():
+                msg = conn.recv()
+                try:
+                    dispatch_message(app, msg[0], self, *msg[1:])
+                except Exception:
+                    logger.exception('Error handling worker message')
+        except (EOFError, IOError):
+            app._on_worker_exit(self)
+
+    def stop(self):
+        """ Stop the worker process.
+
+        """
+        if self.alive:
+            self.alive = False
+            self.app.loop().remove_reader(self.conn.fileno())
+            try:
+                self.conn.send(('stop',))
+            except (EOFError, IOError):
+                pass
+            self.conn.close()
+
+    def info(self):
+        """ Get a dictionary of health and load information.
+
+        """
+        age = None
+        if self.report_time is not None:
+            age = time.time() - self.report_time
+        info = {
+            'index': self.index,
+            'pid': self.process.pid,
+            'alive': self.alive and self.process.is_alive(),
+            'sessions': len(self.sessions),
+            'report': dict(self.report),
+            'report_age': age,
+        }
+        return info
+
+
+class ShardedApplication(AsyncioApplication):
+    """ A headless application which hosts its sessions in a pool of
+    worker processes.
+
+    Each session is started in the worker selected by the application
+    policy. The worker runs its own AsyncioApplication, so one heavy
+    session only stalls the other sessions of its worker. The session
+    messages are proxied between the client socket, provided by the
+    application transport, and the worker over a local pipe. Workers
+    report their load periodically, and a worker which exits is
+    replaced, after its sessions are closed.
+
+    The session factories are inherited by the workers when they are
+    forked, so the sessions need no code changes.
+
+    Sessions are hibernated asynchronously: the state of the session
+    is captured by its worker, and the session is saved to the store
+    and ended once the worker replies. A resumed session is restored
+    by the worker which hosts it before its snapshot is sent to the
+    client.
+
+    """
+    def __init__(self, factories, workers=2, policy='least_loaded',
+                 loop=None, transport=None, report_interval=1000):
+        """ Initialize a ShardedApplication.
+
+        Parameters
+        ----------
+        factories : iterable
+            An iterable of SessionFactory instances to pass to the
+            superclass constructor.
+
+        workers : int, optional
+            The number of worker processes. The default is 2.
+
+        policy : str, optional
+            The policy for selecting the worker of a new session. One
+            of 'least_loaded' (the worker with the fewest sessions and
+            objects), 'round_robin', or 'sticky' (all sessions from the
+            same factory use the same worker). The default is
+            'least_loaded'.
+
+        loop : asyncio.AbstractEventLoop, optional
+            The event loop to use for the application.
+
+        transport : callable, optional
+            The session transport for the client sockets. See the
+            AsyncioApplication for details.
+
+        report_interval : int, optional
+            The interval, in milliseconds, at which the workers report
+            their load. The default is 1000.
+
+        """
+        if policy not in POLICIES:
+            raise ValueError('Invalid sharding policy `%s`' % policy)
+        super(ShardedApplication, self).__init__(factories, loop, transport)
+        self._policy = policy
+        self._report_interval = report_interval
+        self._round_robin = count()
+        self._sticky = {}
+        self._workers = []
+        for index in xrange(workers):
+            self._workers.append(ShardWorker(self, index, report_interval))
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _select_worker(self, name):
+        """ Select the worker for a new session of the given name.
+
+        """
+        workers = [w for w in self._workers if w.alive]
+        if not workers:
+            raise RuntimeError('No live session workers')
+        policy = self._policy
+        if policy == 'round_robin':
+            return workers[self._round_robin.next() % len(workers)]
+        if policy == 'sticky':
+            worker = self._sticky.get(name)
+            if worker is None or not worker.alive:
+                worker = min(workers, key=lambda w: len(w.sessions))
+                self._sticky[name] = worker
+            return worker
+        key = lambda w: (len(w.sessions), w.report.get('objects', 0))
+        return min(workers, key=key)
+
+    def _on_worker_exit(self, worker):
+        """ Handle the unexpected exit of a worker process.
+
+        The sessions hosted by the worker are closed, and the worker is
+        replaced by a new process.
+
+        """
+        if not worker.alive:
+            return
+        logger.error('Session worker %d exited' % worker.index)
+        worker.stop()
+        for session_id in list(worker.sessions):
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                session.socket.send(session_id, 'close', {})
+                session.close()
+            self._client_sockets.pop(session_id, None)
+        index = worker.index
+        replacement = ShardWorker(self, index, self._report_interval)
+        self._workers[index] = replacement
+
+    #--------------------------------------------------------------------------
+    # Worker Message Handlers
+    #--------------------------------------------------------------------------
+    def on_message_opened(self, worker, session_id, info):
+        """ Handle the 'opened' message from a worker.
+
+        """
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.opened(info)
+
+    def on_message_message(self, worker, session_id, object_id, action,
+                           content):
+        """ Handle a session 'message' from a worker.
+
+        """
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.deliver(object_id, action, content)
+
+    def on_message_error(self, worker, session_id, message):
+        """ Handle the 'error' message from a worker.
+
+        """
+        msg = 'Session %s failed to start in worker %d: %s'
+        logger.error(msg % (session_id, worker.index, message))
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            session.socket.send(session_id, 'close', {})
+            session.close()
+        self._client_sockets.pop(session_id, None)
+
+    def on_message_hibernated(self, worker, session_id, state):
+        """ Handle the 'hibernated' message from a worker.
+
+        """
+        session = self._sessions.get(session_id)
+        store = self._session_store
+        if session is None or store is None:
+            return
+        data = {'name': session.factory_name, 'state': state}
+        store.save(session_id, data)
+        session.deliver(session_id, 'hibernate', {})
+        self.end_session(session_id)
+
+    def on_message_report(self, worker, info):
+        """ Handle the 'report' message from a worker.
+
+        """
+        worker.report = info
+        worker.report_time = time.time()
+        sessions = self._sessions
+        for session_id, counts in info.get('usage', {}).iteritems():
+            session = sessions.get(session_id)
+            if session is not None:
+                session.update_usage(counts)
+
+    #--------------------------------------------------------------------------
+    # Abstract API Implementation
+    #--------------------------------------------------------------------------
+    def start_session(self, name, state=None):
+        """ Start a new session of the given name in a worker process.
+
+        Parameters
+        ----------
+        name : str
+            The name of the session to start.
+
+        state : list, optional
+            The hibernated state to restore onto the session. This is
+            used by `resume_session`.
+
+        Returns
+        -------
+        result : str
+            The unique identifier for the created session.
+
+        """
+        if name not in self._named_factories:
+            raise ValueError('Invalid session name')
+        worker = self._select_worker(name)
+        session_id = uuid.uuid4().hex
+        socket = self._transport(session_id)
+        session = RemoteSession(session_id, name, worker, socket)
+        self._sessions[session_id] = session
+        worker.sessions.add(session_id)
+        worker.post(('start', session_id, name, state))
+        return session_id
+
+    def end_session(self, session_id):
+        """ End the session with the given session id.
+
+        Parameters
+        ----------
+        session_id : str
+            The unique identifier for the session to close.
+
+        """
+        if session_id not in self._sessions:
+            raise ValueError('Invalid session id')
+        session = self._sessions.pop(session_id)
+        session.worker.post(('end', session_id))
+        session.close()
+        self._client_sockets.pop(session_id, None)
+
+    #--------------------------------------------------------------------------
+    # Public API
+    #--------------------------------------------------------------------------
+    def hibernate_session(self, session_id):
+        """ Hibernate a session to the session store.
+
+        The state of the session is captured by its worker. The session
+        is saved to the store and ended when the worker replies, after
+        this method has returned. See also:
+        `Application.hibernate_session`.
+
+        Parameters
+        ----------
+        session_id : str
+            The unique identifier of the session to hibernate.
+
+        """
+        if self._session_store is None:
+            raise RuntimeError('The application has no session store')
+        session = self.session(session_id)
+        if session is None:
+            raise ValueError('Invalid session id')
+        session.worker.post(('hibernate', session_id))
+
+    def resume_session(self, session_id):
+        """ Resume a session from the session store.
+
+        The state of the session is restored in the worker which hosts
+        the new session. See also: `Application.resume_session`.
+
+        Parameters
+        ----------
+        session_id : str
+            The unique identifier of the hibernated session.
+
+        Returns
+        -------
+        result : str
+            The unique identifier of the resumed session.
+
+        """
+        store = self._session_store
+        if store is None:
+            raise RuntimeError('The application has no session store')
+        data = store.load(session_id)
+        if data is None:
+            raise ValueError('Invalid hibernated session id')
+        new_id = self.start_session(data['name'], data['state'])
+        store.delete(session_id)
+        return new_id
+
+    def worker_stats(self):
+        """ Get the health and load information of the workers.
+
+        Returns
+        -------
+        result : list
+            A list of dicts with the 'index', 'pid', 'alive' state,
+            number of 'sessions', the last load 'report' and its age
+            in seconds as 'report_age' for each worker.
+
+        """
+        return [worker.info() for worker in self._workers]
+
+    def destroy(self):
+        """ Destroy this application and stop the worker processes.
+
+        """
+        super(ShardedApplication, self).destroy()
+        for worker in self._workers:
+            worker.stop()
+        for worker in self._workers:
+            worker.process.join(1.0)
+        self._workers = []
@@ -0,0 +1,247 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Support for hibernating the state of a session to a store.
+
+The state of a session is the state of the object trees of its windows.
+The state of an object is the value of its user attributes, declared
+with `attr` in an enamldef, and of the attributes it publishes to its
+client. A hibernated session is rebuilt by its factory, and its state
+is restored onto the new object trees, which are matched to the saved
+trees by the position of each object among the children of its parent.
+
+Only the values which can be pickled are saved, and the enamldef which
+builds the session must create the same object trees from the same
+state for the restore to be complete.
+
+"""
+import cPickle
+import logging
+import os
+
+from enaml.core.declarative import UserAttribute
+from enaml.core.messenger import PublishAttributeNotifier
+
+
+logger = logging.getLogger(__name__)
+
+
+def _published_names(obj):
+    """ Get the names of the attributes published by an object.
+
+    """
+    names = []
+    for name, ctrait in obj._instance_traits().iteritems():
+        notifiers = ctrait._notifiers(0)
+        if notifiers and PublishAttributeNotifier in notifiers:
+            names.append(name)
+    return names
+
+
+def _user_names(obj):
+    """ Get the names of the user attributes which are set on an object.
+
+    """
+    dct = obj.__dict__
+    names = []
+    for name, ctrait in obj.class_traits().iteritems():
+        if isinstance(ctrait.trait_type, UserAttribute) and name in dct:
+            names.append(name)
+    return names
+
+
+def capture_object(obj):
+    """ Capture the state of an object tree.
+
+    Parameters
+    ----------
+    obj : Object
+        The root of the object tree.
+
+    Returns
+    -------
+    result : dict
+        A dict with the 'class' name of the object, the pickled 'state'
+        of its attributes, and the captured state of its 'children'.
+
+    """
+    state = {}
+    for name in _user_names(obj) + _published_names(obj):
+        value = getattr(obj, name)
+        try:
+            state[name] = cPickle.dumps(value, cPickle.HIGHEST_PROTOCOL)
+        except Exception:
+            msg = 'Cannot save the `%s` attribute of %s'
+            logger.debug(msg % (name, obj))
+    children = [capture_object(child) for child in obj.children]
+    return {
+        'class': type(obj).__name__, 'state': state, 'children': children,
+    }
+
+
+def restore_object(obj, saved):
+    """ Restore the captured state of an object tree.
+
+    The attributes of the object are restored before its children are
+    matched, so that the children created by templates, such as the
+    items of a Looper, reflect the restored state.
+
+    Parameters
+    ----------
+    obj : Object
+        The root of the object tree.
+
+    saved : dict
+        The state of the tree returned by `capture_object`.
+
+    """
+    if type(obj).__name__ != saved['class']:
+        msg = 'Cannot restore the state of %s from a saved `%s`'
+        logger.warn(msg % (obj, saved['class']))
+        return
+    for name, data in saved['state'].iteritems():
+        value = cPickle.loads(data)
+        try:
+            if getattr(obj, name) == value:
+                continue
+        except Exception:
+            pass
+        setattr(obj, name, value)
+    for child, saved_child in zip(obj.children, saved['children']):
+        restore_object(child, saved_child)
+
+
+def capture_session(session):
+    """ Capture the state of the windows of a session.
+
+    Parameters
+    ----------
+    session : Session
+        The session to capture.
+
+    Returns
+    -------
+    result : list
+        The captured state of each window of the session.
+
+    """
+    return [capture_object(window) for window in session.windows]
+
+
+def restore_session(session, state):
+    """ Restore the captured state of the windows of a session.
+
+    Parameters
+    ----------
+    session : Session
+        The session to restore. It should have been created by the
+        same factory as the captured session.
+
+    state : list
+        The state returned by `capture_session`.
+
+    """
+    for window, saved in zip(session.windows, state):
+        restore_object(window, saved)
+
+
+class SessionStore(object):
+    """ An in-memory store for hibernated sessions.
+
+    This is the base class for session stores. It keeps the pickled
+    state in memory, which is useful for testing. Subclasses store the
+    state elsewhere by reimplementing `save`, `load` and `delete`.
+
+    """
+    def __init__(self):
+        self._data = {}
+
+    def save(self, session_id, data):
+        """ Save the data of a hibernated session.
+
+        Parameters
+        ----------
+        session_id : str
+            The identifier of the hibernated session.
+
+        data : dict
+            The picklable data of the session.
+
+        """
+        self._data[session_id] = cPickle.dumps(data, cPickle.HIGHEST_PROTOCOL)
+
+    def load(self, session_id):
+        """ Load the data of a hibernated session.
+
+        Parameters
+        ----------
+        session_id : str
+            The identifier of the hibernated session.
+
+        Returns
+        -------
+        result : dict or None
+            The saved data of the session, or None if the session is
+            not in the store.
+
+        """
+        data = self._data.get(session_id)
+        if data is not None:
+            return cPickle.loads(data)
+
+    def delete(self, session_id):
+        """ Delete the data of a hibernated session.
+
+        Parameters
+        ----------
+        session_id : str
+            The identifier of the hibernated session.
+
+        """
+        self._data.pop(session_id, None)
+
+
+class DirectorySessionStore(SessionStore):
+    """ A session store which saves each session to a file in a local
+    directory.
+
+    """
+    def __init__(self, path):
+        """ Initialize a DirectorySessionStore.
+
+        Parameters
+        ----------
+        path : str
+            The directory in which to save the sessions. It is created
+            if it does not exist.
+
+        """
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        self._path = path
+
+    def _filename(self, session_id):
+        if os.sep in session_id or session_id.startswith('.'):
+            raise ValueError('Invalid session id `%s`' % session_id)
+        return os.path.join(self._path, session_id + '.session')
+
+    def save(self, session_id, data):
+        filename = self._filename(session_id)
+        with open(filename + '.tmp', 'wb') as f:
+            cPickle.dump(data, f, cPickle.HIGHEST_PROTOCOL)
+        os.rename(filename + '.tmp', filename)
+
+    def load(self, session_id):
+        try:
+            f = open(self._filename(session_id), 'rb')
+        except IOError:
+            return None
+        with f:
+            return cPickle.load(f)
+
+    def delete(self, session_id):
+        try:
+            os.remove(self._filename(session_id))
+        except OSError:
+            pass
@@ -0,0 +1,490 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Codecs for serializing session messages for transmission on a wire.
+
+A session message is an (object_id, action, content) triple. A codec
+encodes a message into a list of byte string frames, and decodes such
+a list back into a message. Codecs may be stateful, in which case a
+separate codec instance must be used for each connection, and the
+frames must be decoded in the order in which they were encoded.
+
+"""
+from abc import ABCMeta, abstractmethod
+import json
+from math import copysign
+from struct import Struct
+
+
+class MessageCodec(object):
+    """ An abstract base class defining the message codec interface.
+
+    """
+    __metaclass__ = ABCMeta
+
+    #: The name under which the codec is registered.
+    name = ''
+
+    @abstractmethod
+    def encode(self, object_id, action, content):
+        """ Encode a message into a list of frames.
+
+        Parameters
+        ----------
+        object_id : str
+            The object id of the target object.
+
+        action : str
+            The action that should be performed by the object.
+
+        content : dict
+            The content dictionary for the action.
+
+        Returns
+        -------
+        result : list
+            The list of byte strings or buffers which represent the
+            encoded message.
+
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def decode(self, frames):
+        """ Decode a list of frames into a message.
+
+        Parameters
+        ----------
+        frames : list
+            The list of byte strings which were produced by a call to
+            `encode` on the peer codec.
+
+        Returns
+        -------
+        result : tuple
+            The (object_id, action, content) triple for the message.
+
+        """
+        raise NotImplementedError
+
+
+class JSONCodec(MessageCodec):
+    """ A stateless codec which encodes a message as a JSON array.
+
+    This codec is the most portable, but it repeats the object ids and
+    action names in every message and cannot carry raw binary data.
+
+    """
+    name = 'json'
+
+    def encode(self, object_id, action, content):
+        """ Encode a message into a single JSON frame.
+
+        """
+        return [json.dumps([object_id, action, content])]
+
+    def decode(self, frames):
+        """ Decode a message from a single JSON frame.
+
+        """
+        if len(frames) != 1:
+            raise ValueError('Invalid JSON message: %s' % frames)
+        object_id, action, content = json.loads(frames[0])
+        return object_id, action, content
+
+
+_uint16 = Struct('<H')
+_uint32 = Struct('<I')
+_int8 = Struct('<b')
+_int32 = Struct('<i')
+_int64 = Struct('<q')
+_double = Struct('<d')
+
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+
+def _pack_size(tag, size):
+    """ Pack a tag with a size or index using the smallest width.
+
+    The width is selected by the case of the tag: a lowercase tag is
+    followed by a single byte, an uppercase tag by two bytes, and the
+    tag prefixed with '+' by four bytes.
+
+    """
+    if size < 0x100:
+        return tag + chr(size)
+    if size < 0x10000:
+        return tag.upper() + _uint16.pack(size)
+    return '+' + tag + _uint32.pack(size)
+
+
+class BinaryCodec(MessageCodec):
+    """ A stateful codec which uses a compact tagged binary encoding.
+
+    Object ids, action names and byte string dict keys are interned
+    per connection: the first occurrence of a string is sent in full
+    and assigned an index, and later occurrences send only the index.
+    Other string values are always sent in full, so that the contents
+    of the messages do not fill the intern table. Byte strings and buffers larger than `frame_threshold`
+    are sent as separate frames, without being copied or escaped, so
+    they can carry raw binary data such as images. Sizes, indices and
+    integers are written with the smallest width which holds them.
+
+    Since the intern tables are built as messages are encoded, each
+    connection must use its own codec instance and decode the frames
+    in the order they were encoded.
+
+    """
+    name = 'binary'
+
+    #: The maximum number of entries in the intern table. Strings seen
+    #: after the table is full are sent in full.
+    max_interned = 1 << 16
+
+    #: The minimum size of a byte string value which is sent as a
+    #: separate frame.
+    frame_threshold = 4096
+
+    def __init__(self):
+        """ Initialize a BinaryCodec.
+
+        """
+        self._encode_table = {}
+        self._decode_table = []
+        self._encoders = {
+            str: self._encode_str,
+            unicode: self._encode_unicode,
+            bool: self._encode_bool,
+            int: self._encode_int,
+            long: self._encode_int,
+            float: self._encode_float,
+            type(None): self._encode_none,
+            dict: self._encode_dict,
+            list: self._encode_list,
+            tuple: self._encode_list,
+            buffer: self._encode_buffer,
+            bytearray: self._encode_buffer,
+            memoryview: self._encode_buffer,
+        }
+        self._decoders = {
+            'r': self._decode_ref, 'R': self._decode_ref,
+            'n': self._decode_new, 'N': self._decode_new,
+            's': self._decode_str, 'S': self._decode_str,
+            'u': self._decode_unicode, 'U': self._decode_unicode,
+            'l': self._decode_list, 'L': self._decode_list,
+            'm': self._decode_dict, 'M': self._decode_dict,
+            'b': self._decode_buffer, 'B': self._decode_buffer,
+            'i': self._decode_int8, 'I': self._decode_int32,
+            'q': self._decode_int64, 'x': self._decode_long,
+            'f': self._decode_float8, 'd': self._decode_double,
+            '0': self._decode_none, 'T': self._decode_true,
+            'F': self._decode_false, '+': self._decode_wide,
+        }
+
+    #--------------------------------------------------------------------------
+    # Encoding
+    #--------------------------------------------------------------------------
+    def _encode_interned(self, value, parts, frames=None):
+        """ Encode a byte string using the intern table.
+
+        """
+        table = self._encode_table
+        idx = table.get(value)
+        if idx is not None:
+            parts.append(_pack_size('r', idx))
+        elif len(table) < self.max_interned:
+            table[value] = len(table)
+            parts.append(_pack_size('n', len(value)))
+            parts.append(value)
+        else:
+            parts.append(_pack_size('s', len(value)))
+            parts.append(value)
+
+    def _encode_str(self, value, parts, frames):
+        size = len(value)
+        if size >= self.frame_threshold:
+            self._encode_buffer(value, parts, frames)
+        else:
+            parts.append(_pack_size('s', size))
+            parts.append(value)
+
+    def _encode_unicode(self, value, parts, frames):
+        data = value.encode('utf-8')
+        parts.append(_pack_size('u', len(data)))
+        parts.append(data)
+
+    def _encode_bool(self, value, parts, frames):
+        parts.append('T' if value else 'F')
+
+    def _encode_int(self, value, parts, frames):
+        if -0x80 <= value < 0x80:
+            parts.append('i' + _int8.pack(value))
+        elif -0x80000000 <= value < 0x80000000:
+            parts.append('I' + _int32.pack(value))
+        elif _INT64_MIN <= value <= _INT64_MAX:
+            parts.append('q' + _int64.pack(value))
+        else:
+            # Integers which do not fit in 64 bits are rare, so they
+            # are written as decimal digits with a fixed size prefix.
+            data = str(value)
+            parts.append('x' + _uint32.pack(len(data)))
+            parts.append(data)
+
+    def _encode_float(self, value, parts, frames):
+        # Small integral floats, which are common for constraints and
+        # geometry, are written in a single byte. Negative zero is
+        # excluded, since its sign would be lost.
+        if (-0x80 <= value < 0x80 and value == int(value) and
+                (value or copysign(1.0, value) > 0)):
+            parts.append('f' + _int8.pack(int(value)))
+        else:
+            parts.append('d' + _double.pack(value))
+
+    def _encode_none(self, value, parts, frames):
+        parts.append('0')
+
+    def _encode_dict(self, value, parts, frames):
+        parts.append(_pack_size('m', len(value)))
+        encoders = self._encoders
+        for key, item in value.iteritems():
+            if type(key) is str:
+                self._encode_interned(key, parts)
+            else:
+                self._encode_value(key, parts, frames)
+            handler = encoders.get(type(item))
+            if handler is None:
+                self._encode_value(item, parts, frames)
+            else:
+                handler(item, parts, frames)
+
+    def _encode_list(self, value, parts, frames):
+        parts.append(_pack_size('l', len(value)))
+        encoders = self._encoders
+        for item in value:
+            handler = encoders.get(type(item))
+            if handler is None:
+                self._encode_value(item, parts, frames)
+            else:
+                handler(item, parts, frames)
+
+    def _encode_buffer(self, value, parts, frames):
+        parts.append(_pack_size('b', len(frames)))
+        frames.append(value)
+
+    def _encode_value(self, value, parts, frames):
+        """ Encode a value into the list of parts.
+
+        """
+        handler = self._encoders.get(type(value))
+        if handler is not None:
+            handler(value, parts, frames)
+        elif isinstance(value, dict):
+            self._encode_dict(value, parts, frames)
+        elif isinstance(value, (list, tuple)):
+            self._encode_list(value, parts, frames)
+        elif isinstance(value, str):
+            self._encode_str(str(value), parts, frames)
+        elif isinstance(value, unicode):
+            self._encode_unicode(value, parts, frames)
+        else:
+            msg = 'Cannot encode value of type `%s`'
+            raise TypeError(msg % type(value).__name__)
+
+    def encode(self, object_id, action, content):
+        """ Encode a message into a list of frames.
+
+        The first frame holds the encoded message. Any large binary
+        values are appended as additional frames. A unicode object id
+        or action is encoded as a byte string.
+
+        """
+        if type(object_id) is unicode:
+            object_id = object_id.encode('utf-8')
+        if type(action) is unicode:
+            action = action.encode('utf-8')
+        parts = []
+        frames = [None]
+        self._encode_interned(object_id, parts)
+        self._encode_interned(action, parts)
+        self._encode_value(content, parts, frames)
+        frames[0] = ''.join(parts)
+        return frames
+
+    #--------------------------------------------------------------------------
+    # Decoding
+    #--------------------------------------------------------------------------
+    # Each decoder accepts the data, the tag, the offset following the
+    # tag, and the frames and returns a 2-tuple of (value, offset).
+    @staticmethod
+    def _read_size(data, tag, offset):
+        if tag.islower():
+            return ord(data[offset]), offset + 1
+        return _uint16.unpack_from(data, offset)[0], offset + 2
+
+    def _decode_wide(self, data, tag, offset, frames):
+        # A wide size has the lower case tag followed by four bytes.
+        # The decoders read the size using the `_read_size` helper, so
+        # the wide size is handled here for all sized tags.
+        tag = data[offset]
+        size, = _uint32.unpack_from(data, offset + 1)
+        return self._decode_sized(data, tag, size, offset + 5, frames)
+
+    def _decode_sized(self, data, tag, size, offset, frames):
+        if tag == 'r':
+            return self._decode_table[size], offset
+        if tag == 'b':
+            return frames[size], offset
+        if tag == 'l':
+            return self._read_list(data, size, offset, frames)
+        if tag == 'm':
+            return self._read_dict(data, size, offset, frames)
+        end = offset + size
+        value = data[offset:end]
+        if tag == 'n':
+            self._decode_table.append(value)
+        elif tag == 'u':
+            value = value.decode('utf-8')
+        elif tag != 's':
+            raise ValueError('Invalid binary message tag: %r' % tag)
+        return value, end
+
+    def _decode_ref(self, data, tag, offset, frames):
+        idx, offset = self._read_size(data, tag, offset)
+        return self._decode_table[idx], offset
+
+    def _decode_new(self, data, tag, offset, frames):
+        size, offset = self._read_size(data, tag, offset)
+        end = offset + size
+        value = data[offset:end]
+        self._decode_table.append(value)
+        return value, end
+
+    def _decode_str(self, data, tag, offset, frames):
+        size, offset = self._read_size(data, tag, offset)
+        end = offset + size
+        return data[offset:end], end
+
+    def _decode_unicode(self, data, tag, offset, frames):
+        size, offset = self._read_size(data, tag, offset)
+        end = offset + size
+        return data[offset:end].decode('utf-8'), end
+
+    def _read_list(self, data, count, offset, frames):
+        decoders = self._decoders
+        value = []
+        append = value.append
+        for ignored in xrange(count):
+            tag = data[offset]
+            item, offset = decoders[tag](data, tag, offset + 1, frames)
+            append(item)
+        return value, offset
+
+    def _read_dict(self, data, count, offset, frames):
+        decoders = self._decoders
+        value = {}
+        for ignored in xrange(count):
+            tag = data[offset]
+            key, offset = decoders[tag](data, tag, offset + 1, frames)
+            tag = data[offset]
+            value[key], offset = decoders[tag](data, tag, offset + 1, frames)
+        return value, offset
+
+    def _decode_list(self, data, tag, offset, frames):
+        count, offset = self._read_size(data, tag, offset)
+        return self._read_list(data, count, offset, frames)
+
+    def _decode_dict(self, data, tag, offset, frames):
+        count, offset = self._read_size(data, tag, offset)
+        return self._read_dict(data, count, offset, frames)
+
+    def _decode_buffer(self, data, tag, offset, frames):
+        idx, offset = self._read_size(data, tag, offset)
+        return frames[idx], offset
+
+    def _decode_int8(self, data, tag, offset, frames):
+        return _int8.unpack_from(data, offset)[0], offset + 1
+
+    def _decode_int32(self, data, tag, offset, frames):
+        return _int32.unpack_from(data, offset)[0], offset + 4
+
+    def _decode_int64(self, data, tag, offset, frames):
+        return _int64.unpack_from(data, offset)[0], offset + 8
+
+    def _decode_long(self, data, tag, offset, frames):
+        size, = _uint32.unpack_from(data, offset)
+        end = offset + 4 + size
+        return long(data[offset + 4:end]), end
+
+    def _decode_float8(self, data, tag, offset, frames):
+        return float(_int8.unpack_from(data, offset)[0]), offset + 1
+
+    def _decode_double(self, data, tag, offset, frames):
+        return _double.unpack_from(data, offset)[0], offset + 8
+
+    def _decode_none(self, data, tag, offset, frames):
+        return None, offset
+
+    def _decode_true(self, data, tag, offset, frames):
+        return True, offset
+
+    def _decode_false(self, data, tag, offset, frames):
+        return False, offset
+
+    def _decode_value(self, data, offset, frames):
+        """ Decode a value from the data at the given offset.
+
+        Returns
+        -------
+        result : tuple
+            A 2-tuple of the decoded value and the new offset.
+
+        """
+        tag = data[offset]
+        try:
+            decoder = self._decoders[tag]
+        except KeyError:
+            raise ValueError('Invalid binary message tag: %r' % tag)
+        return decoder(data, tag, offset + 1, frames)
+
+    def decode(self, frames):
+        """ Decode a list of frames into a message.
+
+        """
+        data = frames[0]
+        decode = self._decode_value
+        object_id, offset = decode(data, 0, frames)
+        action, offset = decode(data, offset, frames)
+        content, offset = decode(data, offset, frames)
+        if offset != len(data):
+            raise ValueError('Invalid binary message length')
+        return object_id, action, content
+
+
+#: A mapping of codec name to codec class.
+CODECS = {
+    JSONCodec.name: JSONCodec,
+    BinaryCodec.name: BinaryCodec,
+}
+
+
+def make_codec(name):
+    """ Create a new codec instance for the given codec name.
+
+    Parameters
+    ----------
+    name : str
+        The name of the codec. Either 'json' or 'binary'.
+
+    Returns
+    -------
+    result : MessageCodec
+        A new instance of the requested codec.
+
+    """
+    try:
+        cls = CODECS[name]
+    except KeyError:
+        raise ValueError('Unknown message codec `%s`' % name)
+    return cls()
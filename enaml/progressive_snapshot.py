@@ -0,0 +1,153 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Support for splitting snapshots into a skeleton and streamed chunks.
+
+A snapshot tree is split by detaching the children of the nodes at the
+skeleton depth. The detached children are delivered to the client as
+'snapshot_chunk' items of the form {'parent_id': str, 'added': list},
+which the client builds as if the children had been added by a
+'children_changed' action. A detached subtree which is larger than the
+chunk size has its own children detached in turn, so that the client
+can build a large window incrementally.
+
+Subtrees which are not visible are streamed last: the children of an
+invisible widget, the pages of a Notebook other than the first, and
+the items of a Stack other than the current index.
+
+"""
+
+
+def _is_a(tree, name):
+    """ Get whether a snapshot tree is an instance of a named class.
+
+    """
+    return tree['class'] == name or name in tree['bases']
+
+
+def _hidden_children(tree):
+    """ Get the indices of the children of a tree which are not visible.
+
+    """
+    children = tree['children']
+    if _is_a(tree, 'Notebook'):
+        pages = [i for i, c in enumerate(children) if _is_a(c, 'Page')]
+        return set(pages[1:])
+    if _is_a(tree, 'Stack'):
+        items = [i for i, c in enumerate(children) if _is_a(c, 'StackItem')]
+        index = tree.get('index', 0)
+        return set(i for n, i in enumerate(items) if n != index)
+    return ()
+
+
+def _tree_sizes(tree, sizes):
+    """ Compute the number of nodes in each subtree of a tree.
+
+    The sizes are stored in the given dict, keyed on the id of the
+    subtree dict. The size of the given tree is returned.
+
+    """
+    size = 1
+    for child in tree['children']:
+        size += _tree_sizes(child, sizes)
+    sizes[id(tree)] = size
+    return size
+
+
+def _node_count(tree):
+    """ Count the nodes which remain in a tree.
+
+    """
+    count = 1
+    for child in tree['children']:
+        count += _node_count(child)
+    return count
+
+
+class SnapshotSplitter(object):
+    """ An object which splits snapshot trees into a skeleton and a
+    prioritized list of chunks.
+
+    """
+    def __init__(self, skeleton_depth=2, chunk_size=500):
+        """ Initialize a SnapshotSplitter.
+
+        Parameters
+        ----------
+        skeleton_depth : int, optional
+            The depth of the nodes which are sent in the skeleton. The
+            root of a tree has a depth of zero. The default is 2.
+
+        chunk_size : int, optional
+            The approximate number of nodes to send in a chunk. This is
+            a soft limit, since the children of a node are always sent
+            together. The default is 500.
+
+        """
+        self.skeleton_depth = skeleton_depth
+        self.chunk_size = chunk_size
+
+    def _walk(self, tree, depth, hidden, entries, sizes):
+        """ Walk a tree and detach the children which are streamed.
+
+        """
+        children = tree['children']
+        if not children:
+            return
+        hidden = hidden or not tree.get('visible', True)
+        hidden_children = _hidden_children(tree)
+        if depth >= self.skeleton_depth:
+            tree['children'] = []
+            entries.append((hidden, len(entries), tree['object_id'], children))
+            limit = self.chunk_size
+            for idx, child in enumerate(children):
+                if sizes[id(child)] > limit:
+                    child_hidden = hidden or idx in hidden_children
+                    self._walk(child, depth + 1, child_hidden, entries, sizes)
+        else:
+            for idx, child in enumerate(children):
+                child_hidden = hidden or idx in hidden_children
+                self._walk(child, depth + 1, child_hidden, entries, sizes)
+
+    def split(self, trees):
+        """ Split the given snapshot trees in place.
+
+        Parameters
+        ----------
+        trees : list
+            The list of snapshot trees to split. The nodes below the
+            skeleton depth are detached from the trees.
+
+        Returns
+        -------
+        result : list
+            The list of chunks to stream to the client, in order. Each
+            chunk is a list of {'parent_id', 'added'} items. A parent is
+            always sent before its detached children.
+
+        """
+        sizes = {}
+        entries = []
+        for tree in trees:
+            _tree_sizes(tree, sizes)
+            self._walk(tree, 0, False, entries, sizes)
+
+        # The entries are in pre-order, and a hidden node only has
+        # hidden descendants, so a stable sort on the hidden flag
+        # keeps every parent ahead of its detached children.
+        entries.sort()
+        chunks = []
+        chunk = []
+        count = 0
+        limit = self.chunk_size
+        for hidden, seq, parent_id, children in entries:
+            chunk.append({'parent_id': parent_id, 'added': children})
+            count += sum(_node_count(child) for child in children)
+            if count >= limit:
+                chunks.append(chunk)
+                chunk = []
+                count = 0
+        if chunk:
+            chunks.append(chunk)
+        return chunks
@@ -80,7 +80,8 @@ class QtApplication(Application):
         groups = session.widget_groups[:]
         qt_session = QtSession(session_id, groups)
         self._qt_sessions[session_id] = qt_session
-        qt_session.open(session.snapshot())
+        snapshot = session.client_snapshot()
+        qt_session.open(snapshot)
 
         # Setup the sockets for the session pair
         server_socket = QActionSocket()
@@ -89,6 +90,12 @@ class QtApplication(Application):
         server_socket.messagePosted.connect(client_socket.receive, conn)
         client_socket.messagePosted.connect(server_socket.receive, conn)
 
+        # Record the session traffic if the application has a recorder.
+        recorder = self._recorder
+        if recorder is not None:
+            recorder.record_session(session_id, name, groups, snapshot)
+            server_socket = recorder.wrap(server_socket)
+
         # Activate the server and client sessions. The server session
         # is activated first so that it is ready to receive messages
         # sent by the client during activation. These messages will
@@ -175,6 +182,9 @@ class QtApplication(Application):
             the callback.
 
         """
+        stats = self._stats
+        if stats is not None:
+            stats.deferred_call()
         deferredCall(callback, *args, **kwargs)
 
     def timed_call(self, ms, callback, *args, **kwargs):
@@ -195,6 +205,9 @@ class QtApplication(Application):
             the callback.
 
         """
+        stats = self._stats
+        if stats is not None:
+            stats.timed_call()
         timedCall(ms, callback, *args, **kwargs)
 
     def is_main_thread(self):
@@ -257,6 +257,9 @@ class QtNotebook(QtConstraintsWidget):
     """ A Qt implementation of an Enaml Notebook.
 
     """
+    #: Whether the server loads the content of the pages lazily.
+    _lazy_load = False
+
     #--------------------------------------------------------------------------
     # Setup methods
     #--------------------------------------------------------------------------
@@ -281,6 +284,7 @@ class QtNotebook(QtConstraintsWidget):
         self.set_tab_position(tree['tab_position'])
         self.set_tabs_closable(tree['tabs_closable'])
         self.set_tabs_movable(tree['tabs_movable'])
+        self._lazy_load = tree.get('lazy_load', False)
 
     def init_layout(self):
         """ Handle the layout initialization for the notebook.
@@ -292,6 +296,8 @@ class QtNotebook(QtConstraintsWidget):
             if isinstance(child, QtPage):
                 widget.addPage(child.widget())
         widget.layoutRequested.connect(self.on_layout_requested)
+        if self._lazy_load:
+            widget.currentChanged.connect(self.on_current_changed)
 
     #--------------------------------------------------------------------------
     # Child Events
@@ -321,6 +327,20 @@ class QtNotebook(QtConstraintsWidget):
         """
         self.size_hint_updated()
 
+    def on_current_changed(self, index):
+        """ Handle the `currentChanged` signal from the QNotebook.
+
+        This is only connected when the server loads the content of
+        the pages lazily, and tells the server which page is shown.
+
+        """
+        page = self.widget().widget(index)
+        for child in self.children():
+            if isinstance(child, QtPage) and child.widget() is page:
+                content = {'page_id': child.object_id()}
+                self.send_action('current_changed', content)
+                break
+
     #--------------------------------------------------------------------------
     # Message Handlers
     #--------------------------------------------------------------------------
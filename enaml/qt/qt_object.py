@@ -515,6 +515,7 @@ class QtObject(object):
             object_id = tree['object_id']
             child = lookup(object_id)
             if child is not None:
+                self._session.register_types(tree)
                 child.set_parent(self)
             else:
                 child = self._session.build(tree, self)
@@ -12,6 +12,7 @@ import types
 import warnings
 
 from enaml import imports
+from enaml.core import binding_profiler
 from enaml.stdlib.sessions import show_simple_view
 from enaml.core.parser import parse
 from enaml.core.enaml_compiler import EnamlCompiler
@@ -72,6 +73,10 @@ def main():
         '-t', '--toolkit', default='default',
         help='The GUI toolkit to use [default: qt or ETS_TOOLKIT].'
     )
+    parser.add_option(
+        '--profile-bindings', action='store_true', default=False,
+        help='Print the evaluation times of the bindings on exit.'
+    )
 
     options, args = parser.parse_args()
     toolkit = prepare_toolkit(options.toolkit)
@@ -101,19 +106,26 @@ def main():
     sys.path.insert(0, os.path.abspath(os.path.dirname(enaml_file)))
     # Bung in the command line arguments.
     sys.argv = [enaml_file] + script_argv
+    if options.profile_bindings:
+        profiler = binding_profiler.enable_profiler()
     with imports():
         exec code in ns
 
-    requested = options.component
-    if requested in ns:
-        component = ns[requested]
-        descr = 'Enaml-run "%s" view' % requested
-        show_simple_view(component(), toolkit, descr)
-    elif 'main' in ns:
-        ns['main']()
-    else:
-        msg = "Could not find component '%s'" % options.component
-        print msg
+    try:
+        requested = options.component
+        if requested in ns:
+            component = ns[requested]
+            descr = 'Enaml-run "%s" view' % requested
+            show_simple_view(component(), toolkit, descr)
+        elif 'main' in ns:
+            ns['main']()
+        else:
+            msg = "Could not find component '%s'" % options.component
+            print msg
+    finally:
+        if options.profile_bindings:
+            binding_profiler.disable_profiler()
+            profiler.report(sys.stderr)
 
 
 if __name__ == '__main__':
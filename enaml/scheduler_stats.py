@@ -0,0 +1,240 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from bisect import bisect_left
+from collections import deque
+from timeit import default_timer
+
+
+def callback_name(callback):
+    """ Get a qualified name for a callback.
+
+    Parameters
+    ----------
+    callback : callable
+        The callable object for which to generate a name.
+
+    Returns
+    -------
+    result : str
+        A qualified name of the form `module.Class.method` for bound
+        methods and `module.function` for functions. Other callables
+        use the qualified name of their type.
+
+    """
+    owner = getattr(callback, '__self__', None)
+    if owner is not None:
+        cls = type(owner)
+        return '%s.%s.%s' % (cls.__module__, cls.__name__, callback.__name__)
+    name = getattr(callback, '__name__', None)
+    if name is not None:
+        return '%s.%s' % (getattr(callback, '__module__', '?'), name)
+    cls = type(callback)
+    return '%s.%s' % (cls.__module__, cls.__name__)
+
+
+class Histogram(object):
+    """ A simple fixed-bucket histogram of observed values.
+
+    """
+    __slots__ = ('bounds', 'buckets', 'count', 'total', 'max')
+
+    #: The default bucket upper bounds, in milliseconds.
+    default_bounds = (0.1, 0.5, 1.0, 5.0, 10.0, 50.0, 100.0, 500.0, 1000.0)
+
+    def __init__(self, bounds=None):
+        """ Initialize a Histogram.
+
+        Parameters
+        ----------
+        bounds : sequence, optional
+            The sorted inclusive upper bounds of the buckets. Values
+            greater than the last bound are counted in an overflow
+            bucket. The default bounds are suitable for durations in
+            milliseconds.
+
+        """
+        if bounds is None:
+            bounds = self.default_bounds
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        """ Add an observed value to the histogram.
+
+        """
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self):
+        """ Get a dictionary summary of the histogram.
+
+        Returns
+        -------
+        result : dict
+            A dict with the 'count', 'total', 'mean', and 'max' of the
+            observed values, and a 'buckets' list of (bound, count)
+            pairs. The bound of the overflow bucket is None.
+
+        """
+        count = self.count
+        bounds = self.bounds + (None,)
+        info = {
+            'count': count,
+            'total': self.total,
+            'mean': self.total / count if count else 0.0,
+            'max': self.max,
+            'buckets': zip(bounds, self.buckets),
+        }
+        return info
+
+
+class SchedulerStats(object):
+    """ A collection of counters and histograms for the task scheduler.
+
+    An instance of this class is held by an Application while stats
+    collection is enabled. Durations are recorded in milliseconds.
+
+    """
+    #: The bucket bounds for the queue depth histogram.
+    depth_bounds = (1, 10, 100, 1000, 10000)
+
+    def __init__(self, max_depth_samples=1000):
+        """ Initialize a SchedulerStats.
+
+        Parameters
+        ----------
+        max_depth_samples : int, optional
+            The maximum number of (time, depth) samples of the queue
+            depth to retain. The default is 1000.
+
+        """
+        self.started = default_timer()
+        self.scheduled = 0
+        self.executed = 0
+        self.deferred_calls = 0
+        self.timed_calls = 0
+        self.depth_samples = deque(maxlen=max_depth_samples)
+        self.depth = Histogram(self.depth_bounds)
+        self.wait = Histogram()
+        self.execution = {}
+
+    def task_scheduled(self, depth):
+        """ Record that a task was added to the heap.
+
+        Parameters
+        ----------
+        depth : int
+            The depth of the heap after the task was added.
+
+        """
+        self.scheduled += 1
+        self.depth_samples.append((default_timer() - self.started, depth))
+        self.depth.add(depth)
+
+    def task_executed(self, callback, wait, elapsed):
+        """ Record that a task was executed.
+
+        Parameters
+        ----------
+        callback : callable
+            The callback which was executed by the task.
+
+        wait : float or None
+            The time in milliseconds between when the task was added
+            to the heap and when it was executed, or None if unknown.
+
+        elapsed : float
+            The execution time of the callback in milliseconds.
+
+        """
+        self.executed += 1
+        if wait is not None:
+            self.wait.add(wait)
+        name = callback_name(callback)
+        hist = self.execution.get(name)
+        if hist is None:
+            hist = self.execution[name] = Histogram()
+        hist.add(elapsed)
+
+    def deferred_call(self):
+        """ Record an invocation of `deferred_call`.
+
+        """
+        self.deferred_calls += 1
+
+    def timed_call(self):
+        """ Record an invocation of `timed_call`.
+
+        """
+        self.timed_calls += 1
+
+    def snapshot(self):
+        """ Get a dictionary summary of the collected stats.
+
+        Returns
+        -------
+        result : dict
+            A serializable dict of the collected counters, rates per
+            second, and histogram summaries.
+
+        """
+        duration = default_timer() - self.started
+        rate = lambda n: n / duration if duration > 0 else 0.0
+        info = {
+            'duration': duration,
+            'scheduled': self.scheduled,
+            'executed': self.executed,
+            'deferred_calls': self.deferred_calls,
+            'timed_calls': self.timed_calls,
+            'deferred_call_rate': rate(self.deferred_calls),
+            'timed_call_rate': rate(self.timed_calls),
+            'depth': self.depth.snapshot(),
+            'depth_samples': list(self.depth_samples),
+            'wait': self.wait.snapshot(),
+            'execution': dict(
+                (name, hist.snapshot())
+                for name, hist in self.execution.iteritems()
+            ),
+        }
+        return info
+
+    def summary(self, limit=10):
+        """ Get a human readable summary of the collected stats.
+
+        Parameters
+        ----------
+        limit : int, optional
+            The maximum number of callbacks to include, sorted by the
+            total execution time. The default is 10.
+
+        Returns
+        -------
+        result : str
+            A multi-line summary string suitable for logging.
+
+        """
+        info = self.snapshot()
+        wait = info['wait']
+        lines = [
+            'scheduler: %d scheduled, %d executed in %.1fs' % (
+                info['scheduled'], info['executed'], info['duration']),
+            'deferred calls: %.1f/s, timed calls: %.1f/s' % (
+                info['deferred_call_rate'], info['timed_call_rate']),
+            'queue depth: max %d, wait: mean %.3fms max %.3fms' % (
+                info['depth']['max'], wait['mean'], wait['max']),
+        ]
+        items = sorted(
+            info['execution'].iteritems(), key=lambda item: -item[1]['total']
+        )
+        for name, hist in items[:limit]:
+            lines.append('  %10.3fms %8d calls %10.3fms max  %s' % (
+                hist['total'], hist['count'], hist['max'], name))
+        return '\n'.join(lines)
@@ -3,15 +3,19 @@
 #  All rights reserved.
 #------------------------------------------------------------------------------
 import logging
+from timeit import default_timer
 
 from traits.api import (
-    HasTraits, Instance, List, Str, ReadOnly, Enum, Property, on_trait_change
+    HasTraits, Instance, List, Str, ReadOnly, Enum, Property, Bool, Int,
+    Float, Dict, Tuple, on_trait_change
 )
 
 from enaml.widgets.window import Window
 
-from .application import deferred_call
+from .application import Application, deferred_call
+from .progressive_snapshot import SnapshotSplitter
 from .resource_manager import ResourceManager
+from .session_usage import SessionUsage
 from .signaling import Signal
 from .socket_interface import ActionSocketInterface
 from .utils import make_dispatcher
@@ -25,45 +29,99 @@ dispatch_action = make_dispatcher('on_action_', logger)
 
 
 class DeferredBatch(object):
-    """ A class which aggregates batch items.
+    """ A class which aggregates batched actions.
 
-    Each time an item is added to this object, its tick count is
-    incremented and a tick down event is posted to the event queue.
-    When the object receives the tick down event, it decrements its
-    tick count, and if it's zero, fires the `triggered` signal.
+    When the first action is added to the batch, a tick down event is
+    posted to the event queue. If more actions are added before the
+    event is processed, the event is posted once more when it fires.
+    When the event fires and no actions were added in the interim, the
+    `triggered` signal is emitted. The number of posted events is thus
+    proportional to the number of event loop cycles over which actions
+    are added, rather than to the number of actions.
 
     This allows a consumer of the batch to continually add items and
     have the `triggered` signal fired only when the event queue is
     fully drained of relevant messages.
 
+    Redundant actions are coalesced as they are added. Only the last
+    of repeated `set_*` or `relayout` actions for the same object is
+    retained, and the actions for an object which is destroyed within
+    the batch are dropped in favor of the `destroy` action. The session
+    drops the actions of the descendants of the object as well, since
+    the client destroys them with the object. The holes left by
+    coalesced actions are compacted once they outnumber the retained
+    actions, so that repeated actions do not grow the batch.
+
     """
     #: A signal emitted when the tick count of the batch reaches zero
     #: and the owner of the batch should consume the messages.
     triggered = Signal()
 
+    #: The names of the actions, in addition to the `set_*` actions,
+    #: for which only the most recent action for an object is kept.
+    coalesced_actions = frozenset(['relayout'])
+
+    #: The minimum number of holes left by coalesced actions before the
+    #: batch is compacted.
+    compact_threshold = 64
+
     def __init__(self):
         """ Initialize a DeferredBatch.
 
         """
         self._items = []
-        self._tick = 0
+        self._keys = {}
+        self._indices = {}
+        self._destroyed = set()
+        self._count = 0
+        self._posted = False
+        self._dirty = False
+
+    def __len__(self):
+        """ Get the number of items waiting in the batch.
+
+        The items which were coalesced or dropped are not counted.
+
+        """
+        return self._count
 
     #--------------------------------------------------------------------------
     # Private API
     #--------------------------------------------------------------------------
+    def _compact(self):
+        """ Remove the holes left by coalesced actions.
+
+        The retained items keep their relative order, and the indices
+        of the coalesced actions are rebuilt for the compacted items.
+
+        """
+        items = [item for item in self._items if item is not None]
+        keys = {}
+        indices = {}
+        coalesced = self.coalesced_actions
+        for idx, (object_id, action, task) in enumerate(items):
+            if action.startswith('set_') or action in coalesced:
+                keys[(object_id, action)] = idx
+            indices.setdefault(object_id, []).append(idx)
+        self._items = items
+        self._keys = keys
+        self._indices = indices
+
     def _tick_down(self):
         """ A private handler method which ticks down the batch.
 
         The tick down events are called in a deferred fashion to allow
-        for the aggregation of batch events. When the tick reaches
-        zero, the `triggered` signal will be emitted.
+        for the aggregation of batch events. When the tick down event
+        fires and no items have been added since it was posted, the
+        `triggered` signal will be emitted.
 
         """
-        self._tick -= 1
-        if self._tick == 0:
-            self.triggered.emit()
-        else:
+        if self._dirty:
+            self._dirty = False
             deferred_call(self._tick_down)
+        else:
+            self._posted = False
+            self.triggered.emit()
 
     #--------------------------------------------------------------------------
     # Public API
@@ -74,29 +132,98 @@ class DeferredBatch(object):
         Returns
         -------
         result : list
-            The list of items added to the batch.
+            The list of (object_id, action, task) items added to the
+            batch which were not coalesced, in the order they were
+            added.
 
         """
-        items = self._items
+        items = [item for item in self._items if item is not None]
         self._items = []
+        self._keys = {}
+        self._indices = {}
+        self._destroyed = set()
+        self._count = 0
         return items
 
-    def append(self, item):
-        """ Append an item to the batch.
+    def discard(self, object_ids):
+        """ Drop the pending actions of objects which are destroyed.
 
-        This will cause the batch to tick up and then start the tick
-        down process if necessary.
+        The actions which are later appended for the objects are also
+        dropped, until the batch is released.
 
         Parameters
         ----------
-        item : object
-            The item to add to the batch.
+        object_ids : iterable
+            The object ids of the client objects.
 
         """
-        self._items.append(item)
-        if self._tick == 0:
+        items = self._items
+        indices = self._indices
+        destroyed = self._destroyed
+        for object_id in object_ids:
+            destroyed.add(object_id)
+            for idx in indices.pop(object_id, ()):
+                if items[idx] is not None:
+                    items[idx] = None
+                    self._count -= 1
+
+    def revive(self, object_id):
+        """ Accept the actions of an object which was destroyed within
+        the batch and is activated again, such as the lazily loaded
+        content of a widget.
+
+        Parameters
+        ----------
+        object_id : str
+            The object id of the client object.
+
+        """
+        self._destroyed.discard(object_id)
+
+    def append(self, object_id, action, task):
+        """ Append an action to the batch.
+
+        This will cause the batch to start the tick down process if
+        necessary.
+
+        Parameters
+        ----------
+        object_id : str
+            The object id of the client object.
+
+        action : str
+            The action that should be performed by the object.
+
+        task : callable
+            A callable which will be invoked when the batch is sent.
+            It must return the content dictionary for the action.
+
+        """
+        if object_id in self._destroyed:
+            return
+        items = self._items
+        indices = self._indices
+        if action == 'destroy':
+            self.discard((object_id,))
+        elif action.startswith('set_') or action in self.coalesced_actions:
+            key = (object_id, action)
+            keys = self._keys
+            idx = keys.get(key)
+            if idx is not None:
+                items[idx] = None
+                self._count -= 1
+            keys[key] = len(items)
+        indices.setdefault(object_id, []).append(len(items))
+        items.append((object_id, action, task))
+        self._count += 1
+        holes = len(items) - self._count
+        if holes >= self.compact_threshold and holes > self._count:
+            self._compact()
+        if self._posted:
+            self._dirty = True
+        else:
+            self._posted = True
             deferred_call(self._tick_down)
-        self._tick += 1
 
 
 class URLReply(object):
@@ -159,6 +286,11 @@ class Session(HasTraits):
     #: not be manipulated by user code.
     session_id = ReadOnly
 
+    #: The name of the factory which created this session. This is set
+    #: by the SessionFactory and is used to rebuild the session when it
+    #: is resumed from hibernation.
+    factory_name = Str
+
     #: The top level windows which are managed by this session. This
     #: should be populated by user code during the `on_open` method.
     windows = List(Window)
@@ -171,6 +303,44 @@ class Session(HasTraits):
     #: be changed by the user.
     widget_groups = List(Str, ['default'])
 
+    #: Whether published attribute changes should be batched. When
+    #: True, the `set_*` actions generated by published attributes are
+    #: added to the session batch instead of being sent immediately.
+    #: Only the final value of an attribute is sent for each cycle of
+    #: the event loop, and the actions are delivered to the client in
+    #: a single `message_batch`. Note that batched actions may arrive
+    #: at the client after actions which are sent directly.
+    batch_attributes = Bool(False)
+
+    #: Whether snapshots should use compact type references. When True,
+    #: each snapshot node is given an integer 'type_ref' and only the
+    #: first node of a given type in the session carries the list of
+    #: 'bases'. The client caches the type info by reference, so it
+    #: must receive every snapshot of the session in order.
+    compact_types = Bool(False)
+
+    #: Whether window snapshots should be streamed progressively. When
+    #: True, a window snapshot only holds the nodes up to the depth of
+    #: `skeleton_depth`. The remaining subtrees are sent to the client
+    #: once the session is active, as 'snapshot_chunk' actions of about
+    #: `chunk_size` nodes, with the hidden subtrees sent last. Messages
+    #: sent by the session are always delivered after pending chunks.
+    progressive_snapshots = Bool(False)
+
+    #: The depth of the nodes included in a progressive snapshot.
+    skeleton_depth = Int(2)
+
+    #: The approximate number of nodes in a progressive snapshot chunk.
+    chunk_size = Int(500)
+
+    #: The limits of the resources used by the session. The dict maps
+    #: the name of a resource, such as 'objects' or 'bytes_sent', to a
+    #: (soft, hard) tuple of limits, either of which may be None. See
+    #: `enaml.session_usage.RESOURCES` for the resource names. When a
+    #: soft limit is reached, `on_soft_limit` is called. When a hard
+    #: limit is reached, `on_hard_limit` is called.
+    resource_limits = Dict(Str, Tuple)
+
     #: A resource manager used for loading resources for the session.
     resource_manager = Instance(ResourceManager, ())
 
@@ -212,6 +382,30 @@ class Session(HasTraits):
     #: This value should not be manipulated by user code.
     _registered_objects = Instance(dict, ())
 
+    #: The private accounting of the resources used by the session.
+    _usage = Instance(SessionUsage)
+    def __usage_default(self):
+        usage = SessionUsage(self.on_soft_limit, self.on_hard_limit)
+        for resource, (soft, hard) in self.resource_limits.iteritems():
+            usage.set_limit(resource, soft, hard)
+        return usage
+
+    #: A private dictionary mapping the id of a registered object to
+    #: the (expressions, listeners) counts it was registered with.
+    _binding_counts = Instance(dict, ())
+
+    #: The time of the last message received from the client, which is
+    #: used to find idle sessions.
+    _last_activity = Float
+
+    #: A private dictionary mapping the (class, bases) of a snapshot
+    #: node to its type reference. Used when `compact_types` is True.
+    _type_refs = Instance(dict, ())
+
+    #: A private list of the progressive snapshot chunks which have not
+    #: yet been sent to the client.
+    _snapshot_chunks = List
+
     #: The private deferred message batch used for collapsing layout
     #: related messages into a single batch to send to the client
     #: session for more efficient handling.
@@ -258,10 +452,57 @@ class Session(HasTraits):
         message batch.
 
         """
-        batch = [task() for task in self._batch.release()]
+        batch = [
+            (object_id, action, task())
+            for object_id, action, task in self._batch.release()
+        ]
+        self._usage.set('batch_size', 0)
         content = {'batch': batch}
         self.send(self.session_id, 'message_batch', content)
 
+    def _batch_append(self, object_id, action, task):
+        """ Append an action to the deferred message batch.
+
+        The client destroys the children of a destroyed object, so the
+        pending actions of the descendants of the object are dropped
+        when its `destroy` action is batched.
+
+        """
+        batch = self._batch
+        if action == 'destroy':
+            obj = self._registered_objects.get(object_id)
+            if obj is not None:
+                ids = [item.object_id for item in obj.traverse()]
+                batch.discard(ids[1:])
+        batch.append(object_id, action, task)
+        self._usage.set('batch_size', len(batch))
+
+    def _split_snapshot(self, trees):
+        """ Prepare window snapshot trees to send to the client.
+
+        If progressive snapshots are enabled, the trees are split and
+        the chunks are queued to be sent by `_send_chunks`.
+
+        """
+        if self.progressive_snapshots:
+            splitter = SnapshotSplitter(self.skeleton_depth, self.chunk_size)
+            self._snapshot_chunks.extend(splitter.split(trees))
+        return self.pack_types(trees)
+
+    def _send_chunks(self):
+        """ Send the pending progressive snapshot chunks to the client.
+
+        """
+        chunks = self._snapshot_chunks
+        if chunks and self.is_active:
+            self._snapshot_chunks = []
+            send = self.socket.send
+            session_id = self.session_id
+            for chunk in chunks:
+                for item in chunk:
+                    self.pack_types(item['added'])
+                send(session_id, 'snapshot_chunk', {'items': chunk})
+
     @on_trait_change('windows:destroyed')
     def _on_window_destroyed(self, obj, name, old, new):
         """ A trait handler for the `destroyed` event on the windows.
@@ -298,6 +539,61 @@ class Session(HasTraits):
         """
         pass
 
+    def on_soft_limit(self, resource, count, limit):
+        """ Called when the use of a resource reaches its soft limit.
+
+        The default implementation logs a warning. This method may be
+        reimplemented by subclasses to shed load, for example by
+        clearing a model which drives a Looper.
+
+        Parameters
+        ----------
+        resource : str
+            The name of the resource.
+
+        count : int
+            The current count of the resource.
+
+        limit : int
+            The soft limit of the resource.
+
+        """
+        msg = 'Session `%s` reached the soft limit of %s for `%s`: %s'
+        logger.warn(msg % (self.session_id, limit, resource, count))
+
+    def on_hard_limit(self, resource, count, limit):
+        """ Called when the use of a resource reaches its hard limit.
+
+        The default implementation logs an error and ends the session
+        on the next cycle of the event loop, so that a runaway session
+        cannot exhaust the resources of the host process.
+
+        Parameters
+        ----------
+        resource : str
+            The name of the resource.
+
+        count : int
+            The current count of the resource.
+
+        limit : int
+            The hard limit of the resource.
+
+        """
+        msg = 'Session `%s` reached the hard limit of %s for `%s`: %s; '
+        msg += 'ending the session.'
+        logger.error(msg % (self.session_id, limit, resource, count))
+        deferred_call(self._end_session)
+
+    def _end_session(self):
+        """ End the session with the application, if it is still open.
+
+        """
+        app = Application.instance()
+        session_id = self.session_id
+        if app is not None and app.session(session_id) is self:
+            app.end_session(session_id)
+
     #--------------------------------------------------------------------------
     # Public API
     #--------------------------------------------------------------------------
@@ -342,7 +638,9 @@ class Session(HasTraits):
             window.activate(self)
         self.socket = socket
         socket.on_message(self.on_message)
+        self._last_activity = default_timer()
         self.state = 'active'
+        self._send_chunks()
 
     def close(self):
         """ Called by the application when the session is closed.
@@ -362,10 +660,80 @@ class Session(HasTraits):
             window.destroy()
         self.windows = []
         self._registered_objects = {}
+        self._binding_counts = {}
+        self._snapshot_chunks = []
         self.socket.on_message(None)
         self.socket = None
         self.state = 'closed'
 
+    def idle_time(self):
+        """ Get the time since the client last sent a message.
+
+        Returns
+        -------
+        result : float
+            The number of seconds since the last message from the
+            client, or since the session was activated.
+
+        """
+        return default_timer() - self._last_activity
+
+    def usage(self):
+        """ Get the resources used by the session.
+
+        Returns
+        -------
+        result : dict
+            A dict with the 'counts' of the resources, their 'limits',
+            and the list of the (resource, kind) pairs whose 'soft' or
+            'hard' limits are 'exceeded'.
+
+        """
+        return self._usage.snapshot()
+
+    def set_limit(self, resource, soft=None, hard=None):
+        """ Set the limits of a resource used by the session.
+
+        Parameters
+        ----------
+        resource : str
+            The name of the resource, as listed in the `RESOURCES` of
+            the `enaml.session_usage` module.
+
+        soft : int, optional
+            The soft limit of the resource, or None for no limit.
+
+        hard : int, optional
+            The hard limit of the resource, or None for no limit.
+
+        """
+        self._usage.set_limit(resource, soft, hard)
+        if soft is None and hard is None:
+            self.resource_limits.pop(resource, None)
+        else:
+            self.resource_limits[resource] = (soft, hard)
+
+    def record_traffic(self, bytes_sent, bytes_received):
+        """ Account for the encoded bytes exchanged with the client.
+
+        This is called by transports which encode the messages of the
+        session. It should never be called by user code.
+
+        Parameters
+        ----------
+        bytes_sent : int
+            The number of bytes sent to the client.
+
+        bytes_received : int
+            The number of bytes received from the client.
+
+        """
+        usage = self._usage
+        if bytes_sent:
+            usage.add('bytes_sent', bytes_sent)
+        if bytes_received:
+            usage.add('bytes_received', bytes_received)
+
     def add_window(self, window):
         """ Add a window to the session's window list.
 
@@ -388,13 +756,23 @@ class Session(HasTraits):
                 # be told to create it. Otherwise, the window's parent
                 # will create it during the children changed event.
                 if window.parent is None:
-                    content = {'window': window.snapshot()}
-                    self.send(self.session_id, 'add_window', content)
+                    # Pending chunks are sent before the new window,
+                    # and the chunks of the new window after it.
+                    self._send_chunks()
+                    snap = self._split_snapshot([window.snapshot()])[0]
+                    content = {'window': snap}
+                    self.socket.send(self.session_id, 'add_window', content)
+                    self._send_chunks()
                 window.activate(self)
 
     def snapshot(self):
         """ Get a snapshot of the windows of this session.
 
+        The snapshot is the full tree of each window. It does not take
+        into account the `progressive_snapshots` or `compact_types` of
+        the session, and has no effect on the session. See also:
+        `client_snapshot`.
+
         Returns
         -------
         result : list
@@ -404,6 +782,63 @@ class Session(HasTraits):
         """
         return [window.snapshot() for window in self.windows]
 
+    def client_snapshot(self):
+        """ Get the snapshot of the windows to send to the client.
+
+        This should be called by the application only when the snapshot
+        is sent to the client which opens the session. If progressive
+        snapshots are enabled, the trees are split and the remaining
+        chunks are sent once the session is active. The type info of
+        the trees is packed with `pack_types`.
+
+        Returns
+        -------
+        result : list
+            A list of snapshots representing the current windows for
+            this session, prepared for the client.
+
+        """
+        snaps = self._split_snapshot(self.snapshot())
+        if self._snapshot_chunks and self.is_active:
+            deferred_call(self._send_chunks)
+        return snaps
+
+    def pack_types(self, trees):
+        """ Replace repeated type info with compact type references.
+
+        This is a no-op unless `compact_types` is True. Every snapshot
+        sent to the client should be passed through this method.
+
+        Parameters
+        ----------
+        trees : list
+            The list of snapshot trees to pack in place.
+
+        Returns
+        -------
+        result : list
+            The given list of trees.
+
+        """
+        if self.compact_types:
+            refs = self._type_refs
+            # The trees are walked in the same pre-order in which they
+            # are built by the client, which sees the bases first.
+            stack = trees[::-1]
+            pop = stack.pop
+            push = stack.extend
+            while stack:
+                tree = pop()
+                key = (tree['class'], tuple(tree['bases']))
+                ref = refs.get(key)
+                if ref is None:
+                    ref = refs[key] = len(refs)
+                else:
+                    del tree['bases']
+                tree['type_ref'] = ref
+                push(reversed(tree['children']))
+        return trees
+
     def register(self, obj):
         """ Register an object with the session.
 
@@ -416,7 +851,20 @@ class Session(HasTraits):
             The object to register with the session.
 
         """
-        self._registered_objects[obj.object_id] = obj
+        object_id = obj.object_id
+        self._registered_objects[object_id] = obj
+        self._batch.revive(object_id)
+        usage = self._usage
+        usage.add('objects', 1)
+        binding_counts = getattr(obj, '_binding_counts', None)
+        if binding_counts is None:
+            return
+        expressions, listeners = binding_counts()
+        self._binding_counts[object_id] = (expressions, listeners)
+        if expressions:
+            usage.add('expressions', expressions)
+        if listeners:
+            usage.add('listeners', listeners)
 
     def unregister(self, obj):
         """ Unregister an object from the session.
@@ -430,7 +878,14 @@ class Session(HasTraits):
             The object to unregister from the session.
 
         """
-        self._registered_objects.pop(obj.object_id, None)
+        object_id = obj.object_id
+        if self._registered_objects.pop(object_id, None) is not None:
+            usage = self._usage
+            usage.add('objects', -1)
+            counts = self._binding_counts.pop(object_id, None)
+            if counts is not None:
+                usage.add('expressions', -counts[0])
+                usage.add('listeners', -counts[1])
 
     #--------------------------------------------------------------------------
     # Messaging API
@@ -454,6 +909,9 @@ class Session(HasTraits):
 
         """
         if self.is_active:
+            if self._snapshot_chunks:
+                self._send_chunks()
+            self._usage.add('messages_sent', 1)
             self.socket.send(object_id, action, content)
 
     def batch(self, object_id, action, content):
@@ -478,8 +936,7 @@ class Session(HasTraits):
             The content dictionary for the action.
 
         """
-        task = lambda: (object_id, action, content)
-        self._batch.append(task)
+        self._batch_append(object_id, action, lambda: content)
 
     def batch_task(self, object_id, action, task):
         """ Similar to `batch` but takes a callable task.
@@ -498,8 +955,7 @@ class Session(HasTraits):
             content dictionary for the action.
 
         """
-        ctask = lambda: (object_id, action, task())
-        self._batch.append(ctask)
+        self._batch_append(object_id, action, task)
 
     def on_message(self, object_id, action, content):
         """ Receive a message sent to an object owned by this session.
@@ -521,6 +977,8 @@ class Session(HasTraits):
 
         """
         if self.is_active:
+            self._last_activity = default_timer()
+            self._usage.add('messages_received', 1)
             if object_id == self.session_id:
                 dispatch_action(self, action, content)
             else:
@@ -44,5 +44,7 @@ class SessionFactory(object):
             A new instance of the Session type provided to the factory.
 
         """
-        return self.session_class(*self.args, **self.kwargs)
+        session = self.session_class(*self.args, **self.kwargs)
+        session.factory_name = self.name
+        return session
 
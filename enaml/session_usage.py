@@ -0,0 +1,163 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+#: The resources which are accounted for each session.
+#:
+#: objects
+#:     The number of objects registered with the session.
+#: expressions
+#:     The number of expressions bound on the registered objects.
+#: listeners
+#:     The number of listeners bound on the registered objects.
+#: batch_size
+#:     The number of actions waiting in the session batch.
+#: messages_sent, messages_received
+#:     The number of messages exchanged with the client.
+#: bytes_sent, bytes_received
+#:     The number of encoded bytes exchanged with the client. These are
+#:     only counted by transports which encode the messages, such as
+#:     the ZMQServer.
+RESOURCES = (
+    'objects', 'expressions', 'listeners', 'batch_size', 'messages_sent',
+    'messages_received', 'bytes_sent', 'bytes_received',
+)
+
+
+class SessionUsage(object):
+    """ An object which accounts for the resources used by a session.
+
+    Each resource may have a soft and a hard limit. The first time the
+    count of a resource reaches one of its limits, the corresponding
+    handler is invoked with the resource name, the current count and
+    the limit. A handler is invoked again only after the count has
+    dropped below the limit.
+
+    """
+    __slots__ = ('counts', '_limits', '_exceeded', '_on_soft', '_on_hard')
+
+    def __init__(self, on_soft_limit, on_hard_limit):
+        """ Initialize a SessionUsage.
+
+        Parameters
+        ----------
+        on_soft_limit : callable
+            A callable invoked as `on_soft_limit(resource, count, limit)`
+            when a soft limit is reached.
+
+        on_hard_limit : callable
+            A callable invoked as `on_hard_limit(resource, count, limit)`
+            when a hard limit is reached.
+
+        """
+        self.counts = dict.fromkeys(RESOURCES, 0)
+        self._limits = {}
+        self._exceeded = set()
+        self._on_soft = on_soft_limit
+        self._on_hard = on_hard_limit
+
+    def set_limit(self, resource, soft=None, hard=None):
+        """ Set the limits for a resource.
+
+        Parameters
+        ----------
+        resource : str
+            The name of the resource, which must be one of RESOURCES.
+
+        soft : int, optional
+            The soft limit of the resource, or None for no limit.
+
+        hard : int, optional
+            The hard limit of the resource, or None for no limit.
+
+        """
+        if resource not in self.counts:
+            raise ValueError('Invalid session resource `%s`' % resource)
+        if soft is None and hard is None:
+            self._limits.pop(resource, None)
+        else:
+            self._limits[resource] = (soft, hard)
+        self._exceeded.discard((resource, 'soft'))
+        self._exceeded.discard((resource, 'hard'))
+
+    def limits(self):
+        """ Get the limits of the resources.
+
+        Returns
+        -------
+        result : dict
+            A dict mapping resource name to the (soft, hard) limits for
+            the resources which have limits.
+
+        """
+        return dict(self._limits)
+
+    def add(self, resource, delta):
+        """ Add to the count of a resource and check its limits.
+
+        Parameters
+        ----------
+        resource : str
+            The name of the resource.
+
+        delta : int
+            The amount to add to the count, which may be negative.
+
+        """
+        counts = self.counts
+        count = counts[resource] + delta
+        counts[resource] = count
+        limits = self._limits.get(resource)
+        if limits is not None:
+            self._check(resource, count, limits)
+
+    def set(self, resource, count):
+        """ Set the count of a resource and check its limits.
+
+        Parameters
+        ----------
+        resource : str
+            The name of the resource.
+
+        count : int
+            The new count of the resource.
+
+        """
+        self.counts[resource] = count
+        limits = self._limits.get(resource)
+        if limits is not None:
+            self._check(resource, count, limits)
+
+    def _check(self, resource, count, limits):
+        """ Invoke the handlers of the limits which are reached.
+
+        """
+        exceeded = self._exceeded
+        for kind, limit, handler in (
+                ('soft', limits[0], self._on_soft),
+                ('hard', limits[1], self._on_hard)):
+            if limit is None:
+                continue
+            key = (resource, kind)
+            if count >= limit:
+                if key not in exceeded:
+                    exceeded.add(key)
+                    handler(resource, count, limit)
+            else:
+                exceeded.discard(key)
+
+    def snapshot(self):
+        """ Get a dictionary of the usage of the session.
+
+        Returns
+        -------
+        result : dict
+            A dict with the 'counts' of the resources, their 'limits',
+            and the sorted list of 'exceeded' (resource, kind) pairs.
+
+        """
+        return {
+            'counts': dict(self.counts),
+            'limits': dict(self._limits),
+            'exceeded': sorted(self._exceeded),
+        }
@@ -0,0 +1,86 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Shared sessions, sockets and event loop helpers for the tests of the
+headless applications.
+
+"""
+try:
+    from enaml.headless.asyncio_api import asyncio
+except ImportError:
+    asyncio = None
+
+from enaml.session import Session
+from enaml.socket_interface import ActionSocketInterface
+from enaml.widgets.field import Field
+from enaml.widgets.window import Window
+
+
+class EmptySession(Session):
+    """ A session without windows.
+
+    """
+    def on_open(self):
+        pass
+
+
+class FormSession(Session):
+    """ A session with a window holding a single field.
+
+    """
+    def on_open(self):
+        window = Window()
+        Field(window)
+        self.windows.append(window)
+
+
+class FakeSocket(object):
+    """ A socket which records the messages sent by a session and lets
+    a test deliver client messages to it.
+
+    """
+    def __init__(self):
+        self.sent = []
+        self.callback = None
+
+    def on_message(self, callback):
+        self.callback = callback
+
+    def send(self, object_id, action, content):
+        self.sent.append((object_id, action, content))
+
+
+ActionSocketInterface.register(FakeSocket)
+
+
+def run_ready(app):
+    """ Run the event loop of an application until it has no more
+    ready callbacks.
+
+    """
+    loop = app.loop()
+    for idx in xrange(10):
+        loop.call_soon(loop.stop)
+        loop.run_forever()
+
+
+def run_for(app, ms):
+    """ Run the event loop of an application for a short time.
+
+    """
+    loop = app.loop()
+    loop.call_later(ms / 1000.0, loop.stop)
+    loop.run_forever()
+
+
+def run_until(app, predicate, tries=40, ms=50):
+    """ Run the event loop of an application until the predicate is
+    true, or raise an AssertionError after the given number of tries.
+
+    """
+    for idx in xrange(tries):
+        if predicate():
+            return
+        run_for(app, ms)
+    raise AssertionError('The condition was not met')
@@ -0,0 +1,384 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from collections import deque
+import os
+import shutil
+import tempfile
+from threading import Event
+import time
+import unittest
+
+from enaml.application import Application
+from enaml.worker_pool import WorkerError
+
+
+def add(a, b):
+    return a + b
+
+
+def make_lambda():
+    return lambda: None
+
+
+def touch(path):
+    open(path, 'w').close()
+
+
+class FakeApplication(Application):
+    """ A minimal Application which runs its event loop on demand.
+
+    """
+    def __init__(self):
+        super(FakeApplication, self).__init__([])
+        self.queue = deque()
+        self.cycles = 0
+
+    def start_session(self, name):
+        raise NotImplementedError
+
+    def end_session(self, session_id):
+        raise NotImplementedError
+
+    def session(self, session_id):
+        return None
+
+    def sessions(self):
+        return []
+
+    def start(self):
+        queue = self.queue
+        while queue:
+            callback, args, kwargs = queue.popleft()
+            self.cycles += 1
+            callback(*args, **kwargs)
+
+    def run_until(self, condition, timeout=5.0):
+        end = time.time() + timeout
+        while not condition():
+            if time.time() > end:
+                raise AssertionError('timed out waiting for condition')
+            self.start()
+            time.sleep(0.001)
+
+    def stop(self):
+        self.queue.clear()
+
+    def deferred_call(self, callback, *args, **kwargs):
+        stats = self._stats
+        if stats is not None:
+            stats.deferred_call()
+        self.queue.append((callback, args, kwargs))
+
+    def timed_call(self, ms, callback, *args, **kwargs):
+        stats = self._stats
+        if stats is not None:
+            stats.timed_call()
+        self.queue.append((callback, args, kwargs))
+
+    def is_main_thread(self):
+        return True
+
+
+class TestApplicationSchedule(unittest.TestCase):
+
+    def setUp(self):
+        self.app = FakeApplication()
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def test_single_task_per_cycle(self):
+        """ Test that the default budget runs one task per cycle.
+
+        """
+        app = self.app
+        results = []
+        for i in range(10):
+            app.schedule(results.append, (i,))
+        app.start()
+        self.assertEqual(results, range(10))
+        self.assertEqual(app.cycles, 10)
+
+    def test_task_budget_drains_in_one_cycle(self):
+        """ Test that a task budget drains many tasks per cycle.
+
+        """
+        app = self.app
+        app.set_task_budget(1000)
+        results = []
+        for i in range(100):
+            app.schedule(results.append, (i,))
+        app.start()
+        self.assertEqual(results, range(100))
+        self.assertEqual(app.cycles, 1)
+        self.assertFalse(app.has_pending_tasks())
+
+    def test_task_budget_priority_and_notify(self):
+        """ Test that a task budget respects priority and notifiers.
+
+        """
+        app = self.app
+        app.set_task_budget(1000)
+        results = []
+        notified = []
+        app.schedule(results.append, ('low',), priority=-1)
+        app.schedule(results.append, ('normal',))
+        task = app.schedule(lambda: 'high', priority=1)
+        task.notify(notified.append)
+        app.start()
+        self.assertEqual(notified, ['high'])
+        self.assertEqual(results, ['normal', 'low'])
+        self.assertFalse(task.pending())
+
+    def test_invalid_task_budget(self):
+        """ Test that a negative task budget is rejected.
+
+        """
+        self.assertRaises(ValueError, self.app.set_task_budget, -1)
+
+    def test_keyed_tasks_coalesce(self):
+        """ Test that tasks scheduled with the same key are coalesced.
+
+        """
+        app = self.app
+        results = []
+        notified = []
+        task = app.schedule(results.append, ('first',), key='foo')
+        task.notify(notified.append)
+        other = app.schedule(results.append, ('second',), key='foo')
+        app.schedule(results.append, ('bar',), key='bar')
+        self.assertIs(task, other)
+        app.start()
+        self.assertEqual(results, ['second', 'bar'])
+        self.assertEqual(notified, [None])
+        self.assertFalse(task.pending())
+
+    def test_keyed_task_after_execution(self):
+        """ Test that a key is released once its task is executed.
+
+        """
+        app = self.app
+        results = []
+        first = app.schedule(results.append, (1,), key='foo')
+        app.start()
+        second = app.schedule(results.append, (2,), key='foo')
+        app.start()
+        self.assertIsNot(first, second)
+        self.assertEqual(results, [1, 2])
+
+    def test_keyed_task_after_unschedule(self):
+        """ Test that an unscheduled task is not reused by its key.
+
+        """
+        app = self.app
+        results = []
+        first = app.schedule(results.append, (1,), key='foo')
+        first.unschedule()
+        second = app.schedule(results.append, (2,), key='foo')
+        app.start()
+        self.assertIsNot(first, second)
+        self.assertEqual(results, [2])
+
+    def test_stats_disabled(self):
+        """ Test that no stats are reported when collection is disabled.
+
+        """
+        self.assertIsNone(self.app.stats())
+
+    def test_stats_collection(self):
+        """ Test that scheduler stats are collected when enabled.
+
+        """
+        app = self.app
+        app.enable_stats()
+        results = []
+        for i in range(5):
+            app.schedule(results.append, (i,))
+        app.start()
+        stats = app.stats()
+        self.assertEqual(stats['scheduled'], 5)
+        self.assertEqual(stats['executed'], 5)
+        self.assertEqual(stats['wait']['count'], 5)
+        self.assertEqual(stats['depth']['max'], 5)
+        self.assertEqual(len(stats['depth_samples']), 5)
+        self.assertEqual(stats['deferred_calls'], 5)
+        execution = stats['execution']
+        self.assertEqual(execution['__builtin__.list.append']['count'], 5)
+        app.disable_stats()
+        self.assertIsNone(app.stats())
+
+    def test_stats_log_hook(self):
+        """ Test that the periodic stats hook is invoked.
+
+        """
+        app = self.app
+        reports = []
+        def hook(stats):
+            reports.append(stats)
+            if len(reports) == 3:
+                app.disable_stats()
+        app.enable_stats(log_interval=10, log_hook=hook)
+        app.start()
+        self.assertEqual(len(reports), 3)
+
+
+class TestApplicationSubmit(unittest.TestCase):
+
+    def setUp(self):
+        self.app = FakeApplication()
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def test_submit_notifies_on_main_thread(self):
+        """ Test that a worker result is delivered through the event loop.
+
+        """
+        app = self.app
+        notified = []
+        task = app.submit(lambda a, b: a + b, (1, 2))
+        task.notify(notified.append)
+        app.run_until(lambda: not task.pending())
+        self.assertEqual(notified, [3])
+        self.assertEqual(task.result(), 3)
+        self.assertIsNone(task.error())
+
+    def test_submit_error(self):
+        """ Test that a failing worker task records its error.
+
+        """
+        app = self.app
+        notified = []
+        task = app.submit(lambda: 1 / 0)
+        task.notify(notified.append)
+        app.run_until(lambda: not task.pending())
+        self.assertEqual(notified, [])
+        self.assertIs(task.result(), task.undefined)
+        self.assertIsInstance(task.error(), ZeroDivisionError)
+
+    def test_submit_error_notifies(self):
+        """ Test that a failing worker task invokes its error notifier.
+
+        """
+        app = self.app
+        notified = []
+        errors = []
+        task = app.submit(lambda: 1 / 0)
+        task.notify(notified.append)
+        task.notify_error(errors.append)
+        app.run_until(lambda: not task.pending())
+        self.assertEqual(notified, [])
+        self.assertEqual(len(errors), 1)
+        self.assertIs(errors[0], task.error())
+
+    def test_success_skips_error_notifier(self):
+        """ Test that a successful task does not invoke its error
+        notifier.
+
+        """
+        app = self.app
+        errors = []
+        task = app.submit(lambda: 42)
+        task.notify_error(errors.append)
+        app.run_until(lambda: not task.pending())
+        self.assertEqual(errors, [])
+        self.assertEqual(task.result(), 42)
+
+    def test_cancel_queued_task(self):
+        """ Test that a queued worker task can be cancelled.
+
+        """
+        app = self.app
+        app.set_worker_count(1)
+        event = Event()
+        results = []
+        blocker = app.submit(event.wait)
+        task = app.submit(results.append, (1,))
+        self.assertTrue(task.cancel())
+        event.set()
+        app.run_until(lambda: not blocker.pending())
+        self.assertTrue(task.cancelled())
+        self.assertFalse(task.pending())
+        self.assertEqual(results, [])
+
+    def test_idle_worker_reused(self):
+        """ Test that an idle worker thread is reused instead of
+        starting a new thread.
+
+        """
+        app = self.app
+        app.set_worker_count(4)
+        for i in range(3):
+            task = app.submit(add, (i, 1))
+            app.run_until(lambda: not task.pending())
+            time.sleep(0.01)
+        self.assertEqual(len(app._thread_pool._threads), 1)
+
+
+class TestApplicationSubmitProcess(unittest.TestCase):
+
+    def setUp(self):
+        self.app = FakeApplication()
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.app.destroy()
+        shutil.rmtree(self.tempdir)
+
+    def test_submit_process(self):
+        """ Test that a worker process result is delivered through the
+        event loop.
+
+        """
+        app = self.app
+        notified = []
+        task = app.submit(add, (1, 2), process=True)
+        task.notify(notified.append)
+        app.run_until(lambda: not task.pending())
+        self.assertEqual(notified, [3])
+        self.assertIsNone(task.error())
+
+    def test_unpicklable_callback(self):
+        """ Test that a callback which cannot be pickled fails the task.
+
+        """
+        app = self.app
+        errors = []
+        task = app.submit(lambda: 1, process=True)
+        task.notify_error(errors.append)
+        app.run_until(lambda: not task.pending())
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(task.error(), WorkerError)
+        self.assertIs(task.result(), task.undefined)
+
+    def test_unpicklable_result(self):
+        """ Test that a result which cannot be pickled fails the task.
+
+        """
+        app = self.app
+        errors = []
+        task = app.submit(make_lambda, process=True)
+        task.notify_error(errors.append)
+        app.run_until(lambda: not task.pending())
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(task.error(), WorkerError)
+
+    def test_cancel_queued_process_task(self):
+        """ Test that a queued worker process task can be cancelled
+        before it runs.
+
+        """
+        app = self.app
+        app.set_worker_count(1)
+        path = os.path.join(self.tempdir, 'marker')
+        blocker = app.submit(time.sleep, (0.2,), process=True)
+        task = app.submit(touch, (path,), process=True)
+        self.assertTrue(task.pending())
+        self.assertTrue(task.cancel())
+        after = app.submit(add, (1, 2), process=True)
+        app.run_until(lambda: not after.pending())
+        self.assertFalse(blocker.pending())
+        self.assertTrue(task.cancelled())
+        self.assertFalse(os.path.exists(path))
@@ -0,0 +1,135 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from cStringIO import StringIO
+import unittest
+
+from enaml.traffic_recorder import CLIENT, SESSION, TrafficRecorder, read_traffic
+
+from .headless_support import FakeSocket, FormSession, asyncio, run_ready
+
+
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+class TestAsyncioApplication(unittest.TestCase):
+
+    def setUp(self):
+        from enaml.headless.asyncio_application import AsyncioApplication
+        self.factory = FormSession.factory('form', 'A form session')
+        self.make_app = AsyncioApplication
+        self.sockets = {}
+        self.app = None
+
+    def tearDown(self):
+        if self.app is not None:
+            self.app.destroy()
+
+    def transport(self, session_id):
+        socket = self.sockets[session_id] = FakeSocket()
+        return socket
+
+    def test_open_fake_socket(self):
+        """ Test that a session is driven through a custom transport
+        which opens its client.
+
+        """
+        app = self.app = self.make_app(
+            [self.factory], transport=self.transport, open_clients=True,
+        )
+        session_id = app.start_session('form')
+        session = app.session(session_id)
+        socket = self.sockets[session_id]
+        object_id, action, content = socket.sent[0]
+        self.assertEqual((object_id, action), (session_id, 'open'))
+        self.assertEqual(content['widget_groups'], session.widget_groups)
+        self.assertEqual(content['snapshot'], session.snapshot())
+        field = content['snapshot'][0]['children'][0]
+        socket.callback(field['object_id'], 'submit_text', {'text': u'a'})
+        self.assertEqual(session.windows[0].children[0].text, u'a')
+
+    def test_custom_transport_not_opened(self):
+        """ Test that a custom transport does not open its client by
+        default.
+
+        """
+        app = self.app = self.make_app(
+            [self.factory], transport=self.transport,
+        )
+        session_id = app.start_session('form')
+        sent = self.sockets[session_id].sent
+        self.assertNotIn('open', [action for _, action, _ in sent])
+
+    def test_open_loopback(self):
+        """ Test that the loopback client receives the snapshot before
+        any other message.
+
+        """
+        app = self.app = self.make_app([self.factory])
+        session_id = app.start_session('form')
+        messages = []
+        app.client_socket(session_id).on_message(
+            lambda *msg: messages.append(msg)
+        )
+        run_ready(app)
+        object_id, action, content = messages[0]
+        self.assertEqual((object_id, action), (session_id, 'open'))
+        self.assertEqual(
+            content['snapshot'], app.session(session_id).snapshot()
+        )
+
+    def test_record_session(self):
+        """ Test that the traffic of a session opened by the application
+        is recorded.
+
+        """
+        app = self.app = self.make_app(
+            [self.factory], transport=self.transport, open_clients=True,
+        )
+        stream = StringIO()
+        app.set_recorder(TrafficRecorder(stream))
+        session_id = app.start_session('form')
+        socket = self.sockets[session_id]
+        snapshot = socket.sent[0][2]['snapshot']
+        field_id = snapshot[0]['children'][0]['object_id']
+        socket.callback(field_id, 'submit_text', {'text': u'a'})
+        stream.seek(0)
+        records = list(read_traffic(stream))
+        self.assertEqual(records[0][0], SESSION)
+        self.assertEqual(records[0][2], session_id)
+        self.assertEqual(records[0][4]['name'], 'form')
+        recorded = records[0][4]['snapshot']
+        self.assertEqual(
+            recorded[0]['children'][0]['object_id'], field_id
+        )
+        self.assertEqual(
+            records[-1][0::2], (CLIENT, field_id, {'text': u'a'})
+        )
+
+    def test_snapshot_has_no_side_effects(self):
+        """ Test that only the client snapshot sent on open splits and
+        packs the trees of a session.
+
+        """
+        class CompactSession(FormSession):
+            def __init__(self):
+                super(CompactSession, self).__init__(
+                    progressive_snapshots=True, skeleton_depth=0,
+                    compact_types=True,
+                )
+        factory = CompactSession.factory('compact', 'A compact session')
+        app = self.app = self.make_app(
+            [factory], transport=self.transport, open_clients=True,
+        )
+        session_id = app.start_session('compact')
+        session = app.session(session_id)
+        run_ready(app)
+        sent = self.sockets[session_id].sent
+        actions = [action for _, action, _ in sent]
+        self.assertEqual(actions, ['open', 'snapshot_chunk'])
+        snaps = session.snapshot()
+        self.assertEqual(session.snapshot(), snaps)
+        self.assertIn('bases', snaps[0])
+        self.assertNotIn('type_ref', snaps[0])
+        self.assertEqual(len(snaps[0]['children']), 1)
+        run_ready(app)
+        self.assertEqual(len(sent), 2)
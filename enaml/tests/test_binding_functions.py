@@ -0,0 +1,113 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from enaml.core.declarative import _binding_function
+
+
+SOURCE = """
+from traits.api import HasTraits, Int
+from enaml.core.declarative import Declarative
+from enaml.core.looper import Looper
+
+class Model(HasTraits):
+    a = Int(1)
+
+model = Model()
+
+enamldef Item(Declarative):
+    attr val
+    attr other
+    val << model.a
+    other := model.a
+
+enamldef Main(Declarative):
+    Looper:
+        iterable = range(3)
+        Item:
+            val << model.a + loop_index
+"""
+
+
+def binding_func(obj, name):
+    return obj._bound_expression(name)._func
+
+
+class TestBindingFunctions(unittest.TestCase):
+
+    def setUp(self):
+        from enaml.core.enaml_compiler import EnamlCompiler
+        from enaml.core.parser import parse
+        code = EnamlCompiler.compile(parse(SOURCE), 'test_functions')
+        f_globals = self.f_globals = {'__name__': 'test_functions'}
+        exec code in f_globals
+        self.Item = f_globals['Item']
+
+    def test_instances_share_functions(self):
+        """ Test that the instances of a type share the functions of
+        their bindings.
+
+        """
+        first = self.Item()
+        second = self.Item()
+        for name in ('val', 'other'):
+            func = binding_func(first, name)
+            self.assertIs(binding_func(second, name), func)
+            self.assertIs(func.func_globals, self.f_globals)
+
+    def test_looper_items_share_functions(self):
+        """ Test that the items created by a Looper share the functions
+        of their bindings.
+
+        """
+        main = self.f_globals['Main']()
+        main.initialize()
+        items = [
+            child for child in main.children if isinstance(child, self.Item)
+        ]
+        self.assertEqual(len(items), 3)
+        self.assertEqual([item.val for item in items], [1, 2, 3])
+        funcs = set(binding_func(item, 'val') for item in items)
+        self.assertEqual(len(funcs), 1)
+        funcs = set(binding_func(item, 'other') for item in items)
+        self.assertEqual(len(funcs), 1)
+        main.destroy()
+
+    def test_function_attributes(self):
+        """ Test that the update function and the static dependencies
+        are set on the shared function.
+
+        """
+        item = self.Item()
+        val = binding_func(item, 'val')
+        other = binding_func(item, 'other')
+        self.assertEqual(val._dependencies, ('model', 'a'))
+        self.assertFalse(hasattr(val, '_update'))
+        self.assertEqual(other._dependencies, ('model', 'a'))
+        self.assertIs(other._update.func_globals, self.f_globals)
+        other_item = self.Item()
+        self.assertIs(
+            binding_func(other_item, 'other')._update, other._update
+        )
+        item.other = 5
+        self.assertEqual(self.f_globals['model'].a, 5)
+
+    def test_other_globals(self):
+        """ Test that a binding has a separate function for each globals
+        dict.
+
+        """
+        bindings = self.Item._descriptions[0][0]['bindings']
+        binding, = [
+            b for b in bindings if b['operator'] == '__operator_LessLess__'
+        ]
+        func = _binding_function(binding, self.f_globals)
+        self.assertIs(_binding_function(binding, self.f_globals), func)
+        other_globals = dict(self.f_globals)
+        other = _binding_function(binding, other_globals)
+        self.assertIsNot(other, func)
+        self.assertIs(other.func_globals, other_globals)
+        self.assertEqual(other._dependencies, func._dependencies)
+        self.assertIs(_binding_function(binding, other_globals), other)
@@ -0,0 +1,58 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from cStringIO import StringIO
+import unittest
+
+from enaml.core.binding_profiler import (
+    BindingProfiler, disable_profiler, enable_profiler
+)
+
+
+def binding(value):
+    return value * 2
+
+
+class TestBindingProfiler(unittest.TestCase):
+
+    def test_call(self):
+        """ Test that calls are recorded by source location.
+
+        """
+        profiler = BindingProfiler()
+        self.assertEqual(profiler.call(binding, '<<', (2,), {}), 4)
+        profiler.call(binding, '<<', (3,), {})
+        profiler.record_dependencies(binding, '<<', 3, False)
+        profiler.record_dependencies(binding, '<<', 2, True)
+        code = binding.func_code
+        key = (code.co_filename, code.co_firstlineno, 'binding', '<<')
+        stats = profiler.stats()[key]
+        self.assertEqual(stats['count'], 2)
+        self.assertEqual(stats['dependencies'], 2)
+        self.assertEqual(stats['resubscriptions'], 1)
+        self.assertTrue(stats['total'] >= stats['max'] >= 0.0)
+
+    def test_report(self):
+        """ Test that the report has a row per binding.
+
+        """
+        profiler = BindingProfiler()
+        profiler.call(binding, '=', (1,), {})
+        profiler.call(binding, '::', (1,), {})
+        out = StringIO()
+        profiler.report(out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith('location'))
+
+    def test_enable(self):
+        """ Test enabling and disabling the active profiler.
+
+        """
+        profiler = enable_profiler()
+        try:
+            self.assertIs(enable_profiler(), profiler)
+        finally:
+            self.assertIs(disable_profiler(), profiler)
+        self.assertIsNone(disable_profiler())
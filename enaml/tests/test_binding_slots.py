@@ -0,0 +1,112 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+
+SOURCE = """
+from enaml.core.declarative import Declarative
+
+enamldef Base(Declarative):
+    attr val
+    attr other
+    val = 1 + 1
+
+enamldef Sub(Base):
+    val = 10 + 10
+
+enamldef Left(Base):
+    other = 3 + 3
+
+enamldef Right(Base):
+    attr extra
+    extra = 4 + 4
+    other = 5 + 5
+
+enamldef Watcher(Declarative):
+    attr val
+    attr seen
+    attr mirror
+    val :: seen.append(('first', val))
+    val :: seen.append(('second', val))
+    val >> mirror
+"""
+
+
+class TestBindingSlots(unittest.TestCase):
+
+    def setUp(self):
+        from enaml.core.enaml_compiler import EnamlCompiler
+        from enaml.core.parser import parse
+        code = EnamlCompiler.compile(parse(SOURCE), 'test_slots')
+        f_globals = self.f_globals = {'__name__': 'test_slots'}
+        exec code in f_globals
+
+    def test_override_inherited_binding(self):
+        """ Test that a subclass block replaces the expression bound by
+        the block of its base, in the same slot.
+
+        """
+        Base = self.f_globals['Base']
+        Sub = self.f_globals['Sub']
+        sub = Sub()
+        self.assertEqual(sub.val, 20)
+        self.assertEqual(Base().val, 2)
+        self.assertEqual(sub._binding_counts(), (1, 0))
+        self.assertEqual(len(sub._expressions), 1)
+        self.assertEqual(Sub.__dict__['_expression_slots'], {'val': 0})
+
+    def test_several_listeners(self):
+        """ Test that the listeners bound to one name share a slot and
+        all run, in the order they were bound.
+
+        """
+        watcher = self.f_globals['Watcher']()
+        self.assertEqual(watcher._binding_counts(), (0, 3))
+        self.assertEqual(len(watcher._listeners), 1)
+        watcher.seen = []
+        watcher.val = 1
+        del watcher.seen[:]
+        watcher.val = 7
+        self.assertEqual(watcher.seen, [('first', 7), ('second', 7)])
+        self.assertEqual(watcher.mirror, 7)
+
+    def test_shared_base(self):
+        """ Test that types sharing a base lay out their slots
+        independently, without leaking into the base.
+
+        """
+        Base = self.f_globals['Base']
+        Left = self.f_globals['Left']
+        Right = self.f_globals['Right']
+        left = Left()
+        right = Right()
+        base = Base()
+        self.assertEqual((left.val, left.other), (2, 6))
+        self.assertEqual((right.val, right.other, right.extra), (2, 10, 8))
+        self.assertEqual(base.val, 2)
+        self.assertIsNone(base._bound_expression('other'))
+        self.assertEqual(Base.__dict__['_expression_slots'], {'val': 0})
+        self.assertEqual(
+            Left.__dict__['_expression_slots'], {'val': 0, 'other': 1}
+        )
+        self.assertEqual(
+            Right.__dict__['_expression_slots'],
+            {'val': 0, 'extra': 1, 'other': 2},
+        )
+        self.assertIsNone(left._bound_expression('extra'))
+        self.assertIsNotNone(right._bound_expression('extra'))
+
+    def test_binding_counts(self):
+        """ Test the counts of the bound expressions and listeners.
+
+        """
+        from enaml.core.declarative import Declarative
+        obj = Declarative()
+        self.assertEqual(obj._binding_counts(), (0, 0))
+        self.assertEqual(self.f_globals['Base']()._binding_counts(), (1, 0))
+        self.assertEqual(self.f_globals['Right']()._binding_counts(), (3, 0))
+        self.assertEqual(
+            self.f_globals['Watcher']()._binding_counts(), (0, 3)
+        )
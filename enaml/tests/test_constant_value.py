@@ -0,0 +1,91 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import ast
+import unittest
+
+from enaml.core.enaml_compiler import constant_value
+
+
+def value(source):
+    return constant_value(ast.parse(source, mode='eval'))
+
+
+class TestConstantValue(unittest.TestCase):
+
+    def test_constants(self):
+        """ Test that literals and tuples of literals are folded.
+
+        """
+        self.assertEqual(value("'ignore'"), ('ignore',))
+        self.assertEqual(value('-1.5'), (-1.5,))
+        self.assertEqual(value('None'), (None,))
+        self.assertEqual(value('False'), (False,))
+        self.assertEqual(value("(1, ('a', True))"), ((1, ('a', True)),))
+
+    def test_expressions(self):
+        """ Test that other expressions are not constant.
+
+        """
+        for source in ('[1, 2]', 'name', '1 + 2', '-name', '(1, name)'):
+            self.assertIsNone(value(source))
+
+
+SOURCE = """
+from traits.api import HasTraits, Int
+from enaml.core.declarative import Declarative
+
+class Model(HasTraits):
+    a = Int(10)
+
+enamldef Item(Declarative):
+    attr val = 0
+
+enamldef Main(Declarative):
+    attr model = Model()
+    Item:
+        pass
+    Item:
+        val = 3
+    Item:
+        val << model.a
+    Item:
+        val = 5 + 5
+"""
+
+
+class TestConstantBindings(unittest.TestCase):
+
+    def setUp(self):
+        from enaml.core.enaml_compiler import EnamlCompiler
+        from enaml.core.parser import parse
+        code = EnamlCompiler.compile(parse(SOURCE), 'test_constant')
+        f_globals = {'__name__': 'test_constant'}
+        exec code in f_globals
+        self.main = f_globals['Main']()
+
+    def test_assigned(self):
+        """ Test that constants are assigned without an expression.
+
+        """
+        default, constant = self.main.children[:2]
+        self.assertEqual(default.val, 0)
+        self.assertEqual(constant.val, 3)
+        self.assertEqual(constant._binding_counts(), (0, 0))
+
+    def test_overridden_by_subscription(self):
+        """ Test that a constant is replaced by a later `<<` binding.
+
+        """
+        item = self.main.children[2]
+        self.assertEqual(item.val, 10)
+        self.main.model.a = 11
+        self.assertEqual(item.val, 11)
+
+    def test_overridden_by_expression(self):
+        """ Test that a constant is replaced by a later `=` expression.
+
+        """
+        item = self.main.children[3]
+        self.assertEqual(item.val, 10)
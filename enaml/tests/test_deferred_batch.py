@@ -0,0 +1,233 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from enaml.session import DeferredBatch
+
+from .headless_support import EmptySession, FormSession, asyncio, run_ready
+
+
+def task(value):
+    return lambda: value
+
+
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+class TestDeferredBatch(unittest.TestCase):
+
+    def setUp(self):
+        from enaml.headless.asyncio_application import AsyncioApplication
+        self.app = AsyncioApplication([])
+        self.batch = DeferredBatch()
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def release(self):
+        """ Release the batch as a list of (object_id, action, value).
+
+        """
+        return [
+            (object_id, action, func())
+            for object_id, action, func in self.batch.release()
+        ]
+
+    def test_set_coalesced(self):
+        """ Test that only the last `set_*` action of an object is kept,
+        at the position of the last action.
+
+        """
+        batch = self.batch
+        batch.append('a', 'set_text', task(1))
+        batch.append('a', 'set_value', task(2))
+        batch.append('b', 'set_text', task(3))
+        batch.append('a', 'set_text', task(4))
+        self.assertEqual(self.release(), [
+            ('a', 'set_value', 2), ('b', 'set_text', 3), ('a', 'set_text', 4),
+        ])
+
+    def test_relayout_coalesced(self):
+        """ Test that repeated relayouts are coalesced and that other
+        actions are all kept.
+
+        """
+        batch = self.batch
+        batch.append('a', 'relayout', task(1))
+        batch.append('a', 'children_changed', task(2))
+        batch.append('a', 'relayout', task(3))
+        batch.append('a', 'children_changed', task(4))
+        self.assertEqual(self.release(), [
+            ('a', 'children_changed', 2), ('a', 'relayout', 3),
+            ('a', 'children_changed', 4),
+        ])
+
+    def test_destroy(self):
+        """ Test that the actions of a destroyed object are dropped.
+
+        """
+        batch = self.batch
+        batch.append('a', 'set_text', task(1))
+        batch.append('b', 'set_text', task(2))
+        batch.append('a', 'children_changed', task(3))
+        batch.append('a', 'destroy', task(4))
+        batch.append('a', 'set_text', task(5))
+        batch.append('b', 'relayout', task(6))
+        self.assertEqual(self.release(), [
+            ('b', 'set_text', 2), ('a', 'destroy', 4), ('b', 'relayout', 6),
+        ])
+
+    def test_release_resets_indices(self):
+        """ Test that the bookkeeping of a released batch does not leak
+        into the next batch.
+
+        """
+        batch = self.batch
+        batch.append('a', 'set_text', task(1))
+        batch.append('b', 'destroy', task(2))
+        self.release()
+        self.assertEqual(len(batch), 0)
+        batch.append('c', 'set_text', task(3))
+        batch.append('a', 'set_text', task(4))
+        batch.append('b', 'set_text', task(5))
+        self.assertEqual(self.release(), [
+            ('c', 'set_text', 3), ('a', 'set_text', 4), ('b', 'set_text', 5),
+        ])
+        batch.append('c', 'set_text', task(6))
+        batch.append('a', 'set_text', task(7))
+        batch.append('c', 'destroy', task(8))
+        self.assertEqual(self.release(), [
+            ('a', 'set_text', 7), ('c', 'destroy', 8),
+        ])
+
+    def test_repeated_set_compacted(self):
+        """ Test that repeated actions of an object do not grow the
+        storage of the batch.
+
+        """
+        batch = self.batch
+        batch.append('b', 'children_changed', task(0))
+        for idx in xrange(1000):
+            batch.append('a', 'set_value', task(idx))
+            batch.append('a', 'relayout', task(idx))
+        limit = 2 * batch.compact_threshold + 3
+        self.assertTrue(len(batch._items) <= limit)
+        self.assertTrue(len(batch._indices['a']) <= limit)
+        batch.append('b', 'set_text', task(1))
+        self.assertEqual(self.release(), [
+            ('b', 'children_changed', 0), ('a', 'set_value', 999),
+            ('a', 'relayout', 999), ('b', 'set_text', 1),
+        ])
+
+    def test_destroy_after_compaction(self):
+        """ Test that a destroy drops the actions of an object which
+        were moved by a compaction.
+
+        """
+        batch = self.batch
+        for idx in xrange(500):
+            batch.append('a', 'set_value', task(idx))
+            batch.append('b', 'set_value', task(idx))
+        batch.append('a', 'destroy', task('a'))
+        self.assertEqual(self.release(), [
+            ('b', 'set_value', 499), ('a', 'destroy', 'a'),
+        ])
+
+    def test_len_counts_retained_items(self):
+        """ Test that the length of the batch does not count the items
+        which were coalesced or dropped.
+
+        """
+        batch = self.batch
+        for idx in xrange(100):
+            batch.append('a', 'set_value', task(idx))
+        self.assertEqual(len(batch), 1)
+        batch.append('b', 'set_value', task(1))
+        batch.append('b', 'children_changed', task(2))
+        self.assertEqual(len(batch), 3)
+        batch.append('b', 'destroy', task(3))
+        self.assertEqual(len(batch), 2)
+        batch.append('b', 'set_value', task(4))
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(len(batch), len(batch.release()))
+        self.assertEqual(len(batch), 0)
+
+    def test_triggered(self):
+        """ Test that the batch is triggered once the event loop is
+        drained of appended actions.
+
+        """
+        batch = self.batch
+        triggered = []
+        batch.triggered.connect(lambda: triggered.append(self.release()))
+        loop = self.app.loop()
+        loop.call_soon(batch.append, 'a', 'set_text', task(1))
+        loop.call_soon(batch.append, 'a', 'set_text', task(2))
+        loop.call_soon(batch.append, 'b', 'set_text', task(3))
+        run_ready(self.app)
+        self.assertEqual(
+            triggered, [[('a', 'set_text', 2), ('b', 'set_text', 3)]]
+        )
+        batch.append('a', 'set_text', task(4))
+        run_ready(self.app)
+        self.assertEqual(triggered[1:], [[('a', 'set_text', 4)]])
+
+
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+class TestSessionBatchSize(unittest.TestCase):
+
+    def setUp(self):
+        from enaml.headless.asyncio_application import AsyncioApplication
+        factory = EmptySession.factory('empty', 'An empty session')
+        self.app = AsyncioApplication([factory])
+        self.session_id = self.app.start_session('empty')
+        self.session = self.app.session(self.session_id)
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def test_coalescing_keeps_batch_size_flat(self):
+        """ Test that coalesced actions do not count toward the batch
+        size of a session or trip its hard limit.
+
+        """
+        session = self.session
+        session.set_limit('batch_size', hard=5)
+        for idx in xrange(100):
+            session.batch('a', 'set_value', {'value': idx})
+        self.assertEqual(session.usage()['counts']['batch_size'], 1)
+        self.assertEqual(session.usage()['exceeded'], [])
+        run_ready(self.app)
+        self.assertIs(self.app.session(self.session_id), session)
+
+
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+class TestSessionDestroy(unittest.TestCase):
+
+    def setUp(self):
+        from enaml.headless.asyncio_application import AsyncioApplication
+        factory = FormSession.factory('form', 'A form session')
+        self.app = AsyncioApplication([factory])
+        self.session = self.app.session(self.app.start_session('form'))
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def test_destroy_drops_descendants(self):
+        """ Test that the destroy of an object drops the pending actions
+        of its descendants.
+
+        """
+        session = self.session
+        window = session.windows[0]
+        field = window.children[0]
+        session._batch.release()
+        field.batch_action('set_text', {'text': u'a'})
+        field.batch_action('children_changed', {})
+        window.batch_action('set_title', {'title': u'b'})
+        window.destroy()
+        field_id = field.object_id
+        window_id = window.object_id
+        session.batch(field_id, 'set_text', {'text': u'c'})
+        items = [item[:2] for item in session._batch.release()]
+        self.assertEqual(items, [(window_id, 'destroy')])
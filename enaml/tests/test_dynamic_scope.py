@@ -0,0 +1,82 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from enaml.core.dynamic_scope import DynamicScope
+
+
+class Node(object):
+    """ A minimal object with a parent, which counts failed lookups.
+
+    """
+    misses = 0
+
+    def __init__(self, parent=None):
+        self.parent = parent
+
+    def __getattr__(self, name):
+        Node.misses += 1
+        raise AttributeError(name)
+
+
+class Root(Node):
+    title = 'root'
+
+
+class Middle(Node):
+    pass
+
+
+class Leaf(Node):
+    pass
+
+
+class TestDynamicScope(unittest.TestCase):
+
+    def setUp(self):
+        for cls in (Root, Middle, Leaf):
+            cls.__dict__.get('_scope_resolutions', {}).clear()
+        Node.misses = 0
+
+    def test_cached_ancestor(self):
+        """ Test that names on an ancestor skip the failed lookups.
+
+        """
+        leaf = Leaf(Middle(Root()))
+        scope = DynamicScope(leaf, {}, {}, None)
+        self.assertEqual(scope['title'], 'root')
+        misses = Node.misses
+        self.assertEqual(misses, 2)
+        self.assertEqual(scope['title'], 'root')
+        self.assertEqual(Node.misses, misses)
+
+    def test_cached_missing(self):
+        """ Test that names missing from the tree skip the lookups.
+
+        """
+        leaf = Leaf(Middle(Root()))
+        scope = DynamicScope(leaf, {}, {}, None)
+        with self.assertRaises(KeyError):
+            scope['len']
+        misses = Node.misses
+        with self.assertRaises(KeyError):
+            scope['len']
+        self.assertEqual(Node.misses, misses)
+
+    def test_reparent(self):
+        """ Test that the cache is bypassed when the ancestors change.
+
+        """
+        leaf = Leaf(Middle(Root()))
+        scope = DynamicScope(leaf, {}, {}, None)
+        self.assertEqual(scope['title'], 'root')
+        leaf.parent = Middle(Middle(Root()))
+        self.assertEqual(scope['title'], 'root')
+        leaf.parent = Middle()
+        self.assertNotIn('title', scope)
+        root = Root()
+        root.title = 'other'
+        leaf.parent = Middle(root)
+        self.assertEqual(scope['title'], 'other')
@@ -0,0 +1,161 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import shutil
+import sys
+import tempfile
+import unittest
+
+from enaml.core.declarative import Declarative
+from enaml.hibernation import (
+    DirectorySessionStore, SessionStore, capture_object, restore_object
+)
+
+from .headless_support import FormSession, asyncio, run_until
+
+
+class Item(Declarative):
+    """ A declarative object with a user attribute.
+
+    """
+    pass
+
+Item._add_user_attribute('count', object, False)
+
+
+def field_text(session):
+    return session.windows[0].children[0].text
+
+
+class TestSessionStores(unittest.TestCase):
+
+    def check_store(self, store):
+        data = {'name': 'main', 'state': [{'class': 'Window'}]}
+        self.assertIsNone(store.load('abc'))
+        store.save('abc', data)
+        self.assertEqual(store.load('abc'), data)
+        store.delete('abc')
+        self.assertIsNone(store.load('abc'))
+
+    def test_memory_store(self):
+        """ Test saving and loading with the in-memory store.
+
+        """
+        self.check_store(SessionStore())
+
+    def test_directory_store(self):
+        """ Test saving and loading with the directory store.
+
+        """
+        path = tempfile.mkdtemp()
+        try:
+            self.check_store(DirectorySessionStore(path))
+            with self.assertRaises(ValueError):
+                DirectorySessionStore(path).save('../abc', {})
+        finally:
+            shutil.rmtree(path)
+
+
+class TestCapture(unittest.TestCase):
+
+    def build(self):
+        root = Item()
+        Item(root)
+        Item(root)
+        return root
+
+    def test_round_trip(self):
+        """ Test that the state of a tree is restored onto a new tree.
+
+        """
+        root = self.build()
+        root.count = 1
+        root.children[1].count = (2, 'two')
+        saved = capture_object(root)
+        other = self.build()
+        restore_object(other, saved)
+        self.assertEqual(other.count, 1)
+        self.assertEqual(other.children[1].count, (2, 'two'))
+        self.assertNotIn('count', other.children[0].__dict__)
+
+    def test_class_mismatch(self):
+        """ Test that a tree of another class is left untouched.
+
+        """
+        root = self.build()
+        root.count = 1
+        saved = capture_object(root)
+        saved['class'] = 'Other'
+        other = self.build()
+        restore_object(other, saved)
+        self.assertNotIn('count', other.__dict__)
+
+
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+class TestHibernateSession(unittest.TestCase):
+
+    def setUp(self):
+        from enaml.headless.asyncio_application import AsyncioApplication
+        factory = FormSession.factory('form', 'A form session')
+        self.app = AsyncioApplication([factory])
+        self.store = SessionStore()
+        self.app.set_session_store(self.store)
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def test_round_trip(self):
+        """ Test hibernating and resuming a session.
+
+        """
+        app = self.app
+        session_id = app.start_session('form')
+        session = app.session(session_id)
+        session.windows[0].children[0].text = u'saved'
+        app.hibernate_session(session_id)
+        self.assertIsNone(app.session(session_id))
+        self.assertEqual(self.store.load(session_id)['name'], 'form')
+        new_id = app.resume_session(session_id)
+        self.assertEqual(field_text(app.session(new_id)), u'saved')
+        self.assertIsNone(self.store.load(session_id))
+
+
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+@unittest.skipIf(sys.platform == 'win32', 'workers require fork')
+class TestHibernateShardedSession(unittest.TestCase):
+
+    def setUp(self):
+        from enaml.headless.sharded_application import ShardedApplication
+        factory = FormSession.factory('form', 'A form session')
+        self.app = ShardedApplication([factory], workers=1)
+        self.store = SessionStore()
+        self.app.set_session_store(self.store)
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def test_round_trip(self):
+        """ Test that a worker session is hibernated asynchronously and
+        restored in its worker when resumed.
+
+        """
+        app = self.app
+        session_id = app.start_session('form')
+        session = app.session(session_id)
+        self.assertEqual(session.factory_name, 'form')
+        run_until(app, lambda: session.snapshot() is not None)
+        field_id = session.snapshot()[0]['children'][0]['object_id']
+        messages = []
+        client = app.client_socket(session_id)
+        client.on_message(lambda *msg: messages.append(msg))
+        client.send(field_id, 'submit_text', {'text': u'saved'})
+        run_until(app, lambda: session.idle_time() >= 0.1)
+        self.assertEqual(app.hibernate_idle_sessions(0.1), [session_id])
+        run_until(app, lambda: app.session(session_id) is None)
+        self.assertIn((session_id, 'hibernate'), [m[:2] for m in messages])
+        new_id = app.resume_session(session_id)
+        session = app.session(new_id)
+        run_until(app, lambda: session.snapshot() is not None)
+        field = session.snapshot()[0]['children'][0]
+        self.assertEqual(field['text'], u'saved')
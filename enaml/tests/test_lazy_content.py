@@ -0,0 +1,192 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from enaml.session import Session
+from enaml.widgets.container import Container
+from enaml.widgets.field import Field
+from enaml.widgets.notebook import Notebook
+from enaml.widgets.page import Page
+from enaml.widgets.stack import Stack
+from enaml.widgets.stack_item import StackItem
+from enaml.widgets.window import Window
+
+from .headless_support import FakeSocket, asyncio, run_for
+
+
+class LazySession(Session):
+    """ A session with a lazy notebook and a lazy stack of two pages
+    and two items, each of which holds a container with a field.
+
+    """
+    def on_open(self):
+        window = Window()
+        notebook = Notebook(window, lazy_load=True, unload_delay=20)
+        stack = Stack(window, lazy_load=True)
+        for idx in xrange(2):
+            Field(Container(Page(notebook)))
+            Field(Container(StackItem(stack)))
+        self.windows.append(window)
+
+
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+class TestLazyContent(unittest.TestCase):
+
+    def setUp(self):
+        from enaml.headless.asyncio_application import AsyncioApplication
+        factory = LazySession.factory('lazy', 'A lazy session')
+        self.socket = FakeSocket()
+        self.app = AsyncioApplication(
+            [factory], transport=lambda session_id: self.socket,
+        )
+        session = self.app.session(self.app.start_session('lazy'))
+        self.notebook, self.stack = session.windows[0].children
+        self.pages = self.notebook.pages
+        self.items = self.stack.stack_items
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def messages(self, obj):
+        """ Get the (action, content) messages sent to the client of an
+        object.
+
+        """
+        messages = []
+        for msg in self.socket.sent:
+            if msg[1] == 'message_batch':
+                messages.extend(msg[2]['batch'])
+            else:
+                messages.append(msg)
+        object_id = obj.object_id
+        return [msg[1:] for msg in messages if msg[0] == object_id]
+
+    def actions(self, obj):
+        """ Get the actions sent to the client of an object.
+
+        """
+        return [action for action, content in self.messages(obj)]
+
+    def test_snapshot(self):
+        """ Test that only the current content is in the snapshot.
+
+        """
+        snap = self.notebook.snapshot()
+        self.assertEqual(
+            [len(page['children']) for page in snap['children']], [1, 0]
+        )
+        first, second = self.pages
+        self.assertTrue(first.children[0].is_active)
+        self.assertTrue(second.is_active)
+        self.assertTrue(second.children[0].is_initialized)
+
+    def test_show_content(self):
+        """ Test that a page is loaded when the client shows it.
+
+        """
+        first, second = self.pages
+        self.socket.callback(
+            self.notebook.object_id, 'current_changed',
+            {'page_id': second.object_id},
+        )
+        run_for(self.app, 0)
+        (action, content), = self.messages(second)
+        self.assertEqual(action, 'children_changed')
+        container = second.children[0]
+        self.assertEqual(content['order'], [container.object_id])
+        self.assertTrue(container.is_active)
+        self.assertTrue(container.children[0].is_active)
+
+    def test_hide_content(self):
+        """ Test that a hidden page is unloaded after the delay.
+
+        """
+        first, second = self.pages
+        container = first.children[0]
+        self.notebook.on_action_current_changed({'page_id': second.object_id})
+        self.assertTrue(first._content_loaded)
+        run_for(self.app, 60)
+        self.assertFalse(first._content_loaded)
+        self.assertEqual(self.actions(container), ['destroy'])
+        self.assertTrue(container.is_initialized)
+        self.assertTrue(container.children[0].is_initialized)
+        self.assertEqual(first.snapshot()['children'], [])
+
+    def test_stale_unload(self):
+        """ Test that showing a page cancels its pending unload.
+
+        """
+        first, second = self.pages
+        notebook = self.notebook
+        notebook.on_action_current_changed({'page_id': second.object_id})
+        notebook.on_action_current_changed({'page_id': first.object_id})
+        run_for(self.app, 60)
+        self.assertTrue(first._content_loaded)
+        self.assertNotIn('destroy', self.actions(first.children[0]))
+
+    def test_unload_content(self):
+        """ Test that an unloaded page is loaded again when shown.
+
+        """
+        first, second = self.pages
+        first._unload_content(first._unload_token)
+        self.assertFalse(first._content_loaded)
+        first.show_content()
+        self.assertTrue(first._content_loaded)
+        self.assertTrue(first.children[0].is_active)
+        run_for(self.app, 0)
+        self.assertEqual(self.actions(first)[-1:], ['children_changed'])
+
+    def test_reload_before_batch(self):
+        """ Test that content which is unloaded and loaded again within
+        one batch is destroyed before it is sent again.
+
+        """
+        first, second = self.pages
+        container = first.children[0]
+        field = container.children[0]
+        del self.socket.sent[:]
+        field.batch_action('set_text', {'text': u'a'})
+        first._unload_content(first._unload_token)
+        first.show_content()
+        field.batch_action('set_text', {'text': u'b'})
+        run_for(self.app, 0)
+        batch = self.socket.sent[-1][2]['batch']
+        self.assertEqual([msg[:2] for msg in batch], [
+            (container.object_id, 'destroy'),
+            (first.object_id, 'children_changed'),
+            (field.object_id, 'set_text'),
+        ])
+        self.assertEqual(batch[2][2], {'text': u'b'})
+        self.assertTrue(field.is_active)
+
+    def test_children_withheld(self):
+        """ Test that the children changes of unloaded content are not
+        sent to the client.
+
+        """
+        first, second = self.pages
+        Field(first.children[0])
+        Field(second.children[0])
+        run_for(self.app, 0)
+        self.assertIn('children_changed', self.actions(first.children[0]))
+        self.assertEqual(self.actions(second.children[0]), [])
+        Container(second)
+        run_for(self.app, 0)
+        self.assertEqual(self.actions(second), [])
+
+    def test_stack(self):
+        """ Test that a stack shows and hides its items by index.
+
+        """
+        first, second = self.items
+        self.stack.unload_delay = 20
+        self.stack.index = 1
+        self.assertTrue(second._content_loaded)
+        run_for(self.app, 0)
+        self.assertEqual(self.actions(second), ['children_changed'])
+        run_for(self.app, 60)
+        self.assertFalse(first._content_loaded)
+        self.assertEqual(self.actions(first.children[0]), ['destroy'])
@@ -0,0 +1,138 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from math import copysign
+import unittest
+
+from enaml.message_codec import BinaryCodec, JSONCodec, make_codec
+
+
+CONTENT = {
+    'batch': [
+        ('a1', 'relayout', {'hug': ('strong', 'weak'), 'constraints': []}),
+        ('a2', 'set_text', {'text': u'caf\xe9'}),
+        ('a3', 'set_value', {'value': 1.5, 'big': 1 << 70, 'neg': -3}),
+        ('a4', 'set_flags', {'enabled': True, 'visible': False, 'x': None}),
+    ]
+}
+
+
+class TestBinaryCodec(unittest.TestCase):
+
+    def roundtrip(self, encoder, decoder, msg):
+        frames = encoder.encode(*msg)
+        return decoder.decode([str(f) for f in frames])
+
+    def test_roundtrip(self):
+        """ Test that a message survives an encode/decode roundtrip.
+
+        """
+        encoder = BinaryCodec()
+        decoder = BinaryCodec()
+        object_id, action, content = self.roundtrip(
+            encoder, decoder, ('session', 'message_batch', CONTENT)
+        )
+        self.assertEqual(object_id, 'session')
+        self.assertEqual(action, 'message_batch')
+        expected = JSONCodec().decode(
+            JSONCodec().encode('session', 'message_batch', CONTENT)
+        )[2]
+        self.assertEqual(content, expected)
+
+    def test_interning(self):
+        """ Test that repeated strings are sent as references.
+
+        """
+        encoder = BinaryCodec()
+        decoder = BinaryCodec()
+        msg = ('object_1', 'set_text', {'text': 'foo'})
+        first = encoder.encode(*msg)
+        second = encoder.encode(*msg)
+        self.assertTrue(len(second[0]) < len(first[0]))
+        self.assertEqual(decoder.decode(first), msg)
+        self.assertEqual(decoder.decode(second), msg)
+
+    def test_values_not_interned(self):
+        """ Test that string values are not added to the intern table.
+
+        """
+        encoder = BinaryCodec()
+        decoder = BinaryCodec()
+        for idx in xrange(10):
+            msg = ('object_1', 'set_text', {'text': 'value %d' % idx})
+            self.assertEqual(decoder.decode(encoder.encode(*msg)), msg)
+        self.assertEqual(
+            sorted(encoder._encode_table), ['object_1', 'set_text', 'text']
+        )
+
+    def test_unicode_object_id(self):
+        """ Test that a unicode object id is encoded as a byte string
+        and shares the intern entry of the byte string.
+
+        """
+        encoder = BinaryCodec()
+        decoder = BinaryCodec()
+        first = encoder.encode(u'object_1', u'set_text', {})
+        second = encoder.encode('object_1', 'set_text', {})
+        self.assertIs(type(first[0]), str)
+        self.assertTrue(len(second[0]) < len(first[0]))
+        for frames in (first, second):
+            object_id, action, content = decoder.decode(frames)
+            self.assertIs(type(object_id), str)
+            self.assertEqual((object_id, action), ('object_1', 'set_text'))
+
+    def test_binary_frames(self):
+        """ Test that large binary values are sent as separate frames.
+
+        """
+        encoder = BinaryCodec()
+        decoder = BinaryCodec()
+        data = ''.join(chr(i % 256) for i in xrange(10000))
+        frames = encoder.encode('img', 'set_image', {'data': data})
+        self.assertEqual(len(frames), 2)
+        self.assertIs(frames[1], data)
+        self.assertEqual(decoder.decode(frames)[2]['data'], data)
+
+    def test_large_integers(self):
+        """ Test that integers of any size survive a roundtrip.
+
+        """
+        encoder = BinaryCodec()
+        decoder = BinaryCodec()
+        values = [
+            127, -128, 1 << 31, -(1 << 63), 1 << 63, -(1 << 64),
+            10 ** 300, -(10 ** 1000),
+        ]
+        msg = ('a', 'set_values', {'values': values})
+        self.assertEqual(self.roundtrip(encoder, decoder, msg), msg)
+
+    def test_floats(self):
+        """ Test that floats, including negative zero, survive a
+        roundtrip.
+
+        """
+        encoder = BinaryCodec()
+        decoder = BinaryCodec()
+        values = [0.0, -0.0, 3.0, -128.0, 127.5, 1e300, float('inf')]
+        msg = ('a', 'set_values', {'values': values})
+        result = self.roundtrip(encoder, decoder, msg)[2]['values']
+        self.assertEqual(result, values)
+        signs = [copysign(1.0, value) for value in result]
+        self.assertEqual(signs, [1.0, -1.0, 1.0, -1.0, 1.0, 1.0, 1.0])
+        self.assertTrue(all(type(value) is float for value in result))
+
+    def test_unknown_type(self):
+        """ Test that an unsupported value raises a TypeError.
+
+        """
+        encoder = BinaryCodec()
+        self.assertRaises(TypeError, encoder.encode, 'a', 'b', {'c': object()})
+
+    def test_make_codec(self):
+        """ Test that codecs are created by name.
+
+        """
+        self.assertIsInstance(make_codec('json'), JSONCodec)
+        self.assertIsInstance(make_codec('binary'), BinaryCodec)
+        self.assertRaises(ValueError, make_codec, 'xml')
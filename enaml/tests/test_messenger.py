@@ -0,0 +1,171 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from enaml.core.messenger import type_info
+from enaml.session import Session
+from enaml.widgets.container import Container
+from enaml.widgets.field import Field
+from enaml.widgets.window import Window
+
+from .headless_support import FakeSocket, FormSession, asyncio, run_ready
+
+try:
+    from enaml.qt.qt_session import QtSession
+except ImportError:
+    QtSession = None
+
+
+class BatchedSession(FormSession):
+    """ A form session which batches its attribute changes.
+
+    """
+    batch_attributes = True
+
+
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+class TestPublishAttributes(unittest.TestCase):
+
+    def setUp(self):
+        from enaml.headless.asyncio_application import AsyncioApplication
+        factories = [
+            FormSession.factory('form', 'A form session'),
+            BatchedSession.factory('batched', 'A batched form session'),
+        ]
+        self.socket = FakeSocket()
+        self.app = AsyncioApplication(
+            factories, transport=lambda session_id: self.socket,
+        )
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def change_field(self, name):
+        """ Start a session and change the attributes of its field in
+        a single event loop cycle.
+
+        """
+        session_id = self.app.start_session(name)
+        field = self.app.session(session_id).windows[0].children[0]
+        del self.socket.sent[:]
+        field.text = u'a'
+        field.placeholder = u'b'
+        field.text = u'c'
+        return session_id, field
+
+    def test_sent(self):
+        """ Test that attribute changes are sent immediately when the
+        session does not batch them.
+
+        """
+        session_id, field = self.change_field('form')
+        field_id = field.object_id
+        self.assertEqual(self.socket.sent, [
+            (field_id, 'set_text', {'text': u'a'}),
+            (field_id, 'set_placeholder', {'placeholder': u'b'}),
+            (field_id, 'set_text', {'text': u'c'}),
+        ])
+
+    def test_batched(self):
+        """ Test that attribute changes in one cycle are sent as a
+        single batched action.
+
+        """
+        session_id, field = self.change_field('batched')
+        self.assertEqual(self.socket.sent, [])
+        run_ready(self.app)
+        field_id = field.object_id
+        self.assertEqual(self.socket.sent, [
+            (session_id, 'message_batch', {'batch': [
+                (field_id, 'set_placeholder', {'placeholder': u'b'}),
+                (field_id, 'set_text', {'text': u'c'}),
+            ]}),
+        ])
+
+
+class TestTypeInfo(unittest.TestCase):
+
+    def test_type_info(self):
+        """ Test that the type info of a class is computed once.
+
+        """
+        info = type_info(Field)
+        self.assertEqual(info[0], 'Field')
+        self.assertEqual(info[1][-1], 'Object')
+        self.assertIsInstance(info[1], tuple)
+        self.assertIs(type_info(Field), info)
+        self.assertEqual(type_info(Window)[0], 'Window')
+
+    def test_base_names(self):
+        """ Test that the base names of an object are a fresh list.
+
+        """
+        field = Field()
+        names = field.base_names()
+        self.assertEqual(names, list(type_info(Field)[1]))
+        names.append('Other')
+        self.assertNotIn('Other', field.base_names())
+        self.assertNotIn('Other', Field().snapshot()['bases'])
+
+
+class TestPackTypes(unittest.TestCase):
+
+    def setUp(self):
+        window = Window()
+        container = Container(window)
+        Field(container)
+        Field(container)
+        self.window = window
+        self.session = Session()
+
+    def test_disabled(self):
+        """ Test that the trees are left untouched by default.
+
+        """
+        snap = self.window.snapshot()
+        self.assertEqual(self.session.pack_types([snap]), [snap])
+        field = snap['children'][0]['children'][1]
+        self.assertNotIn('type_ref', field)
+        self.assertEqual(field['bases'], Field().base_names())
+
+    def test_compact(self):
+        """ Test that only the first node of a type carries its bases.
+
+        """
+        session = self.session
+        session.compact_types = True
+        window, = session.pack_types([self.window.snapshot()])
+        container = window['children'][0]
+        first, second = container['children']
+        self.assertEqual(
+            [node['type_ref'] for node in (window, container, first)],
+            [0, 1, 2],
+        )
+        self.assertIn('bases', first)
+        self.assertNotIn('bases', second)
+        self.assertEqual(second['type_ref'], 2)
+        field, = session.pack_types([Field().snapshot()])
+        self.assertNotIn('bases', field)
+        self.assertEqual(field['type_ref'], 2)
+
+
+@unittest.skipIf(QtSession is None, 'Qt is not available')
+class TestRegisterTypes(unittest.TestCase):
+
+    def test_register_types(self):
+        """ Test that the client records the type info of a tree which
+        is not built, for use by the later trees.
+
+        """
+        session = Session()
+        session.compact_types = True
+        window = Window()
+        Field(window)
+        tree, = session.pack_types([window.snapshot()])
+        field, = session.pack_types([Field().snapshot()])
+        client = QtSession('session', [])
+        client.register_types(tree)
+        key = ('Field', type_info(Field)[1])
+        self.assertEqual(client._type_key(field), key)
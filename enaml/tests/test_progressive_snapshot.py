@@ -0,0 +1,80 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from itertools import count
+import unittest
+
+from enaml.progressive_snapshot import SnapshotSplitter
+
+
+_ids = count()
+
+
+def node(cls, children=(), bases=('Object',), **extra):
+    """ Create a snapshot tree node for testing.
+
+    """
+    tree = {
+        'object_id': '%s%d' % (cls, _ids.next()),
+        'class': cls,
+        'bases': list(bases),
+        'children': list(children),
+    }
+    tree.update(extra)
+    return tree
+
+
+def leaves(n):
+    return [node('Label') for i in xrange(n)]
+
+
+class TestSnapshotSplitter(unittest.TestCase):
+
+    def test_skeleton(self):
+        """ Test that the nodes below the skeleton depth are detached.
+
+        """
+        container = node('Container', leaves(3))
+        window = node('Window', [node('Container', [container])])
+        chunks = SnapshotSplitter(skeleton_depth=2).split([window])
+        self.assertEqual(container['children'], [])
+        self.assertEqual(len(chunks), 1)
+        item = chunks[0][0]
+        self.assertEqual(item['parent_id'], container['object_id'])
+        self.assertEqual(len(item['added']), 3)
+
+    def test_chunk_size(self):
+        """ Test that large subtrees are split into several chunks.
+
+        """
+        groups = [node('Container', leaves(10)) for i in xrange(5)]
+        window = node('Window', [node('Container', groups)])
+        splitter = SnapshotSplitter(skeleton_depth=1, chunk_size=10)
+        chunks = splitter.split([window])
+        self.assertTrue(len(chunks) > 1)
+        seen = set([window['object_id'], window['children'][0]['object_id']])
+        for chunk in chunks:
+            for item in chunk:
+                self.assertIn(item['parent_id'], seen)
+                for tree in item['added']:
+                    seen.add(tree['object_id'])
+        self.assertEqual(len(seen), 57)
+
+    def test_hidden_pages_last(self):
+        """ Test that the hidden pages of a notebook are sent last.
+
+        """
+        pages = [
+            node('Page', [node('Container', leaves(2))],
+                 bases=('Widget', 'Object'))
+            for i in xrange(3)
+        ]
+        notebook = node('Notebook', pages, bases=('Widget', 'Object'))
+        window = node('Window', [notebook])
+        ids = [page['object_id'] for page in pages]
+        first = pages[0]['children'][0]['object_id']
+        splitter = SnapshotSplitter(skeleton_depth=2, chunk_size=1)
+        chunks = splitter.split([window])
+        parents = [item['parent_id'] for chunk in chunks for item in chunk]
+        self.assertEqual(parents[:3], [ids[0], first, ids[1]])
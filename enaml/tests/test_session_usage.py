@@ -0,0 +1,59 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from enaml.session_usage import SessionUsage
+
+
+class TestSessionUsage(unittest.TestCase):
+
+    def setUp(self):
+        self.soft = []
+        self.hard = []
+        self.usage = SessionUsage(
+            lambda *args: self.soft.append(args),
+            lambda *args: self.hard.append(args),
+        )
+
+    def test_counts(self):
+        """ Test the accounting of the resource counts.
+
+        """
+        usage = self.usage
+        usage.add('objects', 3)
+        usage.add('objects', -1)
+        usage.set('batch_size', 7)
+        counts = usage.snapshot()['counts']
+        self.assertEqual(counts['objects'], 2)
+        self.assertEqual(counts['batch_size'], 7)
+        self.assertEqual(counts['bytes_sent'], 0)
+
+    def test_limits(self):
+        """ Test that each limit handler fires once per crossing.
+
+        """
+        usage = self.usage
+        usage.set_limit('objects', 2, 4)
+        usage.add('objects', 2)
+        usage.add('objects', 1)
+        self.assertEqual(self.soft, [('objects', 2, 2)])
+        self.assertEqual(self.hard, [])
+        usage.add('objects', 1)
+        self.assertEqual(self.hard, [('objects', 4, 4)])
+        self.assertEqual(
+            usage.snapshot()['exceeded'],
+            [('objects', 'hard'), ('objects', 'soft')],
+        )
+        usage.add('objects', -3)
+        usage.add('objects', 1)
+        self.assertEqual(len(self.soft), 2)
+
+    def test_invalid_resource(self):
+        """ Test that limits can only be set on known resources.
+
+        """
+        with self.assertRaises(ValueError):
+            self.usage.set_limit('widgets', 1, 2)
+
@@ -0,0 +1,64 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import sys
+import unittest
+
+from .headless_support import EmptySession, asyncio, run_for
+
+
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+@unittest.skipIf(sys.platform == 'win32', 'workers require fork')
+class TestShardedApplication(unittest.TestCase):
+
+    def setUp(self):
+        from enaml.headless.sharded_application import ShardedApplication
+        factories = [
+            EmptySession.factory('first', 'The first session'),
+            EmptySession.factory('second', 'The second session'),
+        ]
+        self.app = ShardedApplication(
+            factories, workers=2, policy='sticky', report_interval=10,
+        )
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def test_session_opened_in_worker(self):
+        """ Test that a session is opened in a worker process.
+
+        """
+        app = self.app
+        session_id = app.start_session('first')
+        messages = []
+        client = app.client_socket(session_id)
+        client.on_message(lambda *msg: messages.append(msg))
+        run_for(self.app, 200)
+        self.assertIn((session_id, 'open'), [m[:2] for m in messages])
+        self.assertEqual(app.session(session_id).snapshot(), [])
+        app.end_session(session_id)
+        self.assertIsNone(app.session(session_id))
+
+    def test_sticky_policy(self):
+        """ Test that the sticky policy groups sessions by name.
+
+        """
+        app = self.app
+        ids = [app.start_session(name) for name in ('first', 'second')]
+        ids += [app.start_session(name) for name in ('first', 'second')]
+        workers = [app.session(sid).worker for sid in ids]
+        self.assertIs(workers[0], workers[2])
+        self.assertIs(workers[1], workers[3])
+        self.assertIsNot(workers[0], workers[1])
+
+    def test_worker_reports(self):
+        """ Test that the workers report their load.
+
+        """
+        self.app.start_session('first')
+        run_for(self.app, 200)
+        stats = self.app.worker_stats()
+        self.assertEqual(len(stats), 2)
+        self.assertTrue(all(s['alive'] for s in stats))
+        self.assertEqual(sum(s['report']['sessions'] for s in stats), 1)
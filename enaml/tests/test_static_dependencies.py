@@ -0,0 +1,164 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import ast
+import sys
+import traceback
+import unittest
+
+from enaml.core.enaml_compiler import static_dependencies
+
+
+def dependencies(source):
+    return static_dependencies(ast.parse(source, mode='eval'))
+
+
+class TestStaticDependencies(unittest.TestCase):
+
+    def test_chains(self):
+        """ Test that dotted attribute chains are extracted.
+
+        """
+        self.assertEqual(dependencies('model'), ('model',))
+        self.assertEqual(dependencies('model.name'), ('model', 'name'))
+        self.assertEqual(
+            dependencies('parent.model.name'), ('parent', 'model', 'name')
+        )
+
+    def test_traced(self):
+        """ Test that other expressions are left to code tracing.
+
+        """
+        for source in ('None', 'True.real', 'model.name()', 'model[0].name',
+                       'model.name + 1', '(model or other).name'):
+            self.assertIsNone(dependencies(source))
+
+
+SOURCE = """
+from traits.api import HasTraits, Instance, Property, Str
+from enaml.core.declarative import Declarative
+
+class Child(HasTraits):
+    name = Str
+    calls = []
+    broken = Property
+
+    def _get_broken(self):
+        self.calls.append(self)
+        raise ValueError('broken getter')
+
+class Model(HasTraits):
+    child = Instance(Child)
+    name = Str
+
+enamldef Main(Declarative):
+    attr model
+    attr chained
+    attr builtin
+    attr delegated
+    chained << model.child.name
+    builtin << len
+    delegated := model.name
+
+enamldef Missing(Declarative):
+    attr model
+    attr value
+    value << model.missing
+
+enamldef Broken(Declarative):
+    attr model
+    attr value
+    value << model.child.broken
+"""
+
+
+class TestStaticExpressions(unittest.TestCase):
+
+    def setUp(self):
+        from enaml.core.enaml_compiler import EnamlCompiler
+        from enaml.core.parser import parse
+        code = EnamlCompiler.compile(parse(SOURCE), 'test_static')
+        f_globals = self.f_globals = {'__name__': 'test_static'}
+        exec code in f_globals
+        self.Child = f_globals['Child']
+        self.model = f_globals['Model'](
+            child=self.Child(name='a'), name='b'
+        )
+
+    def create(self, name):
+        return self.f_globals[name](model=self.model)
+
+    def test_static_expressions(self):
+        """ Test that simple bindings use the static expressions.
+
+        """
+        from enaml.core.expressions import (
+            StaticDelegationExpression, StaticSubscriptionExpression
+        )
+        main = self.create('Main')
+        chained = main._bound_expression('chained')
+        delegated = main._bound_expression('delegated')
+        self.assertIsInstance(chained, StaticSubscriptionExpression)
+        self.assertIsInstance(delegated, StaticDelegationExpression)
+
+    def test_replaced_link(self):
+        """ Test that the chain is hooked to an intermediate link which
+        replaces the old one.
+
+        """
+        main = self.create('Main')
+        model = self.model
+        old = model.child
+        self.assertEqual(main.chained, 'a')
+        model.child = self.Child(name='c')
+        self.assertEqual(main.chained, 'c')
+        old.name = 'd'
+        self.assertEqual(main.chained, 'c')
+        model.child.name = 'e'
+        self.assertEqual(main.chained, 'e')
+
+    def test_missing_first_name(self):
+        """ Test that a first name missing from the scope and the globals
+        is resolved by the function.
+
+        """
+        self.assertNotIn('len', self.f_globals)
+        self.assertIs(self.create('Main').builtin, len)
+
+    def test_missing_link_traceback(self):
+        """ Test that a missing link is raised by the function with a
+        traceback into the Enaml source.
+
+        """
+        missing = self.create('Missing')
+        try:
+            missing.eval_expression('value')
+        except AttributeError:
+            tb = traceback.extract_tb(sys.exc_info()[2])
+        else:
+            self.fail('AttributeError was not raised')
+        self.assertEqual(tb[-1][0], 'test_static')
+
+    def test_getter_error_not_repeated(self):
+        """ Test that an error raised by a getter propagates without
+        running the getter a second time.
+
+        """
+        broken = self.create('Broken')
+        del self.Child.calls[:]
+        self.assertRaises(ValueError, broken.eval_expression, 'value')
+        self.assertEqual(self.Child.calls, [self.model.child])
+
+    def test_delegation(self):
+        """ Test that a static delegation reads and writes back its
+        chain.
+
+        """
+        main = self.create('Main')
+        model = self.model
+        self.assertEqual(main.delegated, 'b')
+        model.name = 'f'
+        self.assertEqual(main.delegated, 'f')
+        main.delegated = 'g'
+        self.assertEqual(model.name, 'g')
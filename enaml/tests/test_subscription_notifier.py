@@ -0,0 +1,137 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import gc
+import unittest
+
+from traits.api import HasTraits, Int, Uninitialized
+from traits.trait_notifiers import (
+    pop_exception_handler, push_exception_handler
+)
+
+from enaml.core.expressions import SubscriptionNotifier
+
+
+class Model(HasTraits):
+
+    a = Int
+
+    b = Int
+
+    c = Int
+
+
+class Owner(HasTraits):
+    """ An expression owner which records the refreshed names.
+
+    """
+    def __init__(self):
+        super(Owner, self).__init__()
+        self.refreshed = []
+
+    def refresh_expression(self, name):
+        self.refreshed.append(name)
+
+
+class FailingOwner(HasTraits):
+
+    def refresh_expression(self, name):
+        1 / 0
+
+
+def hooked(notifier, obj, name):
+    """ Get the number of times a notifier is hooked to a trait.
+
+    """
+    trait = obj._trait(name, 0)
+    if trait is None:
+        return 0
+    notifiers = trait._notifiers(0) or []
+    return sum(1 for item in notifiers if item is notifier)
+
+
+class TestSubscriptionNotifier(unittest.TestCase):
+
+    def test_diff(self):
+        """ Test that only the changed dependencies are rehooked.
+
+        """
+        owner = Owner()
+        model = Model()
+        notifier = SubscriptionNotifier(owner, 'value')
+        self.assertTrue(notifier.update([(model, 'a'), (model, 'b')]))
+        notifiers_b = model._trait('b', 0)._notifiers(0)
+        self.assertFalse(notifier.update([(model, 'a'), (model, 'b')]))
+        self.assertTrue(notifier.update([(model, 'b'), (model, 'c')]))
+        self.assertIs(model._trait('b', 0)._notifiers(0), notifiers_b)
+        self.assertEqual(hooked(notifier, model, 'a'), 0)
+        self.assertEqual(hooked(notifier, model, 'b'), 1)
+        self.assertEqual(hooked(notifier, model, 'c'), 1)
+        model.a = 1
+        model.c = 1
+        self.assertEqual(owner.refreshed, ['value'])
+
+    def test_owner_deleted(self):
+        """ Test that the notifier is detached when its owner dies.
+
+        """
+        owner = Owner()
+        model = Model()
+        notifier = SubscriptionNotifier(owner, 'value')
+        notifier.update([(model, 'a'), (model, 'b')])
+        del owner
+        gc.collect()
+        self.assertEqual(hooked(notifier, model, 'a'), 0)
+        self.assertEqual(hooked(notifier, model, 'b'), 0)
+        self.assertEqual(notifier.keyval, {})
+
+    def test_id_reuse(self):
+        """ Test that a new object with the id of a dead dependency is
+        hooked.
+
+        """
+        owner = Owner()
+        dead = Model()
+        model = Model()
+        notifier = SubscriptionNotifier(owner, 'value')
+        notifier.update([(dead, 'a')])
+        # Simulate the reuse of the id of the dead object.
+        notifier.keyval = {(id(model), 'a'): notifier.keyval.values()[0]}
+        del dead
+        gc.collect()
+        self.assertTrue(notifier.update([(model, 'a')]))
+        self.assertEqual(hooked(notifier, model, 'a'), 1)
+        model.a = 1
+        self.assertEqual(owner.refreshed, ['value'])
+
+    def test_uninitialized(self):
+        """ Test that the initialization of a trait is ignored.
+
+        """
+        owner = Owner()
+        model = Model()
+        notifier = SubscriptionNotifier(owner, 'value')
+        notifier(model, 'a', Uninitialized, 1)
+        self.assertEqual(owner.refreshed, [])
+
+    def test_exception(self):
+        """ Test that an error while refreshing is handled by traits.
+
+        """
+        owner = FailingOwner()
+        model = Model()
+        notifier = SubscriptionNotifier(owner, 'value')
+        notifier.update([(model, 'a')])
+        after = []
+        model.on_trait_change(lambda: after.append(True), 'a')
+        handled = []
+        push_exception_handler(
+            lambda *args: handled.append(args), reraise_exceptions=False
+        )
+        try:
+            model.a = 1
+        finally:
+            pop_exception_handler()
+        self.assertEqual(len(handled), 1)
+        self.assertEqual(after, [True])
@@ -0,0 +1,63 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from cStringIO import StringIO
+import unittest
+
+from enaml.traffic_recorder import (
+    CLIENT, SERVER, SESSION, TrafficRecorder, read_traffic,
+)
+
+
+class LoopbackSocket(object):
+    """ A socket which records the sent messages.
+
+    """
+    def __init__(self):
+        self.sent = []
+        self.callback = None
+
+    def on_message(self, callback):
+        self.callback = callback
+
+    def send(self, object_id, action, content):
+        self.sent.append((object_id, action, content))
+
+
+class TestTrafficRecorder(unittest.TestCase):
+
+    def test_round_trip(self):
+        """ Test that the recorded traffic can be read back.
+
+        """
+        stream = StringIO()
+        recorder = TrafficRecorder(stream)
+        snapshot = [{'object_id': 'o_1', 'children': []}]
+        recorder.record_session('s_1', 'main', ['default'], snapshot)
+        socket = LoopbackSocket()
+        wrapped = recorder.wrap(socket)
+        received = []
+        wrapped.on_message(lambda *msg: received.append(msg))
+        message = ('o_1', 'set_text', {'text': u'hello'})
+        wrapped.send(*message)
+        socket.callback('o_1', 'clicked', {})
+        self.assertEqual(socket.sent, [message])
+        self.assertEqual(received, [('o_1', 'clicked', {})])
+
+        stream.seek(0)
+        records = list(read_traffic(stream))
+        kinds = [record[0] for record in records]
+        self.assertEqual(kinds, [SESSION, SERVER, CLIENT])
+        times = [record[1] for record in records]
+        self.assertEqual(times, sorted(times))
+        self.assertEqual(records[0][4]['snapshot'], snapshot)
+        self.assertEqual(records[1][2:], message)
+        self.assertEqual(records[2][2:], ('o_1', 'clicked', {}))
+
+    def test_bad_header(self):
+        """ Test that a file which is not a recording is rejected.
+
+        """
+        with self.assertRaises(ValueError):
+            list(read_traffic(StringIO('not a recording')))
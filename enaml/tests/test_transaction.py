@@ -0,0 +1,137 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from collections import defaultdict
+import unittest
+
+from enaml.core.transaction import (
+    in_transaction, invalidate, transaction, transactional
+)
+
+
+class Graph(object):
+    """ A minimal dependency graph which mimics traits notifications.
+
+    """
+    def __init__(self):
+        self.values = {}
+        self.observers = defaultdict(list)
+        self.evaluations = defaultdict(int)
+        self.history = defaultdict(list)
+
+    def get(self, obj, name):
+        return self.values.get((obj, name), 0)
+
+    def set(self, obj, name, value):
+        key = (obj, name)
+        if self.values.get(key) != value:
+            self.values[key] = value
+            self.history[key].append(value)
+            for notifier in self.observers[(id(obj), name)]:
+                notifier.notify()
+
+    def bind(self, obj, name, deps, compute):
+        notifier = Notifier(self, obj, name, deps, compute)
+        for dep_obj, dep_name in deps:
+            self.observers[(id(dep_obj), dep_name)].append(notifier)
+        notifier.refresh()
+        return notifier
+
+
+class Notifier(object):
+    """ A stand-in for a SubscriptionNotifier.
+
+    """
+    def __init__(self, graph, owner, name, deps, compute):
+        self.graph = graph
+        self.owner = owner
+        self.name = name
+        self.keyval = tuple((id(obj), attr) for obj, attr in deps)
+        self.compute = compute
+
+    def notify(self):
+        if not invalidate(self, (id(self.owner), self.name)):
+            self.refresh()
+
+    def refresh(self):
+        graph = self.graph
+        graph.evaluations[(self.owner, self.name)] += 1
+        graph.set(self.owner, self.name, self.compute())
+
+
+class Obj(object):
+    pass
+
+
+class TestTransaction(unittest.TestCase):
+
+    def setUp(self):
+        # A diamond: d depends on b and c, which both depend on a.
+        graph = self.graph = Graph()
+        a, b, c, d = self.objs = Obj(), Obj(), Obj(), Obj()
+        get = graph.get
+        graph.bind(b, 'v', [(a, 'v')], lambda: get(a, 'v') + 1)
+        graph.bind(c, 'v', [(a, 'v')], lambda: get(a, 'v') * 2)
+        graph.bind(
+            d, 'v', [(b, 'v'), (c, 'v')], lambda: get(b, 'v') + get(c, 'v')
+        )
+        graph.evaluations.clear()
+        graph.history.clear()
+
+    def test_without_transaction(self):
+        """ Test that a diamond glitches outside of a transaction.
+
+        """
+        a, b, c, d = self.objs
+        self.graph.set(a, 'v', 1)
+        self.assertEqual(self.graph.get(d, 'v'), 4)
+        self.assertEqual(self.graph.evaluations[(d, 'v')], 2)
+
+    def test_transaction(self):
+        """ Test that a diamond is evaluated once inside a transaction.
+
+        """
+        a, b, c, d = self.objs
+        graph = self.graph
+        with transaction():
+            self.assertTrue(in_transaction())
+            graph.set(a, 'v', 1)
+            graph.set(a, 'v', 2)
+            self.assertEqual(graph.evaluations[(b, 'v')], 0)
+        self.assertFalse(in_transaction())
+        self.assertEqual(graph.get(d, 'v'), 7)
+        self.assertEqual(graph.evaluations[(b, 'v')], 1)
+        self.assertEqual(graph.evaluations[(d, 'v')], 1)
+        self.assertEqual(graph.history[(d, 'v')], [7])
+
+    def test_dependency_order(self):
+        """ Test that queued expressions are evaluated after the queued
+        expressions they depend on.
+
+        """
+        a, b, c, d = self.objs
+        graph = self.graph
+        with transaction():
+            graph.set(b, 'v', 10)
+            graph.set(a, 'v', 1)
+        # d was queued before b, but is evaluated after b and c.
+        self.assertEqual(graph.evaluations[(d, 'v')], 1)
+        self.assertEqual(graph.get(d, 'v'), 4)
+
+    def test_transactional(self):
+        """ Test the transactional decorator and nested transactions.
+
+        """
+        a, b, c, d = self.objs
+        graph = self.graph
+
+        @transactional
+        def update(value):
+            with transaction():
+                graph.set(a, 'v', value)
+            self.assertEqual(graph.evaluations[(d, 'v')], 0)
+
+        update(3)
+        self.assertEqual(graph.get(d, 'v'), 10)
+        self.assertEqual(graph.evaluations[(d, 'v')], 1)
@@ -0,0 +1,199 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from cStringIO import StringIO
+import sys
+import unittest
+import uuid
+
+try:
+    import zmq
+except ImportError:
+    zmq = None
+
+from .headless_support import EmptySession, asyncio, run_for
+
+
+@unittest.skipIf(zmq is None, 'pyzmq is not installed')
+class TestFrames(unittest.TestCase):
+
+    def test_pack_frames(self):
+        """ Test that the frame counts are packed in little-endian
+        order and survive a roundtrip.
+
+        """
+        from enaml.zeromq.zmq_server import pack_frames, unpack_frames
+        messages = [['a'], ['b', 'c'], [str(i) for i in xrange(300)]]
+        frames = pack_frames(messages)
+        self.assertEqual(frames[0], '\x01\x00\x02\x00\x2c\x01')
+        self.assertEqual(unpack_frames(frames), messages)
+
+    def test_invalid_frames(self):
+        """ Test that malformed multipart frames are rejected.
+
+        """
+        from enaml.zeromq.zmq_server import unpack_frames
+        self.assertRaises(ValueError, unpack_frames, ['\x01', 'a'])
+        self.assertRaises(ValueError, unpack_frames, ['\x02\x00', 'a'])
+
+
+@unittest.skipIf(zmq is None, 'pyzmq is not installed')
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+class TestZMQServer(unittest.TestCase):
+
+    def setUp(self):
+        from enaml.headless.asyncio_application import AsyncioApplication
+        from enaml.zeromq.zmq_client import ZMQClient
+        from enaml.zeromq.zmq_server import ZMQServer
+        # The endpoint of a closed socket is released asynchronously,
+        # so each test binds a new endpoint.
+        self.address = 'inproc://enaml-test-server-%s' % uuid.uuid4().hex
+        self.server = ZMQServer(self.address, codec='binary')
+        factory = EmptySession.factory('empty', 'An empty session')
+        self.app = AsyncioApplication([factory], transport=self.server.transport)
+        self.server.attach(self.app)
+        self.client = ZMQClient(self.address, codec='binary')
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+        self.app.destroy()
+
+    def request(self, action, content=None):
+        client = self.client
+        client.send('', action, content or {})
+        client.flush()
+        run_for(self.app, 50)
+        messages = client.receive(timeout=1000)
+        replies = [(a, c) for (o, a, c) in messages if o == '']
+        self.assertEqual(len(replies), 1)
+        return replies[0]
+
+    def test_discover(self):
+        """ Test that a client can discover the available sessions.
+
+        """
+        action, content = self.request('discover')
+        self.assertEqual(action, 'discover')
+        self.assertEqual(content['sessions'][0]['name'], 'empty')
+
+    def test_session_lifetime(self):
+        """ Test that a client can start and end a session.
+
+        """
+        action, content = self.request('start_session', {'name': 'empty'})
+        self.assertEqual(action, 'session_started')
+        session_id = content['session_id']
+        self.assertEqual(content['snapshot'], [])
+        self.assertIsNotNone(self.app.session(session_id))
+        action, content = self.request('end_session')
+        self.assertEqual(action, 'session_ended')
+        self.assertIsNone(self.app.session(session_id))
+
+    def test_invalid_session_name(self):
+        """ Test that an invalid request is reported to the client.
+
+        """
+        action, content = self.request('start_session', {'name': 'bogus'})
+        self.assertEqual(action, 'error')
+        self.assertEqual(content['action'], 'start_session')
+
+    def test_blocked_client_disconnected(self):
+        """ Test that a blocked client is disconnected once its queue
+        exceeds the pending limit.
+
+        """
+        action, content = self.request('start_session', {'name': 'empty'})
+        session_id = content['session_id']
+        server = self.server
+        server._max_pending = 5
+        connection = server._sessions[session_id]
+        server._blocked.add(connection)
+        for idx in xrange(5):
+            connection.send(session_id, 'ping', {})
+        server._flush()
+        self.assertIsNotNone(self.app.session(session_id))
+        connection.send(session_id, 'ping', {})
+        server._flush()
+        self.assertIsNone(self.app.session(session_id))
+        self.assertNotIn(connection.routing_id, server._connections)
+
+
+@unittest.skipIf(zmq is None, 'pyzmq is not installed')
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+@unittest.skipIf(sys.platform == 'win32', 'workers require fork')
+class TestZMQShardedServer(unittest.TestCase):
+
+    def setUp(self):
+        from enaml.headless.sharded_application import ShardedApplication
+        from enaml.zeromq.zmq_client import ZMQClient
+        from enaml.zeromq.zmq_server import ZMQServer
+        # The endpoint of a closed socket is released asynchronously,
+        # so each test binds a new endpoint.
+        self.address = 'inproc://enaml-test-sharded-%s' % uuid.uuid4().hex
+        self.server = ZMQServer(self.address, codec='binary')
+        factory = EmptySession.factory('empty', 'An empty session')
+        self.app = ShardedApplication(
+            [factory], workers=1, transport=self.server.transport,
+            report_interval=10,
+        )
+        self.server.attach(self.app)
+        self.client = ZMQClient(self.address, codec='binary')
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+        self.app.destroy()
+
+    def receive_until(self, object_id, action, tries=20):
+        """ Run the event loop until the client receives an action.
+
+        """
+        received = []
+        for idx in xrange(tries):
+            run_for(self.app, 50)
+            received.extend(self.client.receive(timeout=0))
+            if (object_id, action) in [m[:2] for m in received]:
+                return received
+        self.fail('`%s` was not received: %r' % (action, received))
+
+    def test_remote_session(self):
+        """ Test that a worker session is started through the server
+        once the worker has opened it, and that its traffic is
+        accounted.
+
+        """
+        client = self.client
+        client.send('', 'start_session', {'name': 'empty'})
+        client.flush()
+        received = self.receive_until('', 'session_started')
+        replies = [m[2] for m in received if m[:2] == ('', 'session_started')]
+        session_id = replies[0]['session_id']
+        self.assertEqual(replies[0]['snapshot'], [])
+        self.assertEqual(replies[0]['widget_groups'], ['default'])
+        self.assertNotIn('error', [m[1] for m in received])
+        self.assertNotIn((session_id, 'open'), [m[:2] for m in received])
+        counts = self.app.session_usage()[session_id]['counts']
+        self.assertTrue(counts['bytes_sent'] > 0)
+        self.assertEqual(counts['messages_sent'], 1)
+
+    def test_record_remote_session(self):
+        """ Test that a worker session is recorded with the snapshot
+        sent to the client.
+
+        """
+        from enaml.traffic_recorder import SESSION, TrafficRecorder
+        from enaml.traffic_recorder import read_traffic
+        stream = StringIO()
+        self.app.set_recorder(TrafficRecorder(stream))
+        client = self.client
+        client.send('', 'start_session', {'name': 'empty'})
+        client.flush()
+        received = self.receive_until('', 'session_started')
+        replies = [m[2] for m in received if m[:2] == ('', 'session_started')]
+        stream.seek(0)
+        records = list(read_traffic(stream))
+        self.assertEqual(records[0][0], SESSION)
+        self.assertEqual(records[0][2], replies[0]['session_id'])
+        self.assertEqual(records[0][4]['snapshot'], [])
@@ -0,0 +1,261 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Recording of the messages exchanged by a session and its client.
+
+A recording is a compact binary file which starts with a header and is
+followed by a sequence of records. Each record holds a kind byte, the
+time in seconds since the start of the recording, and the frames of
+the message encoded with a BinaryCodec. A single codec is used for all
+of the records of a file, so the intern tables of the codec compress
+the repeated object ids, actions and keys of the traffic.
+
+The kinds of record are:
+
+SESSION
+    The start of a session. The message is addressed to the session id
+    with the action 'session', and its content holds the 'name' of the
+    session factory, the 'widget_groups' and the 'snapshot'.
+
+CLIENT
+    A message sent by the client to an object of the session.
+
+SERVER
+    A message sent by an object of the session to the client.
+
+"""
+import struct
+import types
+from timeit import default_timer
+
+from .message_codec import BinaryCodec
+from .socket_interface import ActionSocketInterface
+from .weakmethod import WeakMethod
+
+
+#: The header which starts a recording file.
+HEADER = 'ENAMLREC\x01'
+
+#: The record kind of a session start.
+SESSION = 'S'
+
+#: The record kind of a message sent by the client.
+CLIENT = 'C'
+
+#: The record kind of a message sent by the server.
+SERVER = 'O'
+
+
+_record_header = struct.Struct('<cdH')
+_frame_header = struct.Struct('<I')
+
+
+class TrafficRecorder(object):
+    """ An object which writes the traffic of sessions to a file.
+
+    """
+    def __init__(self, fileobj):
+        """ Initialize a TrafficRecorder.
+
+        Parameters
+        ----------
+        fileobj : file or str
+            The binary file object to write, or the path of the file.
+
+        """
+        if isinstance(fileobj, basestring):
+            fileobj = open(fileobj, 'wb')
+        fileobj.write(HEADER)
+        self._file = fileobj
+        self._codec = BinaryCodec()
+        self._start = default_timer()
+
+    def record(self, kind, object_id, action, content):
+        """ Write a record to the file.
+
+        Parameters
+        ----------
+        kind : str
+            The kind of record: SESSION, CLIENT or SERVER.
+
+        object_id : str
+            The object id of the message.
+
+        action : str
+            The action of the message.
+
+        content : dict
+            The content dictionary of the message.
+
+        """
+        now = default_timer() - self._start
+        frames = self._codec.encode(object_id, action, content)
+        write = self._file.write
+        write(_record_header.pack(kind, now, len(frames)))
+        for frame in frames:
+            frame = bytes(frame)
+            write(_frame_header.pack(len(frame)))
+            write(frame)
+
+    def record_session(self, session_id, name, widget_groups, snapshot):
+        """ Record the start of a session.
+
+        This should be called with the snapshot which is sent to the
+        client, before any message of the session is recorded.
+
+        Parameters
+        ----------
+        session_id : str
+            The identifier of the session.
+
+        name : str
+            The name of the session factory.
+
+        widget_groups : list
+            The widget groups of the session.
+
+        snapshot : list
+            The snapshot of the session windows.
+
+        """
+        content = {
+            'name': name,
+            'widget_groups': widget_groups,
+            'snapshot': snapshot,
+        }
+        self.record(SESSION, session_id, 'session', content)
+
+    def wrap(self, socket):
+        """ Wrap a socket so that its traffic is recorded.
+
+        Parameters
+        ----------
+        socket : ActionSocketInterface
+            The server side socket of a session.
+
+        Returns
+        -------
+        result : RecordingActionSocket
+            A socket which records and forwards the messages of the
+            given socket.
+
+        """
+        return RecordingActionSocket(socket, self)
+
+    def close(self):
+        """ Close the file of the recording.
+
+        """
+        self._file.close()
+
+
+class RecordingActionSocket(object):
+    """ A concrete implementation of ActionSocketInterface.
+
+    This socket wraps the server side socket of a session, and records
+    the messages sent in both directions with a TrafficRecorder.
+
+    """
+    def __init__(self, socket, recorder):
+        """ Initialize a RecordingActionSocket.
+
+        Parameters
+        ----------
+        socket : ActionSocketInterface
+            The socket to wrap.
+
+        recorder : TrafficRecorder
+            The recorder to use for the messages.
+
+        """
+        self._socket = socket
+        self._recorder = recorder
+        self._callback = None
+
+    def _on_client_message(self, object_id, action, content):
+        """ Record and dispatch a message from the client.
+
+        """
+        self._recorder.record(CLIENT, object_id, action, content)
+        callback = self._callback
+        if callback is not None:
+            callback(object_id, action, content)
+
+    def on_message(self, callback):
+        """ Register a callback for receiving messages sent by a client
+        object.
+
+        Parameters
+        ----------
+        callback : callable
+            A callable with an argument signature that is equivalent to
+            the `send` method. If the callback is a bound method, then
+            the lifetime of the callback will be bound to lifetime of
+            the method owner object.
+
+        """
+        if isinstance(callback, types.MethodType):
+            callback = WeakMethod(callback)
+        self._callback = callback
+        if callback is None:
+            self._socket.on_message(None)
+        else:
+            self._socket.on_message(self._on_client_message)
+
+    def send(self, object_id, action, content):
+        """ Record and send an action to a client object.
+
+        Parameters
+        ----------
+        object_id : str
+            The object id of the target object.
+
+        action : str
+            The action that should be performed by the object.
+
+        content : dict
+            The content dictionary for the action.
+
+        """
+        self._recorder.record(SERVER, object_id, action, content)
+        self._socket.send(object_id, action, content)
+
+
+ActionSocketInterface.register(RecordingActionSocket)
+
+
+def read_traffic(fileobj):
+    """ Read the records of a recording.
+
+    Parameters
+    ----------
+    fileobj : file or str
+        The binary file object to read, or the path of the file.
+
+    Returns
+    -------
+    result : generator
+        A generator which yields a (kind, time, object_id, action,
+        content) tuple for each record in the file.
+
+    """
+    if isinstance(fileobj, basestring):
+        fileobj = open(fileobj, 'rb')
+    if fileobj.read(len(HEADER)) != HEADER:
+        raise ValueError('Not an Enaml traffic recording')
+    read = fileobj.read
+    decode = BinaryCodec().decode
+    record_size = _record_header.size
+    frame_size = _frame_header.size
+    while True:
+        data = read(record_size)
+        if len(data) < record_size:
+            break
+        kind, when, count = _record_header.unpack(data)
+        frames = []
+        for idx in xrange(count):
+            size, = _frame_header.unpack(read(frame_size))
+            frames.append(read(size))
+        object_id, action, content = decode(frames)
+        yield kind, when, object_id, action, content
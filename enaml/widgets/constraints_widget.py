@@ -4,7 +4,7 @@
 #------------------------------------------------------------------------------
 from traits.api import Property, Enum, Instance, List
 
-from enaml.application import Application, ScheduledTask
+from enaml.application import Application
 from enaml.layout.ab_constrainable import ABConstrainable
 from enaml.layout.box_model import BoxModel
 from enaml.layout.layout_helpers import expand_constraints
@@ -102,9 +102,6 @@ class ConstraintsWidget(Widget):
     #: The default is 'strong' for height.
     resist_height = PolicyEnum('strong')
 
-    #: The private application task used to collapse layout messages.
-    _layout_task = Instance(ScheduledTask)
-
     #: The private storage the box model instance for this component.
     _box_model = Instance(BoxModel)
     def __box_model_default(self):
@@ -185,18 +182,19 @@ class ConstraintsWidget(Widget):
         # all child events (which are fired synchronously) can finish
         # processing and send their actions to the client before the
         # relayout request is sent. The action itself is batched so
-        # that it can be sent along with any object tree changes.
+        # that it can be sent along with any object tree changes. The
+        # task is keyed on the object id so that the application will
+        # coalesce the pending requests into a single task.
         app = Application.instance()
         if app is not None:
-            task = self._layout_task
-            if task is None:
-                def notifier(ignored):
-                    self._layout_task = None
-                def layout_task():
-                    self.batch_action('relayout', self._layout_info())
-                task = app.schedule(layout_task)
-                task.notify(notifier)
-                self._layout_task = task
+            key = (self.object_id, 'relayout')
+            app.schedule(self._batch_relayout, key=key)
+
+    def _batch_relayout(self):
+        """ Batch the 'relayout' action for the client widget.
+
+        """
+        self.batch_action('relayout', self._layout_info())
 
     #--------------------------------------------------------------------------
     # Constraints Generation
@@ -0,0 +1,165 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from traits.api import Bool, Int
+
+from enaml.application import timed_call
+
+from .widget import Widget
+
+
+def _deactivate(obj, session):
+    """ Return an active object tree to the 'initialized' state.
+
+    """
+    for child in obj.children:
+        _deactivate(child, session)
+    session.unregister(obj)
+    obj._session = None
+    obj.state = 'initialized'
+
+
+class LazyContent(Widget):
+    """ A base class for widgets whose content can be loaded lazily.
+
+    This is the base class of Page and StackItem. When the parent of
+    the widget loads its children lazily, the children of an unloaded
+    widget are not snapshotted or activated, so they do not exist on
+    the client. The content is loaded when the parent shows the widget
+    and may be unloaded once it has been hidden for some time.
+
+    The objects of the content are not destroyed when it is unloaded;
+    they are deactivated and are activated again when the content is
+    reloaded. Their `activated` event is therefore emitted each time
+    the content is loaded, and their `destroyed` event is not emitted
+    when it is unloaded.
+
+    """
+    #: Whether the children of the widget are loaded. This is managed
+    #: by the parent widget and should not be modified by user code.
+    _content_loaded = Bool(True)
+
+    #: A counter used to discard stale unload requests.
+    _unload_token = Int(0)
+
+    #--------------------------------------------------------------------------
+    # Object Overrides
+    #--------------------------------------------------------------------------
+    def activate(self, session):
+        """ Activate the widget, and its children if they are loaded.
+
+        """
+        if self._content_loaded:
+            super(LazyContent, self).activate(session)
+            return
+        self.state = 'activating'
+        self.pre_activate(session)
+        self._session = session
+        session.register(self)
+        self.state = 'active'
+        self.post_activate(session)
+
+    def snap_children(self):
+        """ Get the children to include in the snapshot.
+
+        The children are only included if they are loaded.
+
+        """
+        if not self._content_loaded:
+            return []
+        return super(LazyContent, self).snap_children()
+
+    #--------------------------------------------------------------------------
+    # Messenger Overrides
+    #--------------------------------------------------------------------------
+    def publish_children_event(self, event):
+        """ Publish a `ChildrenEvent` to the client widget.
+
+        Changes to the children of an unloaded widget are not sent to
+        the client, since they are sent when the content is loaded.
+
+        """
+        if self._content_loaded:
+            super(LazyContent, self).publish_children_event(event)
+
+    #--------------------------------------------------------------------------
+    # Lazy Content API
+    #--------------------------------------------------------------------------
+    def show_content(self):
+        """ Load the content of the widget, if necessary.
+
+        This is called by the parent when the widget becomes visible.
+        Any pending unload of the content is cancelled.
+
+        """
+        self._unload_token += 1
+        if self._content_loaded:
+            return
+        self._content_loaded = True
+        if not self.is_active:
+            return
+        children = self.snap_children()
+        for child in children:
+            if child.is_inactive:
+                child.initialize()
+        session = self.session
+        # The action is batched, so that it follows the batched destroy
+        # of a previous unload of the content, and the snapshot is taken
+        # when the batch is sent.
+        self.batch_action_task('children_changed', self._content_changed)
+        for child in children:
+            if child.is_initialized:
+                child.activate(session)
+
+    def _content_changed(self):
+        """ Create the content of the 'children_changed' action which
+        sends the loaded children to the client.
+
+        """
+        children = self.snap_children()
+        return {
+            'order': [child.object_id for child in children],
+            'removed': [],
+            'added': self.session.pack_types(
+                [child.snapshot() for child in children]
+            ),
+        }
+
+    def hide_content(self, delay):
+        """ Unload the content of the widget after an idle delay.
+
+        This is called by the parent when the widget is hidden.
+
+        Parameters
+        ----------
+        delay : int
+            The time in milliseconds after which to unload the content
+            if the widget is not shown again. A delay of zero keeps
+            the content loaded.
+
+        """
+        self._unload_token += 1
+        if delay > 0 and self._content_loaded:
+            timed_call(delay, self._unload_content, self._unload_token)
+
+    def _unload_content(self, token):
+        """ Unload the content of the widget.
+
+        The client objects are destroyed and the server objects are
+        returned to the 'initialized' state, so that they do not send
+        messages until the content is loaded again. The `destroy`
+        actions are batched, which drops the pending batched actions
+        of the unloaded objects.
+
+        """
+        if token != self._unload_token or not self._content_loaded:
+            return
+        if not self.is_active:
+            return
+        session = self.session
+        for child in self.snap_children():
+            if child.is_active:
+                child.batch_action('destroy', {})
+                _deactivate(child, session)
+        self._content_loaded = False
@@ -2,7 +2,7 @@
 #  Copyright (c) 2012, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
-from traits.api import Enum, Bool, Property, cached_property
+from traits.api import Enum, Bool, Int, Instance, Property, cached_property
 
 from .constraints_widget import ConstraintsWidget
 from .page import Page
@@ -27,6 +27,17 @@ class Notebook(ConstraintsWidget):
     #: Whether or not the tabs in the notebook should be movable.
     tabs_movable = Bool(True)
 
+    #: Whether the content of the pages is loaded lazily. When True,
+    #: only the content of the current page is sent to the client, and
+    #: the content of other pages is sent when they are first shown.
+    #: This must be set before the notebook is initialized.
+    lazy_load = Bool(False)
+
+    #: The time in milliseconds after which the content of a hidden
+    #: page is unloaded when `lazy_load` is True. A value of zero, the
+    #: default, keeps the content loaded once it has been shown.
+    unload_delay = Int(0)
+
     #: A read only property which returns the notebook's Pages.
     pages = Property(depends_on='children')
 
@@ -38,6 +49,10 @@ class Notebook(ConstraintsWidget):
     #: ignores its height hug by default, so it expands freely in height.
     hug_height = 'ignore'
 
+    #: The page which is currently shown by the client when the pages
+    #: are loaded lazily.
+    _current_page = Instance(Page)
+
     #--------------------------------------------------------------------------
     # Initialization
     #--------------------------------------------------------------------------
@@ -50,6 +65,7 @@ class Notebook(ConstraintsWidget):
         snap['tab_position'] = self.tab_position
         snap['tabs_closable'] = self.tabs_closable
         snap['tabs_movable'] = self.tabs_movable
+        snap['lazy_load'] = self.lazy_load
         return snap
 
     def bind(self):
@@ -62,6 +78,37 @@ class Notebook(ConstraintsWidget):
         )
         self.publish_attributes(*attrs)
 
+    def post_initialize(self):
+        """ Mark the pages other than the first as unloaded when the
+        notebook loads its pages lazily.
+
+        """
+        super(Notebook, self).post_initialize()
+        if self.lazy_load:
+            for index, page in enumerate(self.pages):
+                page._content_loaded = index == 0
+            self._current_page = self.pages[0] if self.pages else None
+
+    #--------------------------------------------------------------------------
+    # Message Handling
+    #--------------------------------------------------------------------------
+    def on_action_current_changed(self, content):
+        """ Handle the 'current_changed' action from the client widget.
+
+        This action is only sent by the client when `lazy_load` is True.
+
+        """
+        page_id = content['page_id']
+        for page in self.pages:
+            if page.object_id == page_id:
+                current = self._current_page
+                if current is not page:
+                    self._current_page = page
+                    page.show_content()
+                    if current is not None:
+                        current.hide_content(self.unload_delay)
+                break
+
     #--------------------------------------------------------------------------
     # Private API
     #--------------------------------------------------------------------------
@@ -7,10 +7,10 @@ from traits.api import Unicode, Bool, Str, Property, cached_property
 from enaml.core.trait_types import EnamlEvent
 
 from .container import Container
-from .widget import Widget
+from .lazy_content import LazyContent
 
 
-class Page(Widget):
+class Page(LazyContent):
     """ A widget which can be used as a page in a Notebook control.
 
     A Page is a widget which can be used as a child of a Notebook
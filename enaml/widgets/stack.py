@@ -2,7 +2,9 @@
 #  Copyright (c) 2012, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
-from traits.api import Dict, Int, Property, cached_property
+from traits.api import (
+    Bool, Dict, Int, Property, cached_property, on_trait_change
+)
 
 from .constraints_widget import ConstraintsWidget
 from .stack_item import StackItem
@@ -23,6 +25,17 @@ class Stack(ConstraintsWidget):
     #: XXX Document the supported transitions.
     transition = Dict
 
+    #: Whether the content of the stack items is loaded lazily. When
+    #: True, only the content of the current item is sent to the client,
+    #: and the content of other items is sent when they are first shown.
+    #: This must be set before the stack is initialized.
+    lazy_load = Bool(False)
+
+    #: The time in milliseconds after which the content of a hidden
+    #: item is unloaded when `lazy_load` is True. A value of zero, the
+    #: default, keeps the content loaded once it has been shown.
+    unload_delay = Int(0)
+
     #: A read only property which returns the stack's StackItems
     stack_items = Property(depends_on='children')
 
@@ -45,6 +58,16 @@ class Stack(ConstraintsWidget):
         super(Stack, self).bind()
         self.publish_attributes('index', 'transition')
 
+    def post_initialize(self):
+        """ Mark the items other than the current item as unloaded
+        when the stack loads its items lazily.
+
+        """
+        super(Stack, self).post_initialize()
+        if self.lazy_load:
+            for index, item in enumerate(self.stack_items):
+                item._content_loaded = index == self.index
+
     #--------------------------------------------------------------------------
     # Message Handling
     #--------------------------------------------------------------------------
@@ -58,6 +81,19 @@ class Stack(ConstraintsWidget):
     #--------------------------------------------------------------------------
     # Private API
     #--------------------------------------------------------------------------
+    @on_trait_change('index')
+    def _update_lazy_items(self, obj, name, old, new):
+        """ Show the content of the current item when the stack loads
+        its items lazily.
+
+        """
+        if self.lazy_load and self.is_active:
+            items = self.stack_items
+            if 0 <= new < len(items):
+                items[new].show_content()
+            if 0 <= old < len(items):
+                items[old].hide_content(self.unload_delay)
+
     @cached_property
     def _get_stack_items(self):
         """ The getter for the 'stack_items' property.
@@ -0,0 +1,442 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import cPickle
+from functools import partial
+from heapq import heappop, heappush
+from itertools import count
+import logging
+from Queue import PriorityQueue
+import sys
+from threading import Condition, Lock, Thread
+import traceback
+
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerError(Exception):
+    """ An exception which wraps a failure raised in a worker process.
+
+    The original exception cannot be reliably transferred across the
+    process boundary, so the formatted traceback is used instead.
+
+    """
+    pass
+
+
+def _invoke(payload):
+    """ Invoke a callback in a worker process.
+
+    This is a module-level function so that it may be pickled by the
+    process pool. The callback and its arguments are given as a pickled
+    (callback, args, kwargs) tuple, and the result is pickled before it
+    is returned, so that a value which cannot be pickled is reported as
+    a failure instead of being lost by the pool. Exceptions are
+    converted to a formatted traceback.
+
+    Returns
+    -------
+    result : tuple
+        A 2-tuple of (ok, value) where `value` is the pickled result of
+        the callback or the formatted traceback of the failure.
+
+    """
+    try:
+        callback, args, kwargs = cPickle.loads(payload)
+        result = callback(*args, **kwargs)
+        return (True, cPickle.dumps(result, cPickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return (False, traceback.format_exc())
+
+
+class WorkerTask(object):
+    """ An object representing a task submitted to a worker pool.
+
+    The callback of the task is executed on a worker thread or process.
+    When it completes, the result is delivered to the main event loop
+    thread through the application task scheduler, and the notifier of
+    the task (if any) is invoked on that thread. If the callback fails,
+    the error notifier of the task (if any) is invoked instead.
+
+    """
+    #: A sentinel object indicating that the result of the task is
+    #: undefined or that the task has not yet been completed.
+    undefined = object()
+
+    def __init__(self, callback, args, kwargs, priority):
+        """ Initialize a WorkerTask.
+
+        Parameters
+        ----------
+        callback : callable
+            The callable to run in the worker pool.
+
+        args : tuple
+            The tuple of positional arguments to pass to the callback.
+
+        kwargs : dict
+            The dict of keyword arguments to pass to the callback.
+
+        priority : int
+            The priority of the task. This is used both for ordering
+            the task in the worker queue and for scheduling the result
+            delivery on the main thread.
+
+        """
+        self._callback = callback
+        self._args = args
+        self._kwargs = kwargs
+        self._priority = priority
+        self._result = self.undefined
+        self._error = None
+        self._state = 'pending'
+        self._notify = None
+        self._notify_error = None
+        self._lock = Lock()
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _run(self):
+        """ Run the underlying callback. This should only be called by
+        a worker thread of a thread pool.
+
+        """
+        with self._lock:
+            if self._state != 'pending':
+                return
+            self._state = 'running'
+        try:
+            result = self._callback(*self._args, **self._kwargs)
+        except Exception as error:
+            msg = 'Exception occured in worker task `%s`:'
+            logger.exception(msg % self._callback)
+            self._post(self.undefined, error)
+        else:
+            self._post(result, None)
+
+    def _on_process_done(self, value):
+        """ Handle the completion of the task in a process pool. This
+        is invoked on the result handling thread of the process pool.
+
+        """
+        ok, result = value
+        if ok:
+            try:
+                result = cPickle.loads(result)
+            except Exception:
+                ok, result = False, traceback.format_exc()
+        if ok:
+            self._post(result, None)
+        else:
+            self._fail(result)
+
+    def _fail(self, formatted):
+        """ Post the failure of the task in a process pool, given the
+        formatted traceback of the failure.
+
+        """
+        msg = 'Exception occured in worker task `%s`:\n%s'
+        logger.error(msg % (self._callback, formatted))
+        self._post(self.undefined, WorkerError(formatted))
+
+    def _post(self, result, error):
+        """ Post the result of the task to the main event loop thread.
+
+        """
+        # Imported here to avoid a circular import.
+        from enaml.application import Application
+        app = Application.instance()
+        if app is None:
+            logger.warn('Application instance does not exist')
+            return
+        app.schedule(self._deliver, (result, error), priority=self._priority)
+
+    def _deliver(self, result, error):
+        """ Deliver the result of the task on the main event loop
+        thread and invoke the notifier.
+
+        """
+        with self._lock:
+            if self._state == 'cancelled':
+                return
+            self._state = 'done'
+        self._result = result
+        self._error = error
+        self._callback = self._args = self._kwargs = None
+        notify = self._notify
+        notify_error = self._notify_error
+        self._notify = self._notify_error = None
+        if error is None:
+            if notify is not None:
+                notify(result)
+        elif notify_error is not None:
+            notify_error(error)
+
+    #--------------------------------------------------------------------------
+    # Public API
+    #--------------------------------------------------------------------------
+    def notify(self, callback):
+        """ Set a callback to be run when the task is completed.
+
+        Parameters
+        ----------
+        callback : callable
+            A callable which accepts a single argument which is the
+            results of the task. It will be invoked on the main event
+            loop thread after the task completes successfully.
+
+        """
+        self._notify = callback
+
+    def notify_error(self, callback):
+        """ Set a callback to be run when the task fails.
+
+        Parameters
+        ----------
+        callback : callable
+            A callable which accepts a single argument which is the
+            exception raised by the task. It will be invoked on the
+            main event loop thread after the task fails. For a task
+            run in a worker process, the exception is a WorkerError.
+
+        """
+        self._notify_error = callback
+
+    def pending(self):
+        """ Returns True if the result of this task has not yet been
+        delivered and the task was not cancelled, False otherwise.
+
+        """
+        return self._state in ('pending', 'running')
+
+    def cancelled(self):
+        """ Returns True if this task was cancelled, False otherwise.
+
+        """
+        return self._state == 'cancelled'
+
+    def cancel(self):
+        """ Cancel the task.
+
+        If the task has not yet started, it will not be executed. If
+        the task is currently running, it will be allowed to finish
+        but its result will be discarded and the notifiers will not be
+        invoked.
+
+        Returns
+        -------
+        result : bool
+            True if the task was cancelled, False if the task had
+            already been delivered.
+
+        """
+        with self._lock:
+            if self._state in ('pending', 'running'):
+                self._state = 'cancelled'
+                self._notify = self._notify_error = None
+                return True
+        return False
+
+    def result(self):
+        """ Returns the result of the task, or WorkerTask.undefined
+        if the task has not yet been completed, was cancelled, or
+        raised an exception.
+
+        """
+        return self._result
+
+    def error(self):
+        """ Returns the exception raised by the task, or None if the
+        task has not failed.
+
+        """
+        return self._error
+
+
+class ThreadWorkerPool(object):
+    """ A bounded pool of worker threads for running WorkerTasks.
+
+    Tasks are processed in priority order. Worker threads are started
+    on demand up to the maximum number of workers.
+
+    """
+    def __init__(self, max_workers):
+        """ Initialize a ThreadWorkerPool.
+
+        Parameters
+        ----------
+        max_workers : int
+            The maximum number of worker threads for the pool.
+
+        """
+        self._max_workers = max_workers
+        self._queue = PriorityQueue()
+        self._counter = count()
+        self._threads = []
+        self._idle = 0
+        self._lock = Lock()
+        self._shutdown = False
+
+    def _worker(self):
+        """ The main loop for a worker thread.
+
+        """
+        queue = self._queue
+        while True:
+            priority, ignored, task = queue.get()
+            if task is None:
+                break
+            task._run()
+            with self._lock:
+                self._idle += 1
+
+    def submit(self, task):
+        """ Submit a task to the pool.
+
+        Parameters
+        ----------
+        task : WorkerTask
+            The task to run in the pool.
+
+        """
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError('The worker pool has been shut down')
+            item = (-task._priority, self._counter.next(), task)
+            self._queue.put(item)
+            # An idle worker is claimed for the task before starting a
+            # new thread; a newly started thread is claimed by its task.
+            if self._idle > 0:
+                self._idle -= 1
+                return
+            threads = self._threads
+            if len(threads) < self._max_workers:
+                thread = Thread(target=self._worker)
+                thread.daemon = True
+                thread.start()
+                threads.append(thread)
+
+    def shutdown(self, wait=True):
+        """ Shutdown the pool once the queued tasks are processed.
+
+        Parameters
+        ----------
+        wait : bool, optional
+            Whether to block until the worker threads have exited. The
+            default is True.
+
+        """
+        with self._lock:
+            self._shutdown = True
+            threads = self._threads
+            self._threads = []
+            for thread in threads:
+                self._queue.put((sys.maxint, self._counter.next(), None))
+        if wait:
+            for thread in threads:
+                thread.join()
+
+
+class ProcessWorkerPool(object):
+    """ A pool of worker processes for running WorkerTasks.
+
+    The callback and arguments of tasks submitted to this pool, and
+    the results of the tasks, must be picklable. A task which fails to
+    be pickled is delivered as a WorkerError. The tasks are queued in
+    priority order in the parent process and are handed to a worker
+    process only when one is free, so a queued task can be cancelled
+    before it runs.
+
+    """
+    def __init__(self, max_workers):
+        """ Initialize a ProcessWorkerPool.
+
+        Parameters
+        ----------
+        max_workers : int
+            The maximum number of worker processes for the pool.
+
+        """
+        from multiprocessing import Pool
+        self._pool = Pool(max_workers)
+        self._max_workers = max_workers
+        self._queue = []
+        self._counter = count()
+        self._running = 0
+        self._lock = Lock()
+        self._closed = Condition(self._lock)
+        self._shutdown = False
+
+    def _dispatch(self):
+        """ Hand the queued tasks to the free worker processes. This
+        must be called with the lock held.
+
+        """
+        queue = self._queue
+        while queue and self._running < self._max_workers:
+            priority, ignored, task, payload = heappop(queue)
+            with task._lock:
+                if task._state != 'pending':
+                    continue
+                task._state = 'running'
+            self._running += 1
+            callback = partial(self._on_done, task)
+            self._pool.apply_async(_invoke, (payload,), callback=callback)
+        if self._shutdown and not queue and self._running == 0:
+            self._pool.close()
+            self._closed.notify_all()
+
+    def _on_done(self, task, value):
+        """ Handle the completion of a task. This is invoked on the
+        result handling thread of the process pool.
+
+        """
+        with self._lock:
+            self._running -= 1
+            self._dispatch()
+        task._on_process_done(value)
+
+    def submit(self, task):
+        """ Submit a task to the pool.
+
+        Parameters
+        ----------
+        task : WorkerTask
+            The task to run in the pool.
+
+        """
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError('The worker pool has been shut down')
+        try:
+            item = (task._callback, task._args, task._kwargs)
+            payload = cPickle.dumps(item, cPickle.HIGHEST_PROTOCOL)
+        except Exception:
+            task._fail(traceback.format_exc())
+            return
+        with self._lock:
+            item = (-task._priority, self._counter.next(), task, payload)
+            heappush(self._queue, item)
+            self._dispatch()
+
+    def shutdown(self, wait=True):
+        """ Shutdown the pool once the queued tasks are processed.
+
+        Parameters
+        ----------
+        wait : bool, optional
+            Whether to block until the worker processes have exited.
+            The default is True.
+
+        """
+        with self._lock:
+            self._shutdown = True
+            self._dispatch()
+            if not wait:
+                return
+            while self._queue or self._running:
+                self._closed.wait()
+        self._pool.join()
@@ -80,7 +80,8 @@ class WxApplication(Application):
         groups = session.widget_groups[:]
         wx_session = WxSession(session_id, groups)
         self._wx_sessions[session_id] = wx_session
-        wx_session.open(session.snapshot())
+        snapshot = session.client_snapshot()
+        wx_session.open(snapshot)
 
         # Setup the sockets for the session pair
         server_socket = wxActionSocket()
@@ -88,6 +89,12 @@ class WxApplication(Application):
         server_socket.Bind(EVT_ACTION_SOCKET, client_socket.receive)
         client_socket.Bind(EVT_ACTION_SOCKET, server_socket.receive)
 
+        # Record the session traffic if the application has a recorder.
+        recorder = self._recorder
+        if recorder is not None:
+            recorder.record_session(session_id, name, groups, snapshot)
+            server_socket = recorder.wrap(server_socket)
+
         # Activate the server and client sessions. The server session
         # is activated first so that it is ready to receive messages
         # sent by the client during activation. These messages will
@@ -172,6 +179,9 @@ class WxApplication(Application):
             the callback.
 
         """
+        stats = self._stats
+        if stats is not None:
+            stats.deferred_call()
         DeferredCall(callback, *args, **kwargs)
 
     def timed_call(self, ms, callback, *args, **kwargs):
@@ -192,6 +202,9 @@ class WxApplication(Application):
             the callback.
 
         """
+        stats = self._stats
+        if stats is not None:
+            stats.timed_call()
         TimedCall(ms, callback, *args, **kwargs)
 
     def is_main_thread(self):
@@ -367,6 +367,9 @@ class WxNotebook(WxConstraintsWidget):
     """ A Wx implementation of an Enaml Notebook.
 
     """
+    #: Whether the server loads the content of the pages lazily.
+    _lazy_load = False
+
     #--------------------------------------------------------------------------
     # Setup methods
     #--------------------------------------------------------------------------
@@ -390,6 +393,7 @@ class WxNotebook(WxConstraintsWidget):
         self.set_tab_position(tree['tab_position'])
         self.set_tabs_closable(tree['tabs_closable'])
         self.set_tabs_movable(tree['tabs_movable'])
+        self._lazy_load = tree.get('lazy_load', False)
 
     def init_layout(self):
         """ Handle the layout initialization for the notebook.
@@ -401,6 +405,12 @@ class WxNotebook(WxConstraintsWidget):
             if isinstance(child, WxPage):
                 widget.AddWxPage(child.widget())
         widget.Bind(EVT_COMMAND_LAYOUT_REQUESTED, self.on_layout_requested)
+        if self._lazy_load:
+            if isinstance(widget, wxPreferencesNotebook):
+                event = wx.EVT_NOTEBOOK_PAGE_CHANGED
+            else:
+                event = aui.EVT_AUINOTEBOOK_PAGE_CHANGED
+            widget.Bind(event, self.on_page_changed)
 
     #--------------------------------------------------------------------------
     # Child Events
@@ -432,6 +442,24 @@ class WxNotebook(WxConstraintsWidget):
         """
         self.size_hint_updated()
 
+    def on_page_changed(self, event):
+        """ Handle the page changed event from the notebook.
+
+        This is only bound when the server loads the content of the
+        pages lazily, and tells the server which page is shown.
+
+        """
+        event.Skip()
+        index = event.GetSelection()
+        if index == -1:
+            return
+        page = self.widget().GetPage(index)
+        for child in self.children():
+            if isinstance(child, WxPage) and child.widget() is page:
+                content = {'page_id': child.object_id()}
+                self.send_action('current_changed', content)
+                break
+
     #--------------------------------------------------------------------------
     # Message Handlers
     #--------------------------------------------------------------------------
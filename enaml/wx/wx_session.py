@@ -2,11 +2,12 @@
 #  Copyright (c) 2012, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
-from collections import defaultdict
+from collections import defaultdict, deque
 import logging
 
 from enaml.utils import make_dispatcher
 
+from .wx_deferred_caller import DeferredCall
 from .wx_widget_registry import WxWidgetRegistry
 
 
@@ -36,9 +37,88 @@ class WxSession(object):
         self._session_id = session_id
         self._widget_groups = widget_groups
         self._registered_objects = {}
+        self._type_keys = {}
+        self._widget_classes = {}
+        self._build_queue = deque()
         self._windows = []
         self._socket = None
 
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _type_key(self, tree):
+        """ Get the (class, bases) key for the type of a tree node.
+
+        The type info of a node which uses a compact type reference
+        is recorded the first time it is seen, since later nodes with
+        the same reference do not carry the list of bases.
+
+        """
+        ref = tree.get('type_ref')
+        if ref is None:
+            return (tree['class'], tuple(tree['bases']))
+        keys = self._type_keys
+        key = keys.get(ref)
+        if key is None:
+            key = keys[ref] = (tree['class'], tuple(tree['bases']))
+        return key
+
+    def _dispatch_message(self, object_id, action, content):
+        """ Dispatch a message to the session or one of its objects.
+
+        """
+        queue = self._build_queue
+        if queue or (object_id == self._session_id and
+                     action == 'snapshot_chunk'):
+            if not queue:
+                DeferredCall(self._process_build_queue)
+            queue.append((object_id, action, content))
+        else:
+            self._dispatch_message(object_id, action, content)
+
+    def _process_build_queue(self):
+        """ Process the queue of snapshot chunks and messages.
+
+        One snapshot chunk is built on each cycle of the event loop.
+        The messages which arrived after a chunk are dispatched once
+        the chunk is built, so that they can find their objects.
+
+        """
+        queue = self._build_queue
+        session_id = self._session_id
+        while queue:
+            object_id, action, content = queue.popleft()
+            if object_id == session_id and action == 'snapshot_chunk':
+                self._build_chunk(content)
+                break
+            self._dispatch_message(object_id, action, content)
+        if queue:
+            DeferredCall(self._process_build_queue)
+
+    def _build_chunk(self, content):
+        """ Build the subtrees of a progressive snapshot chunk.
+
+        """
+        objects = self._registered_objects
+        for item in content['items']:
+            parent = objects.get(item['parent_id'])
+            if parent is None:
+                msg = "Invalid parent id in snapshot chunk: %s"
+                logger.warn(msg % item['parent_id'])
+                continue
+            added = item['added']
+            children = {
+                'order': [tree['object_id'] for tree in added],
+                'removed': [],
+                'added': added,
+            }
+            dispatch_action(parent, 'children_changed', children)
+            if self._socket is not None:
+                for tree in added:
+                    child = objects.get(tree['object_id'])
+                    if child is not None:
+                        child.activate()
+
     #--------------------------------------------------------------------------
     # Public API
     #--------------------------------------------------------------------------
@@ -95,24 +175,41 @@ class WxSession(object):
             the building errors will be sent to the error logger.
 
         """
-        groups = self._widget_groups
-        factory = WxWidgetRegistry.lookup(tree['class'], groups)
-        if factory is None:
-            for class_name in tree['bases']:
+        key = self._type_key(tree)
+        widget_cls = self._widget_classes.get(key)
+        if widget_cls is None:
+            groups = self._widget_groups
+            for class_name in (key[0],) + key[1]:
                 factory = WxWidgetRegistry.lookup(class_name, groups)
                 if factory is not None:
                     break
-        if factory is None:
-            msg =  'Unhandled object type: %s:%s'
-            item_class = tree['class']
-            item_bases = tree['bases']
-            logger.error(msg % (item_class, item_bases))
-            return
-        obj = factory().construct(tree, parent, self)
+            if factory is None:
+                msg =  'Unhandled object type: %s:%s'
+                logger.error(msg % (key[0], list(key[1])))
+                return
+            widget_cls = self._widget_classes[key] = factory()
+        obj = widget_cls.construct(tree, parent, self)
         for child in tree['children']:
             self.build(child, obj)
         return obj
 
+    def register_types(self, tree):
+        """ Register the type info of a tree which is not built.
+
+        A tree which is sent for an existing object is not built, but
+        it may carry the type info for a compact type reference which
+        is used by later trees.
+
+        Parameters
+        ----------
+        tree : dict
+            The dictionary snapshot of the tree of items.
+
+        """
+        self._type_key(tree)
+        for child in tree['children']:
+            self.register_types(child)
+
     def register(self, obj):
         """ Register an object with the session.
 
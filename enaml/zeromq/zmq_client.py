@@ -0,0 +1,134 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2012, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import zmq
+
+from enaml.message_codec import make_codec
+
+from .zmq_server import SERVER_ID, pack_frames, unpack_frames
+
+
+class ZMQClient(object):
+    """ A simple blocking client for a ZMQServer.
+
+    This client is suitable for tests, load generation and simulated
+    clients. It does not build any widgets; the messages sent by the
+    server session are returned to the caller.
+
+    """
+    def __init__(self, address, codec='json', context=None):
+        """ Initialize a ZMQClient.
+
+        Parameters
+        ----------
+        address : str
+            The zmq endpoint of the server.
+
+        codec : str, optional
+            The name of the message codec used by the server. The
+            default is 'json'.
+
+        context : zmq.Context, optional
+            The zmq context to use for the socket. The default is the
+            global context instance.
+
+        """
+        if context is None:
+            context = zmq.Context.instance()
+        socket = context.socket(zmq.DEALER)
+        socket.connect(address)
+        self._socket = socket
+        self._codec = make_codec(codec)
+        self._outbox = []
+
+    def send(self, object_id, action, content):
+        """ Queue a message to send to the server.
+
+        The queued messages are written by the next call to `flush`.
+
+        Parameters
+        ----------
+        object_id : str
+            The object id of the target object, or the empty string for
+            a server control action.
+
+        action : str
+            The action that should be performed by the object.
+
+        content : dict
+            The content dictionary for the action.
+
+        """
+        self._outbox.append(self._codec.encode(object_id, action, content))
+
+    def flush(self):
+        """ Write the queued messages to the server in a single batch.
+
+        """
+        outbox = self._outbox
+        if outbox:
+            self._outbox = []
+            self._socket.send_multipart(pack_frames(outbox), copy=False)
+
+    def receive(self, timeout=None):
+        """ Receive a batch of messages from the server.
+
+        Parameters
+        ----------
+        timeout : int, optional
+            The maximum time to wait, in milliseconds. The default
+            waits indefinitely.
+
+        Returns
+        -------
+        result : list
+            The list of (object_id, action, content) messages, which is
+            empty if the timeout expired.
+
+        """
+        socket = self._socket
+        if not socket.poll(timeout):
+            return []
+        decode = self._codec.decode
+        frames = socket.recv_multipart()
+        return [decode(msg_frames) for msg_frames in unpack_frames(frames)]
+
+    def request(self, action, content=None, timeout=None):
+        """ Send a control action to the server and wait for its reply.
+
+        Any session messages received before the reply are discarded.
+
+        Parameters
+        ----------
+        action : str
+            The control action, e.g. 'discover' or 'start_session'.
+
+        content : dict, optional
+            The content dictionary for the action.
+
+        timeout : int, optional
+            The maximum time to wait for each batch of messages, in
+            milliseconds. The default waits indefinitely.
+
+        Returns
+        -------
+        result : tuple
+            The (action, content) of the reply sent by the server.
+
+        """
+        self.send(SERVER_ID, action, content or {})
+        self.flush()
+        while True:
+            messages = self.receive(timeout)
+            if not messages:
+                raise RuntimeError('Timed out waiting for `%s`' % action)
+            for object_id, reply, reply_content in messages:
+                if object_id == SERVER_ID:
+                    return reply, reply_content
+
+    def close(self):
+        """ Close the client socket.
+
+        """
+        self._socket.close(linger=0)
@@ -2,274 +2,579 @@
 #  Copyright (c) 2012, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
-import json
+from collections import deque
+from functools import partial
+import logging
+import struct
+import types
 
 import zmq
-from zmq.eventloop.ioloop import IOLoop
-from zmq.eventloop.zmqstream import ZMQStream
 
-from enaml.message import Message
-from enaml.request import BaseRequest, BasePushHandler
-from enaml.utils import log_exceptions
+from enaml.message_codec import make_codec
+from enaml.socket_interface import ActionSocketInterface
+from enaml.utils import make_dispatcher
+from enaml.weakmethod import WeakMethod
 
 
-def pack_message(routing_id, message):
-    """ Pack a routing id and Message into a mutlipart zmq message.
+logger = logging.getLogger(__name__)
+
+
+#: The dispatch function for server control actions.
+dispatch_action = make_dispatcher('on_action_', logger)
+
+
+#: The object id used for control messages between a client and the
+#: server itself, as opposed to a session or its objects.
+SERVER_ID = ''
+
+
+def pack_frames(messages):
+    """ Pack a sequence of encoded messages into multipart frames.
+
+    The first frame holds the number of frames of each message as an
+    array of little-endian unsigned shorts, followed by the frames of
+    all messages.
 
     Parameters
     ----------
-    routing_id : str
-        The zmq socket identity to place first in the message.
+    messages : iterable
+        An iterable of lists of frames produced by a message codec.
 
-    message : Message
-        The Message object to serialized into the multipart message.
+    Returns
+    -------
+    result : list
+        The list of frames for a single multipart zmq message.
 
     """
-    multipart = [routing_id]
-    dumps = json.dumps
-    multipart.extend(dumps(part) for part in message)
-    return multipart
+    counts = []
+    frames = [None]
+    for msg_frames in messages:
+        counts.append(len(msg_frames))
+        frames.extend(msg_frames)
+    frames[0] = struct.pack('<%dH' % len(counts), *counts)
+    return frames
 
 
-def unpack_message(multipart):
-    """ Unpack a mutlipart Enaml message received by the server.
+def unpack_frames(frames):
+    """ Unpack multipart frames into a list of encoded messages.
 
     Parameters
     ----------
-    multipart : list
-        The 5-element list representing the routing_id, header, 
-        parent_header, metadata, and content of a client message.
+    frames : list
+        The list of frames produced by `pack_frames`.
 
     Returns
     -------
-    routing_id, message : str, Message
-        The zmq routing id and the deserialized Message object.
+    result : list
+        The list of the lists of frames for each message.
 
     """
-    if len(multipart) != 5:
-        raise TypeError('Invalid wire message: %s' % multipart)
-    routing_id = multipart[0]
-    loads = json.loads
-    return routing_id, Message(loads(part) for part in multipart[1:])
-
-
-class ZMQRequest(BaseRequest):
-    """ A concrete BaseRequest implementation for the ZMQServer.
+    header = frames[0]
+    if len(header) % 2:
+        raise ValueError('Invalid multipart message')
+    counts = struct.unpack('<%dH' % (len(header) // 2), header)
+    messages = []
+    idx = 1
+    for count in counts:
+        end = idx + count
+        messages.append(frames[idx:end])
+        idx = end
+    if idx != len(frames):
+        raise ValueError('Invalid multipart message')
+    return messages
+
+
+class ZMQActionSocket(object):
+    """ A concrete implementation of ActionSocketInterface.
+
+    Instances of this class are created by a ZMQServer for the session
+    of a client connection. Messages sent on the socket are queued on
+    the connection and written to the client in batches.
 
     """
-    def __init__(self, message, routing_id, stream, ioloop):
-        """ Initialize a ZMQRequest.
+    def __init__(self, connection):
+        """ Initialize a ZMQActionSocket.
 
         Parameters
         ----------
-        message : Message
-            The Message instance that generated this request.
+        connection : ZMQConnection
+            The client connection for the socket.
 
-        routing_id : str
-            The zmq identity string for the client.
+        """
+        self._connection = connection
+        self._callback = None
 
-        stream : ZMQStream
-            The zmq socket stream for this request.
+    def on_message(self, callback):
+        """ Register a callback for receiving messages sent by a client
+        object.
 
-        ioloop : IOLoop
-            The zmq IOLoop instance for this request.
+        Parameters
+        ----------
+        callback : callable
+            A callable with an argument signature that is equivalent to
+            the `send` method. If the callback is a bound method, then
+            the lifetime of the callback will be bound to lifetime of
+            the method owner object.
 
         """
-        self._message = message
-        self._routing_id = routing_id
-        self._stream = stream
-        self._ioloop = ioloop
-        self._finished = False
+        if isinstance(callback, types.MethodType):
+            callback = WeakMethod(callback)
+        self._callback = callback
 
-    #--------------------------------------------------------------------------
-    # Abstract API implementation
-    #--------------------------------------------------------------------------
-    @property
-    def message(self):
-        """ The Message object for this request.
+    def send(self, object_id, action, content):
+        """ Send the action to the client.
 
-        Returns
-        -------
-        result : Message
-            The Message instance pertaining to this request.
+        Parameters
+        ----------
+        object_id : str
+            The object id of the target object.
+
+        action : str
+            The action that should be performed by the object.
+
+        content : dict
+            The content dictionary for the action.
 
         """
-        return self._message
+        self._connection.send(object_id, action, content)
 
-    def add_callback(self, callback):
-        """ Add a callback to the event queue to be called later.
+    def receive(self, object_id, action, content):
+        """ Receive a message sent to the socket.
 
-        This is can be used by the request handlers to defer long 
-        running work until a future time, at which point the results
-        can be pushed to the client with the 'push_handler()'.
+        The message will be routed to the registered callback, if one
+        exists.
 
         Parameters
         ----------
-        callback : callable
-            A callable which should be invoked by the event loop at 
-            some future time. This method will return immediately.
+        object_id : str
+            The object id of the target object.
+
+        action : str
+            The action that should be performed by the object.
+
+        content : dict
+            The content dictionary for the action.
 
         """
-        self._ioloop.add_callback(callback)
+        callback = self._callback
+        if callback is not None:
+            callback(object_id, action, content)
+
+
+ActionSocketInterface.register(ZMQActionSocket)
+
 
-    @log_exceptions
-    def send_reply(self, message):
-        """ Send the given message to the client as a reply.
+class ZMQConnection(object):
+    """ An object which holds the state of a single client connection.
+
+    """
+    def __init__(self, server, routing_id, codec):
+        """ Initialize a ZMQConnection.
 
         Parameters
         ----------
-        message : Message
-            A Message instance to send to the client as a reply to
-            this particular request.
+        server : ZMQServer
+            The server which owns the connection.
+
+        routing_id : str
+            The zmq identity of the client.
 
-        Notes
-        -----
-        * Users should not usually call this method directly. Instead,
-          users should call the 'reply' convenience method. 
-        * Calling this method effectively closes the request and further 
-          calls to this method will log an error.
+        codec : MessageCodec
+            The codec used to encode and decode the client messages.
 
         """
-        if self._finished:
-            raise RuntimeError('Request already finished')
-        packed = pack_message(self._routing_id, message)
-        self._stream.send_multipart(packed)
-        self._finished = True
-
-    def push_handler(self):
-        """ Returns an object that can be used to push unsolicited 
-        messages to this client.
+        self.server = server
+        self.routing_id = routing_id
+        self.codec = codec
+        self.socket = ZMQActionSocket(self)
+        self.session_id = None
+        self.outbox = deque()
 
-        Returns
-        -------
-        result : ZMQPushHandler
-            A ZMQPushHandler instance which can be used to push messages
-            to this client, without the client initiating a request.
+    def send(self, object_id, action, content):
+        """ Encode a message and queue it for sending to the client.
 
         """
-        return ZMQPushHandler(self._routing_id, self._stream, self._ioloop)
+        frames = self.codec.encode(object_id, action, content)
+        self.outbox.append(frames)
+        self.server._post_flush(self)
+        self.record_traffic(sum(map(len, frames)), 0)
+
+    def record_traffic(self, bytes_sent, bytes_received):
+        """ Account for the bytes exchanged with the session of the
+        connection, if it has one.
 
+        """
+        session_id = self.session_id
+        if session_id is not None:
+            session = self.server._app.session(session_id)
+            if session is not None:
+                session.record_traffic(bytes_sent, bytes_received)
 
-class ZMQPushHandler(BasePushHandler):
-    """ A concrete BasePushHandler implementation for the ZMQServer.
 
-    Instances of this class will remain functional for the lifetime
-    of the originating client. If the client disconnects, then 
-    this handler will silently drop the messages.
+class ZMQServer(object):
+    """ An Enaml Application server which uses a ZeroMQ ROUTER socket.
+
+    Each client connection, identified by its zmq routing id, can host
+    one session of the application. A client drives the server with
+    control messages addressed to the empty object id:
+
+    'discover'
+        Request the information about the available sessions. The
+        server replies with a 'discover' action whose content holds
+        the 'sessions' list returned by `Application.discover`.
+
+    'start_session'
+        Start a session with the 'name' given in the content. The
+        server replies with a 'session_started' action holding the
+        'session_id', 'widget_groups' and 'snapshot' of the session.
+        If the content holds the 'resume' id of a hibernated session
+        instead, that session is resumed from the application store.
+        A session hosted by a worker process of a ShardedApplication
+        is opened asynchronously, and the reply is sent once the worker
+        has opened the session, in place of its 'open' action.
+
+    'end_session'
+        End the session of the connection. The server replies with a
+        'session_ended' action.
+
+    All other messages are delivered to the session of the connection.
+    Failures are reported to the client with an 'error' action.
+
+    The server must be used with an Application which supports session
+    transports, such as the AsyncioApplication, and the `transport`
+    method of the server must be provided to the application. The
+    messages sent to a client are written once per cycle of the event
+    loop in a single multipart message, using non-blocking sends. When
+    the high-water mark of the client is reached, the messages are kept
+    queued until the socket becomes writable again. A client whose queue
+    grows beyond `max_pending` messages is disconnected.
 
     """
-    def __init__(self, routing_id, stream, ioloop):
-        """ Initialize a ZMQPushHandler.
+    def __init__(self, address, codec='json', context=None, hwm=1000,
+                 max_pending=10000):
+        """ Initialize a ZMQServer.
 
         Parameters
         ----------
-        routing_id : str
-            The zmq identity string for the client.
+        address : str
+            The zmq endpoint to bind, e.g. 'tcp://127.0.0.1:8888',
+            'ipc:///tmp/enaml' or 'inproc://enaml'.
 
-        stream : ZMQStream
-            The zmq socket stream for this push handler.
+        codec : str, optional
+            The name of the message codec to use for the connections.
+            The default is 'json'.
 
-        ioloop : IOLoop
-            The zmq IOLoop instance for this push handler.
+        context : zmq.Context, optional
+            The zmq context to use for the socket. The default is the
+            global context instance, which is required for inproc
+            endpoints shared with clients in the same process.
+
+        hwm : int, optional
+            The send high-water mark of the socket, in multipart
+            messages, for each client. The default is 1000.
+
+        max_pending : int, optional
+            The maximum number of messages queued for a client whose
+            high-water mark has been reached. A client which exceeds
+            this limit is disconnected. The default is 10000.
 
         """
-        self._routing_id = routing_id
-        self._stream = stream
-        self._ioloop = ioloop
+        if context is None:
+            context = zmq.Context.instance()
+        router = context.socket(zmq.ROUTER)
+        router.setsockopt(zmq.ROUTER_MANDATORY, 1)
+        router.setsockopt(zmq.SNDHWM, hwm)
+        router.bind(address)
+        self._router = router
+        self._app = None
+        self._codec = codec
+        self._max_pending = max_pending
+        self._connections = {}
+        self._sessions = {}
+        self._pending = None
+        self._dirty = set()
+        self._blocked = set()
+        self._flush_posted = False
 
-    @log_exceptions
-    def push_message(self, message):
-        """ Push the given message to the client.
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _post_flush(self, connection):
+        """ Mark a connection as having queued messages and post the
+        flush of the queued messages to the event loop.
 
-        Parameters
-        ----------
-        message : Message
-            The Message instance that should be pushed to the client.
+        """
+        self._dirty.add(connection)
+        if not self._flush_posted:
+            self._flush_posted = True
+            self._app.deferred_call(self._flush)
+
+    def _flush(self):
+        """ Write the queued messages of each connection to its client.
 
         """
-        packed = pack_message(self._routing_id, message)
-        self._stream.send_multipart(packed)
+        self._flush_posted = False
+        dirty = self._dirty
+        self._dirty = set()
+        blocked = self._blocked
+        for connection in dirty:
+            if connection not in blocked:
+                self._write(connection)
+            elif len(connection.outbox) > self._max_pending:
+                self._drop_slow(connection)
+        # The zmq file descriptor is edge-triggered and writing to the
+        # socket may consume a pending read event, so the events are
+        # processed again once the socket has been written.
+        self._app.deferred_call(self.process_events)
+
+    def _write(self, connection):
+        """ Write the queued messages of a connection to its client.
 
-    def add_callback(self, callback):
-        """ Add a callback to the event queue to be called later.
+        """
+        outbox = connection.outbox
+        if not outbox:
+            return
+        messages = list(outbox)
+        frames = [connection.routing_id] + pack_frames(messages)
+        try:
+            self._router.send_multipart(frames, zmq.NOBLOCK, copy=False)
+        except zmq.Again:
+            self._blocked.add(connection)
+            if len(outbox) > self._max_pending:
+                self._drop_slow(connection)
+        except zmq.ZMQError as e:
+            if e.errno != zmq.EHOSTUNREACH:
+                raise
+            self._disconnect(connection)
+        else:
+            self._blocked.discard(connection)
+            outbox.clear()
+
+    def _drop_slow(self, connection):
+        """ Disconnect a client whose queue exceeds the pending limit.
 
-        This is used as a convenience for Session objects to provide
-        a way to run callables in a deferred fashion. It does not 
-        imply any communication with the client. It is merely an
-        abstract entry point into the zmq event loop. 
+        """
+        msg = 'Disconnecting slow zmq client `%r`'
+        logger.warn(msg % connection.routing_id)
+        self._disconnect(connection)
 
-        Call it a concession to practicality over purity - SCC
+    def _disconnect(self, connection):
+        """ Drop a client connection and end its session.
 
-        Parameters
-        ----------
-        callback : callable
-            A callable which should be invoked by the event loop at 
-            some future time. This method returns immediately.
+        """
+        self._connections.pop(connection.routing_id, None)
+        self._blocked.discard(connection)
+        self._dirty.discard(connection)
+        connection.outbox.clear()
+        session_id = connection.session_id
+        if session_id is not None:
+            connection.session_id = None
+            self._sessions.pop(session_id, None)
+            if self._app.session(session_id) is not None:
+                self._app.end_session(session_id)
+
+    def _session_started(self, connection, session_id, info):
+        """ Record a started session and reply to its client.
 
         """
-        self._ioloop.add_callback(callback)
+        app = self._app
+        session = app.session(session_id)
+        if session is None or connection.session_id != session_id:
+            return
+        recorder = app.recorder()
+        if recorder is not None:
+            recorder.record_session(
+                session_id, session.factory_name, info['widget_groups'],
+                info['snapshot'],
+            )
+        info = {
+            'session_id': session_id,
+            'widget_groups': info['widget_groups'],
+            'snapshot': info['snapshot'],
+        }
+        connection.send(SERVER_ID, 'session_started', info)
 
+    def _on_recv(self, multipart):
+        """ Handle a multipart message received from a client.
 
-class ZMQServer(object):
-    """ An Enaml Application server which uses ZeroMQ sockets.
+        """
+        routing_id = multipart[0]
+        connection = self._connections.get(routing_id)
+        if connection is None:
+            codec = make_codec(self._codec)
+            connection = ZMQConnection(self, routing_id, codec)
+            self._connections[routing_id] = connection
+        decode = connection.codec.decode
+        for frames in unpack_frames(multipart[1:]):
+            object_id, action, content = decode(frames)
+            if object_id == SERVER_ID:
+                try:
+                    dispatch_action(self, action, connection, content)
+                except Exception as e:
+                    logger.exception('Error handling zmq client request')
+                    error = {'action': action, 'message': str(e)}
+                    connection.send(SERVER_ID, 'error', error)
+            else:
+                connection.record_traffic(0, sum(map(len, frames)))
+                connection.socket.receive(object_id, action, content)
 
-    """
-    def __init__(self, app, host, port):
-        """ Initialize a ZMQServer.
+    #--------------------------------------------------------------------------
+    # Action Handlers
+    #--------------------------------------------------------------------------
+    def on_action_discover(self, connection, content):
+        """ Handle the 'discover' action from a client.
 
-        Parameters
-        ----------
-        app : Application
-            The Enaml Application instance which should be served by 
-            this server.
+        """
+        info = {'sessions': self._app.discover()}
+        connection.send(SERVER_ID, 'discover', info)
 
-        host : string
-            The host address for tcp communication. e.g. '127.0.0.1'
+    def on_action_start_session(self, connection, content):
+        """ Handle the 'start_session' action from a client.
 
-        port : int
-            The host port to use for communication. e.g. 8888
+        """
+        app = self._app
+        current_id = connection.session_id
+        if current_id is not None:
+            if app.session(current_id) is not None:
+                raise RuntimeError('The client already has an active session')
+            # The session was ended by the application, for example
+            # when it was hibernated.
+            connection.session_id = None
+            self._sessions.pop(current_id, None)
+        self._pending = connection
+        try:
+            if 'resume' in content:
+                session_id = app.resume_session(content['resume'])
+            else:
+                session_id = app.start_session(content['name'])
+        finally:
+            self._pending = None
+        session = app.session(session_id)
+        # A session hosted by a worker process has no snapshot until
+        # the worker has opened it.
+        notify_opened = getattr(session, 'notify_opened', None)
+        if notify_opened is not None:
+            callback = partial(self._session_started, connection, session_id)
+            notify_opened(callback)
+        else:
+            info = {
+                'widget_groups': session.widget_groups[:],
+                'snapshot': session.client_snapshot(),
+            }
+            self._session_started(connection, session_id, info)
+
+    def on_action_end_session(self, connection, content):
+        """ Handle the 'end_session' action from a client.
 
         """
-        ctxt = zmq.Context()
-        router = ctxt.socket(zmq.ROUTER)
-        router.bind('tcp://%s:%s' % (host, port))
-        self._app = app
-        self._router = router
-        self._stream = ZMQStream(router)
-        self._stream.on_recv(self._on_recv)
-        self._ioloop = IOLoop.instance()
+        session_id = connection.session_id
+        if session_id is None:
+            raise RuntimeError('The client has no active session')
+        connection.session_id = None
+        self._sessions.pop(session_id, None)
+        self._app.end_session(session_id)
+        connection.send(SERVER_ID, 'session_ended', {})
 
     #--------------------------------------------------------------------------
-    # Private API
+    # Public API
     #--------------------------------------------------------------------------
-    @log_exceptions
-    def _on_recv(self, multipart):
-        """ The zmq stream message receive handler.
+    def attach(self, app):
+        """ Attach the server to an application.
+
+        If the application runs an asyncio event loop, the zmq socket
+        is registered with the loop. Otherwise, the owner of the server
+        must call `process_events` whenever the file descriptor returned
+        by `fileno` becomes readable.
 
         Parameters
         ----------
-        multipart : list
-            The multipart message received by the client.
+        app : Application
+            The application which hosts the sessions for the server.
+            It must have been created with `transport` as its session
+            transport.
 
         """
-        routing_id, message = unpack_message(multipart)
-        request = ZMQRequest(message, routing_id, self._stream, self._ioloop)
-        self._app.handle_request(request)
+        self._app = app
+        loop_getter = getattr(app, 'loop', None)
+        if loop_getter is not None:
+            loop_getter().add_reader(self.fileno(), self.process_events)
+        app.deferred_call(self.process_events)
 
-    #--------------------------------------------------------------------------
-    # Public API
-    #--------------------------------------------------------------------------
-    def start(self):
-        """ Start the server's io loop. This call will block until
-        the 'stop' method is called.
+    def transport(self, session_id):
+        """ The session transport for the application.
+
+        This method should be provided as the transport callable of
+        the application. It returns the socket of the connection which
+        requested the session.
+
+        Parameters
+        ----------
+        session_id : str
+            The identifier of the session being started.
+
+        Returns
+        -------
+        result : ZMQActionSocket
+            The socket for the session.
 
         """
-        self._ioloop.start()
+        connection = self._pending
+        if connection is None:
+            raise RuntimeError('Sessions must be started by a zmq client')
+        connection.session_id = session_id
+        self._sessions[session_id] = connection
+        recorder = self._app.recorder()
+        if recorder is not None:
+            return recorder.wrap(connection.socket)
+        return connection.socket
+
+    def fileno(self):
+        """ Get the file descriptor to poll for socket events.
 
-    def stop(self):
-        """ Stop the server's io loop. This will cause a previous call
-        to 'start' to return.
+        Returns
+        -------
+        result : int
+            The edge-triggered file descriptor of the zmq socket.
 
         """
-        self._ioloop.stop()
+        return self._router.getsockopt(zmq.FD)
 
+    def process_events(self):
+        """ Process the pending events on the zmq socket.
+
+        This reads all of the available client messages, and retries
+        the writes which were blocked by the high-water mark once the
+        socket becomes writable.
+
+        """
+        router = self._router
+        while True:
+            events = router.getsockopt(zmq.EVENTS)
+            if events & zmq.POLLOUT and self._blocked:
+                blocked = self._blocked
+                self._blocked = set()
+                for connection in blocked:
+                    self._write(connection)
+            if not events & zmq.POLLIN:
+                break
+            try:
+                multipart = router.recv_multipart(zmq.NOBLOCK)
+            except zmq.Again:
+                break
+            try:
+                self._on_recv(multipart)
+            except Exception:
+                logger.exception('Error handling zmq client message')
+
+    def close(self):
+        """ Close the server and end the sessions of its clients.
+
+        """
+        app = self._app
+        if app is not None:
+            loop_getter = getattr(app, 'loop', None)
+            if loop_getter is not None:
+                loop_getter().remove_reader(self.fileno())
+        for connection in self._connections.values():
+            self._disconnect(connection)
+        self._router.close(linger=0)
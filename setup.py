@@ -45,6 +45,9 @@ setup(
     long_description=open('README.rst').read(),
     requires=['traits', 'PySide', 'ply', 'wx', 'casuarius'],
     install_requires=['distribute'],
+    extras_require={
+        'headless': ['trollius'],
+    },
     packages=find_packages(),
     package_data={'enaml.stdlib': ['*.enaml']},
     entry_points = dict(